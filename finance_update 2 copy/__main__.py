@@ -4,15 +4,20 @@ import os
 import sys
 import logging
 import asyncio
+import argparse
+from datetime import date
 from config import Config
 from report_pipeline import ReportPipeline
 from clients.dropbox_client import DropboxClient
+from clients.local_report_source import LocalReportSource
 from clients.openai_client import OpenAIClient
 from services.text_extractor import PDFTextExtractor
 from services.summarizer_service import SummarizerService
 from services.email_notifier import EmailNotifier
 from services.chunk_manager import ChunkManager
 from services.prompt_manager import PromptManager
+from utils.pdf_processor import PDFProcessor
+from utils.extraction_cache import ExtractionCache
 
 from utils.log_handler import TokenSizeRotatingFileHandler
 
@@ -40,7 +45,22 @@ root_logger.addHandler(file_handler)
 
 logger = logging.getLogger(__name__)
 
-async def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Summarize the day's financial reports.")
+    parser.add_argument(
+        '--backfill',
+        nargs=2,
+        metavar=('START', 'END'),
+        type=date.fromisoformat,
+        help="Process every day from START to END (YYYY-MM-DD, inclusive) into its own archive slot"
+    )
+    args = parser.parse_args(argv)
+    if args.backfill and args.backfill[0] > args.backfill[1]:
+        parser.error("backfill START must not be after END")
+    return args
+
+async def main(args: argparse.Namespace):
     """Main asynchronous function to run the financial report processing."""
     try:
         logger.info("Starting Financial Report Processing")
@@ -52,16 +72,54 @@ async def main():
         
         # Initialize clients
         logger.info("Initializing clients")
-        dropbox_client = DropboxClient(
-            refresh_token=config.dropbox_refresh_token,
-            app_key=config.dropbox_app_key,
-            app_secret=config.dropbox_app_secret
-        )
+        if config.report_source == 'local':
+            report_source = LocalReportSource(
+                root_dir=config.local_reports_dir,
+                as_of=date.fromisoformat(config.report_date) if config.report_date else None
+            )
+        else:
+            report_source = DropboxClient(
+                refresh_token=config.dropbox_refresh_token,
+                app_key=config.dropbox_app_key,
+                app_secret=config.dropbox_app_secret,
+                max_workers=config.dropbox_max_connections,
+                spool_threshold=int(config.spool_threshold_mb * 1024 * 1024),
+                spool_dir=config.spool_dir,
+                sync_dir=config.sync_dir or None,
+                blob_store_dir=config.blob_store_dir or None,
+                blob_store_max_mb=config.blob_store_max_mb,
+                resume_threshold=int(config.download_resume_threshold_mb * 1024 * 1024),
+                max_resumes=config.download_max_resumes
+            )
         openai_client = OpenAIClient(config.openai_key)
         
         # Initialize core services
         logger.info("Initializing core services")
-        text_extractor = PDFTextExtractor()
+        pdf_processor = PDFProcessor(
+            max_workers=config.pdf_workers,
+            backend=config.pdf_backend,
+            page_parallel_threshold=config.pdf_page_parallel_threshold,
+            pages_per_range=config.pdf_pages_per_range,
+            extraction_strategy=config.pdf_extraction_strategy,
+            document_timeout=config.pdf_document_timeout or None,
+            max_pages=config.pdf_max_pages or None,
+            remove_repeated_lines=config.remove_repeated_lines,
+            figure_mode=config.pdf_figure_mode,
+            truncate_disclosures=config.truncate_disclosures,
+            page_cache_dir=config.page_cache_dir or None,
+            page_cache_max_mb=config.page_cache_max_mb,
+            table_mode=config.pdf_table_mode
+        )
+        extraction_cache = None
+        if config.extraction_cache_dir:
+            extraction_cache = ExtractionCache(
+                cache_dir=config.extraction_cache_dir,
+                max_size_mb=config.extraction_cache_max_mb
+            )
+        text_extractor = PDFTextExtractor(
+            pdf_processor=pdf_processor,
+            cache=extraction_cache
+        )
         email_notifier = EmailNotifier(config)
         chunk_manager = ChunkManager(max_chunk_size=config.max_chunk_size)
         prompt_manager = PromptManager()
@@ -77,15 +135,24 @@ async def main():
         logger.info("Creating report pipeline")
         pipeline = ReportPipeline(
             config=config,
-            dropbox_client=dropbox_client,
+            report_source=report_source,
             pdf_processor=text_extractor,
             summarizer_service=summarizer_service,
             email_sender=email_notifier
         )
         
         # Run the pipeline
-        logger.info("Starting report processing")
-        final_analysis = await pipeline.run()
+        try:
+            if args.backfill:
+                start, end = args.backfill
+                logger.info(f"Starting backfill from {start} to {end}")
+                stored = await pipeline.backfill(start, end, max_concurrent_days=config.backfill_max_days)
+                final_analysis = any(stored.values())
+            else:
+                logger.info("Starting report processing")
+                final_analysis = await pipeline.run()
+        finally:
+            await report_source.close()
         
         if final_analysis:
             logger.info("Financial Report Processing Completed Successfully")
@@ -97,4 +164,4 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -1,22 +1,50 @@
 """Dropbox client for fetching reports."""
 
+import os
 import logging
-from typing import List, Dict, Union, BinaryIO
-import io
-import dropbox
+from typing import List, Dict, Union, Optional, Tuple, AsyncIterator
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from dropbox.files import FileMetadata, ListFolderResult
+from functools import partial
+from dropbox.files import FileMetadata, DeletedMetadata, ListFolderContinueError
 from dropbox.exceptions import ApiError
-from datetime import datetime, timedelta
-import pytz
+from clients.report_source import ReportSource
+from clients.dropbox_transport import DropboxTransport, DEFAULT_MAX_CONNECTIONS, TRANSPORT_ERRORS
+from utils.document_handle import DocumentHandle, DEFAULT_SPOOL_THRESHOLD
+from utils.sync_manifest import SyncManifest, SyncEntry
+from utils.blob_store import BlobStore, ContentHashMismatch
+from utils.resumable_download import resumable_chunks, DownloadStats, DEFAULT_MAX_RESUMES, RESUMABLE_ERRORS
+from utils.running_stats import RunningStats
 
 logger = logging.getLogger(__name__)
 
-class DropboxClient:
-    """Client for interacting with Dropbox API."""
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Stream downloads in 1 MB chunks
+DEFAULT_RESUME_THRESHOLD = 16 * 1024 * 1024  # Files from 16 MB resume after dropped connections
+
+class DropboxClient(ReportSource):
+    """
+    Client for interacting with Dropbox API.
+    
+    Requests go through an async transport, so listings and downloads run
+    on the event loop over a shared pool of kept-alive connections. With a
+    sync directory, day folders are synced incrementally. With a blob store,
+    reports already downloaded (in an earlier run, another day folder or
+    another subfolder) are read from the store instead.
+    """
     
-    def __init__(self, refresh_token: str, app_key: str, app_secret: str, max_workers: int = 5):
+    def __init__(
+        self,
+        refresh_token: str,
+        app_key: str,
+        app_secret: str,
+        max_workers: int = DEFAULT_MAX_CONNECTIONS,
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+        spool_dir: Optional[str] = None,
+        sync_dir: Optional[str] = None,
+        blob_store_dir: Optional[str] = None,
+        blob_store_max_mb: float = 2048,
+        resume_threshold: int = DEFAULT_RESUME_THRESHOLD,
+        max_resumes: int = DEFAULT_MAX_RESUMES
+    ):
         """
         Initialize Dropbox client.
         
@@ -24,17 +52,45 @@ class DropboxClient:
             refresh_token: OAuth2 refresh token
             app_key: Dropbox app key
             app_secret: Dropbox app secret
-            max_workers: Maximum number of concurrent downloads
+            max_workers: Maximum number of concurrent requests, which is
+                    also the size of the connection pool
+            spool_threshold: Size in bytes above which downloads are spooled to disk
+            spool_dir: Optional directory for spooled downloads
+            sync_dir: Optional directory for the sync manifest; enables
+                    incremental sync
+            blob_store_dir: Optional directory for downloaded reports keyed by
+                    content hash, so each report is downloaded once. Syncing
+                    needs stored copies of unchanged reports, so with a
+                    sync_dir this defaults to its 'blobs' subdirectory
+            blob_store_max_mb: Size bound of the blob store
+            resume_threshold: Size in bytes from which downloads stream to disk
+                    and resume after a dropped connection
+            max_resumes: Resumes allowed per download
         """
-        self.dbx = dropbox.Dropbox(
-            oauth2_refresh_token=refresh_token,
-            app_key=app_key,
-            app_secret=app_secret
+        self.transport = DropboxTransport(
+            refresh_token,
+            app_key,
+            app_secret,
+            max_connections=max_workers
         )
-        self.max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        super().__init__(max_workers=max_workers)
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir
+        self.manifest = SyncManifest(sync_dir) if sync_dir else None
+        if sync_dir and not blob_store_dir:
+            blob_store_dir = os.path.join(sync_dir, 'blobs')
+            logger.warning(
+                f"Incremental sync needs a blob store to reuse unchanged reports; "
+                f"storing them in {blob_store_dir}"
+            )
+        self.blob_store = BlobStore(blob_store_dir, blob_store_max_mb) if blob_store_dir else None
+        self._blob_downloads: Dict[str, asyncio.Future] = {}  # content hash -> download in flight
+        self.resume_threshold = resume_threshold
+        self.max_resumes = max_resumes
+        self.download_throughput = RunningStats()  # MB/s per download
+        self.download_resumes = 0
         
-    def _list_folder_recursive(self, path: str = "") -> List[FileMetadata]:
+    async def _list_folder_recursive(self, path: str = "") -> List[FileMetadata]:
         """
         List all files in a folder recursively, handling pagination.
         
@@ -50,7 +106,7 @@ class DropboxClient:
             
             # Try to list the folder contents
             try:
-                result = self.dbx.files_list_folder(path, recursive=True)
+                result = await self.transport.list_folder(path, recursive=True)
             except ApiError as e:
                 if e.error.is_path() and e.error.get_path().is_not_found():
                     logger.warning(f"Path {path} not found in Dropbox")
@@ -67,7 +123,7 @@ class DropboxClient:
                 if not result.has_more:
                     break
                     
-                result = self.dbx.files_list_folder_continue(result.cursor)
+                result = await self.transport.list_folder_continue(result.cursor)
             
             logger.info(f"Found {len(files)} total files in {path}")
             return files
@@ -78,109 +134,266 @@ class DropboxClient:
                 return []
             raise
 
-    async def _download_file(self, entry: FileMetadata, total_files: int, index: int) -> Dict[str, Union[str, bytes]]:
+    async def _sync_folder(self, path: str) -> List[SyncEntry]:
         """
-        Download a single file from Dropbox asynchronously.
+        Bring a folder's manifest state up to date, using its cursor when it has one.
+
+        A folder listed before costs a single call when nothing changed;
+        otherwise only the added, changed and deleted files come back.
+        An expired cursor falls back to a full listing.
+
+        Args:
+            path: Folder to sync
+
+        Returns:
+            SyncEntry objects for the files currently in the folder
+        """
+        cursor = self.manifest.cursor(path)
+        result = None
+        if cursor:
+            logger.info(f"Checking Dropbox folder for changes: {path}")
+            try:
+                result = await self.transport.list_folder_continue(cursor)
+            except ApiError as e:
+                if not isinstance(e.error, ListFolderContinueError):
+                    raise
+                if e.error.is_reset():
+                    logger.info(f"Listing cursor for {path} expired, listing in full")
+                else:
+                    logger.info(f"Listing cursor for {path} is no longer valid, listing in full")
+
+        if result is None:
+            self.manifest.reset_folder(path)
+            logger.info(f"Listing files in Dropbox folder: {path}")
+            try:
+                result = await self.transport.list_folder(path, recursive=True)
+            except ApiError as e:
+                if e.error.is_path() and e.error.get_path().is_not_found():
+                    logger.warning(f"Path {path} not found in Dropbox")
+                    return []
+                raise
+
+        changed = 0
+        while True:
+            for entry in result.entries:
+                if isinstance(entry, FileMetadata):
+                    changed += 1
+                    self.manifest.upsert(path, SyncEntry(
+                        path_lower=entry.path_lower,
+                        path_display=entry.path_display,
+                        name=entry.name,
+                        rev=entry.rev,
+                        content_hash=entry.content_hash,
+                        size=entry.size,
+                        server_modified=entry.server_modified
+                    ))
+                elif isinstance(entry, DeletedMetadata):
+                    changed += 1
+                    self.manifest.remove(path, entry.path_lower)
+
+            if not result.has_more:
+                break
+
+            result = await self.transport.list_folder_continue(result.cursor)
+
+        self.manifest.set_cursor(path, result.cursor)
+        files = self.manifest.entries(path)
+        logger.info(f"Found {len(files)} total files in {path} ({changed} changes since last sync)")
+        return files
+
+    async def _download_to_blob(self, entry: Union[FileMetadata, SyncEntry]) -> str:
+        """
+        Stream a file from Dropbox into the blob store.
         
         Args:
-            entry: FileMetadata object
-            total_files: Total number of files to download
-            index: Current file index
+            entry: FileMetadata or SyncEntry with a content hash
             
         Returns:
-            Dictionary containing file metadata and content
+            Path of the stored blob, pinned for the caller
         """
-        try:
-            logger.info(f"Downloading {entry.path_display} ({index}/{total_files})...")
-            
-            # Use ThreadPoolExecutor for blocking Dropbox API calls
-            metadata, response = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                lambda: self.dbx.files_download(entry.path_lower)
-            )
-            
-            # Read the content
-            content = response.raw.read()
+        stats = DownloadStats()
+        path = await self.blob_store.put(entry.content_hash, self._download_chunks(entry, stats))
+        self._record_download(entry, stats)
+        return path
+
+    async def _download_to_handle(self, entry: Union[FileMetadata, SyncEntry]) -> DocumentHandle:
+        """
+        Stream a file from Dropbox into a spooled document handle.
+        
+        Args:
+            entry: FileMetadata or SyncEntry object
             
-            logger.info(f"Successfully downloaded {entry.name} ({len(content)} bytes)")
+        Returns:
+            Finished DocumentHandle holding the file's bytes
+        """
+        stats = DownloadStats()
+        document = await DocumentHandle.from_async_chunks(
+            entry.name,
+            self._download_chunks(entry, stats),
+            # Resumable downloads go straight to disk
+            spool_threshold=0 if self._resumable(entry) else self.spool_threshold,
+            spool_dir=self.spool_dir
+        )
+        self._record_download(entry, stats)
+        return document
+
+    def _resumable(self, entry: Union[FileMetadata, SyncEntry]) -> bool:
+        """Whether a file is large enough to be downloaded with resume on failure."""
+        return entry.size is not None and entry.size >= self.resume_threshold
+
+    def _download_chunks(self, entry: Union[FileMetadata, SyncEntry], stats: DownloadStats) -> AsyncIterator[bytes]:
+        """
+        Stream a file's bytes from Dropbox.
+        
+        Files above the resume threshold are re-requested from the last
+        received byte with a Range header when the connection drops.
+        
+        Args:
+            entry: FileMetadata or SyncEntry object
+            stats: Statistics filled in as the download progresses
             
-            return {
-                'name': entry.name,
-                'path': entry.path_display,
-                'content': content
-            }
-        except ApiError as e:
-            logger.error(f"Error downloading {entry.path_display}: {e}")
-            return None
+        Returns:
+            Asynchronous iterator over the file's bytes
+        """
+        def open_range(offset: int):
+            return self.transport.download(entry.path_lower, rev=entry.rev, offset=offset)
         
-    async def fetch_reports(self, config) -> List[Dict[str, Union[str, BinaryIO]]]:
+        return resumable_chunks(
+            open_range,
+            entry.size,
+            DOWNLOAD_CHUNK_SIZE,
+            max_resumes=self.max_resumes if self._resumable(entry) else 0,
+            stats=stats,
+            name=entry.path_display
+        )
+
+    def _record_download(self, entry: Union[FileMetadata, SyncEntry], stats: DownloadStats) -> None:
+        """Add a finished download to the throughput statistics."""
+        self.download_throughput.add(stats.mb_per_second)
+        self.download_resumes += stats.resumes
+        if self._resumable(entry) or stats.resumes:
+            logger.info(f"Downloaded {entry.path_display}: {stats}")
+        else:
+            logger.debug(f"Downloaded {entry.path_display}: {stats}")
+
+    async def _fetch_blob(self, entry: Union[FileMetadata, SyncEntry], total_files: int, index: int) -> Tuple[str, bool]:
         """
-        Fetch PDF reports from Dropbox using concurrent downloads.
-        Tries multiple dates until finding a folder with PDF files.
+        Get a file from the blob store, downloading it at most once per content hash.
+        
+        Files with the same content listed concurrently share one download.
         
         Args:
-            config: Application configuration
+            entry: FileMetadata or SyncEntry with a content hash
+            total_files: Total number of files to download
+            index: Current file index
             
         Returns:
-            List of dictionaries containing file names and binary streams
+            Tuple of (path of the blob, pinned for the caller; whether this
+            call downloaded it)
         """
+        key = entry.content_hash
+        path = self.blob_store.checkout(key)
+        if path is not None:
+            return path, False
+
+        pending = self._blob_downloads.get(key)
+        if pending is not None:
+            await pending
+            path = self.blob_store.checkout(key)
+            if path is not None:
+                return path, False
+
+        logger.info(f"Downloading {entry.path_display} ({index}/{total_files})...")
+        pending = asyncio.ensure_future(self._download_to_blob(entry))
+        self._blob_downloads[key] = pending
         try:
-            pacific_tz = pytz.timezone("US/Pacific")
-            current_date = datetime.now(pacific_tz)
-            max_days_back = 7  # Maximum number of days to look back
-            
-            for days_back in range(max_days_back):
-                check_date = current_date - timedelta(days=days_back)
-                
-                # Format components with non-zero-padded day
-                year = check_date.year
-                month_name = check_date.strftime('%B')
-                mon_abbr = check_date.strftime('%b')
-                day = str(check_date.day)
-                
-                # Construct folder path
-                folder_path = f"/Current/{year}/{month_name}/{mon_abbr} {day}"
-                logger.info(f"Checking Dropbox folder path: {folder_path}")
-                
-                # List all files recursively
-                all_files = self._list_folder_recursive(folder_path)
-                
-                # Filter for PDFs and sort by modification date
-                pdf_entries = [
-                    entry for entry in all_files 
-                    if isinstance(entry, FileMetadata) and entry.name.lower().endswith('.pdf')
-                ]
-                
-                if pdf_entries:
-                    logger.info(f"Found PDF files in folder: {folder_path}")
-                    pdf_entries.sort(key=lambda x: x.server_modified, reverse=True)
-                    break
-                else:
-                    logger.info(f"No PDF files found in {folder_path}, checking previous day...")
-                    
-            if not pdf_entries:
-                logger.warning(f"No PDF files found in the last {max_days_back} days")
-                return []
-            
-            # Create download tasks for each PDF
-            total_files = len(pdf_entries)
-            download_tasks = [
-                self._download_file(entry, total_files, i)
-                for i, entry in enumerate(pdf_entries, 1)
-            ]
-            
-            # Download files concurrently
-            pdf_files = await asyncio.gather(*download_tasks)
+            return await pending, True
+        finally:
+            if self._blob_downloads.get(key) is pending:
+                del self._blob_downloads[key]
+
+    async def _download_file(self, entry: Union[FileMetadata, SyncEntry], total_files: int, index: int) -> Optional[Dict[str, Union[str, DocumentHandle]]]:
+        """
+        Download a single file from Dropbox asynchronously.
+        
+        Files already in the blob store are read from there instead.
+        
+        Args:
+            entry: FileMetadata object, or SyncEntry when syncing incrementally
+            total_files: Total number of files to download
+            index: Current file index
             
-            # Filter out failed downloads
-            pdf_files = [f for f in pdf_files if f is not None]
+        Returns:
+            Dictionary containing file metadata and a DocumentHandle with the
+            content; the consumer releases the handle after extraction.
+            None if the download failed, so the report is skipped.
+        """
+        try:
+            if self.blob_store is not None and entry.content_hash:
+                path, downloaded = await self._fetch_blob(entry, total_files, index)
+                document = DocumentHandle.from_file(
+                    entry.name,
+                    path,
+                    on_release=partial(self.blob_store.release, entry.content_hash)
+                )
+                if not downloaded:
+                    logger.info(f"Reusing stored copy of {entry.path_display} ({index}/{total_files})")
+            else:
+                logger.info(f"Downloading {entry.path_display} ({index}/{total_files})...")
+                document = await self._download_to_handle(entry)
+                downloaded = True
             
-            logger.info(f"Successfully downloaded {len(pdf_files)} PDF files")
-            return pdf_files
+            if downloaded:
+                logger.info(
+                    f"Successfully downloaded {entry.name} ({document.size} bytes"
+                    f"{', spooled to disk' if document.on_disk else ''})"
+                )
             
-        except ApiError as e:
-            logger.error(f"Dropbox API error: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Error fetching reports: {e}")
-            raise
+            return {
+                'name': entry.name,
+                'path': entry.path_display,
+                'document': document
+            }
+        except TRANSPORT_ERRORS + (ContentHashMismatch,) + RESUMABLE_ERRORS as e:
+            logger.error(f"Error downloading {entry.path_display}: {e}")
+            return None
+        
+    async def _list_day_folder(self, path: str) -> List[Union[FileMetadata, SyncEntry]]:
+        """List a day folder, incrementally when a sync manifest is configured."""
+        if self.manifest is not None:
+            return await self._sync_folder(path)
+        return await self._list_folder_recursive(path)
+
+    async def _open_report(self, entry: Union[FileMetadata, SyncEntry], total_files: int, index: int) -> Optional[Dict[str, Union[str, DocumentHandle]]]:
+        """Download a listed report, or read it from the blob store."""
+        return await self._download_file(entry, total_files, index)
+
+    def _known_report_folder(self, folder_paths: List[str]) -> Optional[int]:
+        """Find the newest day folder whose manifest state held reports at its last sync."""
+        if self.manifest is None:
+            return None
+        for index, path in enumerate(folder_paths):
+            if self.manifest.cursor(path) and any(
+                entry.name.lower().endswith('.pdf') for entry in self.manifest.entries(path)
+            ):
+                return index
+        return None
+
+    def _listing_finished(self) -> None:
+        """Persist the cursors of the day folders just listed."""
+        if self.manifest is not None:
+            self.manifest.save()
+
+    async def close(self) -> None:
+        """Close the transport's connection pool."""
+        await self.transport.close()
+        await super().close()
+
+    def _log_fetch_stats(self) -> None:
+        if self.download_throughput.count:
+            logger.info(
+                f"Download throughput (MB/s): {self.download_throughput}, "
+                f"{self.download_resumes} resumes"
+            )
+        if self.blob_store is not None:
+            logger.info(f"Blob store: {self.blob_store.stats}")
@@ -0,0 +1,252 @@
+"""Async transport for the Dropbox API over a pooled HTTP session."""
+
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+import aiohttp
+from dropbox import auth, files
+from dropbox.exceptions import ApiError, AuthError, BadInputError, DropboxException, HttpError, InternalServerError, RateLimitError
+from dropbox.stone_serializers import json_compat_obj_decode
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.dropboxapi.com/2"
+CONTENT_URL = "https://content.dropboxapi.com/2"
+TOKEN_URL = "https://api.dropboxapi.com/oauth2/token"
+
+DEFAULT_MAX_CONNECTIONS = 16
+KEEPALIVE_SECONDS = 30.0
+TOKEN_REFRESH_MARGIN = 300  # Refresh access tokens 5 minutes before they expire
+MAX_RETRIES = 4  # Retries of requests that hit a rate limit or a server error
+RETRY_BACKOFF_SECONDS = 1.0  # Doubled after every retry, unless the server sets Retry-After
+
+# Errors a request can raise: decoded SDK errors, or aiohttp's when the connection or token refresh fails
+TRANSPORT_ERRORS = (DropboxException, aiohttp.ClientError)
+
+class DropboxTransport:
+    """
+    Async access to the Dropbox endpoints used for fetching reports.
+
+    All requests go through one aiohttp session, so connections are pooled
+    and kept alive, and share one access token. When the token nears expiry
+    or is rejected, it is refreshed once for every request waiting on it.
+    Responses and errors are decoded into the Dropbox SDK's types
+    (ListFolderResult, ApiError, ...), so callers handle them as they would
+    the results of SDK calls.
+    """
+
+    def __init__(
+        self,
+        refresh_token: str,
+        app_key: str,
+        app_secret: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        read_timeout: float = 60.0
+    ):
+        """
+        Initialize DropboxTransport.
+
+        Args:
+            refresh_token: OAuth2 refresh token
+            app_key: Dropbox app key
+            app_secret: Dropbox app secret
+            max_connections: Maximum number of requests in flight at once
+            read_timeout: Seconds to wait for data on a connection before failing
+        """
+        self.refresh_token = refresh_token
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.max_connections = max_connections
+        self.read_timeout = read_timeout
+        self.api_url = API_URL
+        self.content_url = CONTENT_URL
+        self.token_url = TOKEN_URL
+        self.token_refreshes = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._access_token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, opening it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=KEEPALIVE_SECONDS
+                ),
+                # No total timeout: large downloads may take a while
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=self.read_timeout)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and its pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get_access_token(self, rejected: Optional[str] = None) -> str:
+        """
+        Get a valid access token, refreshing it when needed.
+
+        Args:
+            rejected: Token the server just refused; it is replaced unless
+                    another request already did so
+
+        Returns:
+            Access token
+        """
+        async with self._token_lock:
+            if (
+                self._access_token is not None
+                and self._access_token != rejected
+                and time.monotonic() < self._token_expires_at
+            ):
+                return self._access_token
+
+            logger.info("Refreshing Dropbox access token")
+            async with self._get_session().post(self.token_url, data={
+                'grant_type': 'refresh_token',
+                'refresh_token': self.refresh_token,
+                'client_id': self.app_key,
+                'client_secret': self.app_secret
+            }) as response:
+                request_id = response.headers.get('X-Dropbox-Request-Id')
+                if response.status == 400:
+                    body = await response.json(content_type=None)
+                    if body.get('error') == 'invalid_grant':
+                        raise AuthError(request_id, auth.AuthError.invalid_access_token)
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+
+            self._access_token = body['access_token']
+            self._token_expires_at = time.monotonic() + body.get('expires_in', 0) - TOKEN_REFRESH_MARGIN
+            self.token_refreshes += 1
+            return self._access_token
+
+    async def _raise_for_error(self, response: aiohttp.ClientResponse, route) -> None:
+        """
+        Raise the SDK exception matching an error response.
+
+        Args:
+            response: Response with a status other than 200 or 206
+            route: SDK route whose error type describes 409 responses
+
+        Raises:
+            ApiError, AuthError, RateLimitError, BadInputError,
+            InternalServerError or HttpError
+        """
+        request_id = response.headers.get('X-Dropbox-Request-Id')
+        text = await response.text()
+        if response.status >= 500:
+            raise InternalServerError(request_id, response.status, text)
+        if response.status == 400:
+            raise BadInputError(request_id, text)
+        if response.status in (401, 409, 429):
+            try:
+                body = json.loads(text) if response.content_type == 'application/json' else {}
+            except ValueError:
+                body = {}
+            if not isinstance(body, dict):
+                body = {}
+            if response.status == 401:
+                raise AuthError(request_id, json_compat_obj_decode(
+                    auth.AuthError_validator, body.get('error', {}), strict=False
+                ))
+            if response.status == 429:
+                backoff = response.headers.get('Retry-After')
+                raise RateLimitError(request_id, backoff=int(backoff) if backoff else None)
+            if body.get('error') is None:
+                raise HttpError(request_id, response.status, text)
+            user_message = body.get('user_message') or {}
+            raise ApiError(
+                request_id,
+                json_compat_obj_decode(route.error_type, body['error'], strict=False),
+                user_message.get('text'),
+                user_message.get('locale')
+            )
+        raise HttpError(request_id, response.status, text)
+
+    async def _send(self, method: str, url: str, route, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Send an authorized request.
+
+        A rejected token is refreshed and the request sent again once; rate
+        limited requests and server errors are retried with backoff, as the
+        SDK does.
+
+        Returns:
+            Successful response; the caller releases it
+
+        Raises:
+            The SDK exception matching an error response
+        """
+        headers = kwargs.pop('headers', {})
+        token = await self._get_access_token()
+        refreshed = False
+        retries = 0
+        while True:
+            response = await self._get_session().request(
+                method, url, headers={**headers, 'Authorization': f"Bearer {token}"}, **kwargs
+            )
+            if response.status in (200, 206):
+                return response
+            try:
+                if response.status == 401 and not refreshed:
+                    refreshed = True
+                    token = await self._get_access_token(rejected=token)
+                    continue
+                if (response.status == 429 or response.status >= 500) and retries < MAX_RETRIES:
+                    delay = float(response.headers.get('Retry-After') or RETRY_BACKOFF_SECONDS * 2 ** retries)
+                    retries += 1
+                    logger.warning(
+                        f"Dropbox request to {url} failed with status {response.status}; "
+                        f"retrying in {delay:.0f}s ({retries}/{MAX_RETRIES})"
+                    )
+                else:
+                    await self._raise_for_error(response, route)
+            finally:
+                response.release()
+            await asyncio.sleep(delay)
+
+    async def _rpc(self, route, arg: Dict[str, Any]) -> Any:
+        """Call an RPC endpoint and decode its result into the route's SDK type."""
+        response = await self._send('POST', f"{self.api_url}/files/{route.name}", route, json=arg)
+        try:
+            result = await response.json(content_type=None)
+        finally:
+            response.release()
+        return json_compat_obj_decode(route.result_type, result, strict=False)
+
+    async def list_folder(self, path: str, recursive: bool = False) -> files.ListFolderResult:
+        """Asynchronous counterpart of Dropbox.files_list_folder."""
+        return await self._rpc(files.list_folder, {'path': path, 'recursive': recursive})
+
+    async def list_folder_continue(self, cursor: str) -> files.ListFolderResult:
+        """Asynchronous counterpart of Dropbox.files_list_folder_continue."""
+        return await self._rpc(files.list_folder_continue, {'cursor': cursor})
+
+    async def download(self, path: str, rev: Optional[str] = None, offset: int = 0) -> aiohttp.ClientResponse:
+        """
+        Start downloading a file.
+
+        Args:
+            path: Path of the file
+            rev: Optional revision to download
+            offset: Byte to start from; a server that ignores the range
+                    answers 200 with the whole file instead of 206
+
+        Returns:
+            Response whose body is the file; the caller reads it with
+            response.content and releases it
+        """
+        arg = {'path': path}
+        if rev:
+            arg['rev'] = rev
+        headers = {'Dropbox-API-Arg': json.dumps(arg)}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+        return await self._send('POST', f"{self.content_url}/files/download", files.download, headers=headers)
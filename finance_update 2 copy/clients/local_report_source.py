@@ -0,0 +1,96 @@
+"""Report source reading a local copy of the Dropbox report folders."""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import Dict, List, Optional, Union
+import pytz
+from clients.report_source import ReportSource
+from utils.document_handle import DocumentHandle
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class LocalReportEntry:
+    """A report file found under the local root."""
+    name: str
+    path_display: str  # Path in the Dropbox layout, e.g. /Current/2025/March/Mar 3/a.pdf
+    file_path: str
+    server_modified: datetime
+
+class LocalReportSource(ReportSource):
+    """
+    Reports read from a local directory with the Dropbox folder layout.
+
+    The root holds Current/{year}/{Month}/{Mon D} folders, as a copy of the
+    Dropbox tree would, so the pipeline can run offline against a frozen
+    corpus. Reports are read in place; releasing them leaves the files.
+    """
+
+    def __init__(self, root_dir: str, as_of: Optional[date] = None, max_workers: int = 5):
+        """
+        Initialize LocalReportSource.
+
+        Args:
+            root_dir: Directory containing the Current folder
+            as_of: Optional day the lookback starts from (defaults to today),
+                    so a frozen corpus keeps resolving to the same folder
+            max_workers: Maximum number of folders listed at once
+        """
+        super().__init__(max_workers=max_workers)
+        self.root_dir = root_dir
+        self.as_of = as_of
+
+    def _current_date(self) -> datetime:
+        if self.as_of is None:
+            return super()._current_date()
+        return datetime(self.as_of.year, self.as_of.month, self.as_of.day)
+
+    def _local_path(self, path: str) -> str:
+        """Map a Dropbox-layout path to a path under the root."""
+        return os.path.join(self.root_dir, *path.strip('/').split('/'))
+
+    async def _list_day_folder(self, path: str) -> List[LocalReportEntry]:
+        """List all files under a day folder recursively, on the executor."""
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, self._walk_day_folder, path
+        )
+
+    def _walk_day_folder(self, path: str) -> List[LocalReportEntry]:
+        """Walk a day folder for files."""
+        folder = self._local_path(path)
+        if not os.path.isdir(folder):
+            logger.info(f"Path {path} not found under {self.root_dir}")
+            return []
+
+        files = []
+        for dir_path, _, file_names in os.walk(folder):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                relative = os.path.relpath(file_path, folder).replace(os.sep, '/')
+                files.append(LocalReportEntry(
+                    name=file_name,
+                    path_display=f"{path}/{relative}",
+                    file_path=file_path,
+                    server_modified=datetime.fromtimestamp(os.path.getmtime(file_path), pytz.utc)
+                ))
+
+        logger.info(f"Found {len(files)} total files in {path}")
+        return files
+
+    async def _open_report(self, entry: LocalReportEntry, total_files: int, index: int) -> Optional[Dict[str, Union[str, DocumentHandle]]]:
+        """Open a report file in place."""
+        try:
+            document = DocumentHandle.from_file(entry.name, entry.file_path)
+        except OSError as e:
+            logger.error(f"Error reading {entry.file_path}: {e}")
+            return None
+
+        logger.info(f"Opened {entry.path_display} ({index}/{total_files}, {document.size} bytes)")
+        return {
+            'name': entry.name,
+            'path': entry.path_display,
+            'document': document
+        }
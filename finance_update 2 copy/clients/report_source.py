@@ -0,0 +1,370 @@
+"""Common interface of the places reports are fetched from."""
+
+import logging
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+import pytz
+from utils.document_handle import DocumentHandle
+from utils.blob_store import stream_content_hash
+
+logger = logging.getLogger(__name__)
+
+LOOKBACK_DAYS = 7  # Day folders checked for reports, starting today
+DEFAULT_REPORT_QUEUE_SIZE = 4  # Reports waiting for extraction when streaming
+
+class ReportSource(ABC):
+    """
+    A tree of day folders of PDF reports laid out as /Current/{year}/{Month}/{Mon D}.
+
+    Subclasses list a day folder and open one of its reports; finding the
+    most recent day with reports, fetching them concurrently and streaming
+    them are shared. Each report is returned as a dictionary with 'name',
+    'path', 'document' (a DocumentHandle the consumer releases after
+    extraction) and 'aliases' (paths of other copies of the same PDF, which
+    are not opened).
+    """
+
+    def __init__(self, max_workers: int = 5):
+        """
+        Initialize ReportSource.
+
+        Args:
+            max_workers: Maximum number of folders listed or reports opened at once
+        """
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Shared by all streams, so concurrent backfill days split one budget
+        self._open_slots = asyncio.Semaphore(max_workers)
+
+    @abstractmethod
+    async def _list_day_folder(self, path: str) -> List[Any]:
+        """
+        List the files under a day folder, recursively.
+
+        Args:
+            path: Day folder path, e.g. /Current/2025/March/Mar 3
+
+        Returns:
+            Entries with at least 'name' and 'server_modified' attributes;
+            empty if the folder does not exist
+        """
+
+    @abstractmethod
+    async def _open_report(self, entry: Any, total_files: int, index: int) -> Optional[Dict[str, Union[str, DocumentHandle]]]:
+        """
+        Open one listed report.
+
+        Args:
+            entry: Entry returned by _list_day_folder
+            total_files: Total number of reports being opened
+            index: Current report index
+
+        Returns:
+            Report dictionary, or None if the report could not be opened
+        """
+
+    def _current_date(self) -> datetime:
+        """Get the day the lookback window starts from."""
+        return datetime.now(pytz.timezone("US/Pacific"))
+
+    def _content_key(self, entry: Any) -> Optional[str]:
+        """Get the content hash of a listed report, or None if it is only known once opened."""
+        return getattr(entry, 'content_hash', None)
+
+    def _known_report_folder(self, folder_paths: List[str]) -> Optional[int]:
+        """
+        Find the newest folder known to have held reports when it was last listed.
+
+        Args:
+            folder_paths: Day folders of the lookback window, newest first
+
+        Returns:
+            Index of that folder in folder_paths, or None if nothing is known
+        """
+        return None
+
+    def _listing_finished(self) -> None:
+        """Hook run after the day folders have been listed."""
+
+    def _log_fetch_stats(self) -> None:
+        """Hook run after reports have been fetched or streamed."""
+
+    async def close(self) -> None:
+        """Release the worker threads and connections held by the source."""
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def _day_folder_path(day: date) -> str:
+        """Get the folder holding the reports of a day, e.g. /Current/2025/March/Mar 3."""
+        # Format components with non-zero-padded day
+        return f"/Current/{day.year}/{day.strftime('%B')}/{day.strftime('%b')} {day.day}"
+
+    async def _find_report_entries(self, day: Optional[date] = None) -> List[Any]:
+        """
+        Find the PDF reports of the most recent day folder that has any.
+
+        All day folders in the lookback window are probed concurrently, so
+        the wait before the first report does not grow with the number of
+        empty days. When the source knows which folder held reports at the
+        last listing, only that folder and the newer ones are probed, so an
+        unchanged re-run does not list the whole window; older folders are
+        only probed if none of these hold reports any more.
+
+        Args:
+            day: Optional day whose folder alone is listed, without lookback
+
+        Returns:
+            Entries of the PDF reports, newest first
+        """
+        if day is not None:
+            folder_paths = [self._day_folder_path(day)]
+        else:
+            current_date = self._current_date()
+            folder_paths = [
+                self._day_folder_path(current_date - timedelta(days=days_back))
+                for days_back in range(LOOKBACK_DAYS)
+            ]
+        logger.info(f"Checking folder paths: {folder_paths[-1]} to {folder_paths[0]}")
+
+        batches = [folder_paths]
+        known = self._known_report_folder(folder_paths) if day is None else None
+        if known is not None:
+            batches = [folder_paths[:known + 1], folder_paths[known + 1:]]
+
+        pdf_entries = []
+        for batch in batches:
+            # List the batch's folders recursively
+            listings = await asyncio.gather(*[
+                self._list_day_folder(folder_path)
+                for folder_path in batch
+            ])
+
+            for folder_path, all_files in zip(batch, listings):
+                # Filter for PDFs and sort by modification date
+                pdf_entries = [
+                    entry for entry in all_files
+                    if entry.name.lower().endswith('.pdf')
+                ]
+
+                if pdf_entries:
+                    logger.info(f"Found PDF files in folder: {folder_path}")
+                    pdf_entries.sort(key=lambda x: x.server_modified, reverse=True)
+                    break
+                else:
+                    logger.info(f"No PDF files found in {folder_path}, checking previous day...")
+            if pdf_entries:
+                break
+
+        if not pdf_entries:
+            logger.warning(f"No PDF files found in the last {len(folder_paths)} days")
+
+        self._listing_finished()
+        return pdf_entries
+
+    def _drop_duplicate_entries(self, pdf_entries: List[Any]) -> Tuple[List[Any], Dict[str, List[str]]]:
+        """
+        Keep one copy of each report listed more than once, by content hash.
+
+        The same PDF often lands in several subfolders or under different
+        file names; only its newest listing is opened.
+
+        Args:
+            pdf_entries: Listed reports, newest first
+
+        Returns:
+            Tuple of (entries to open; paths of the dropped copies, keyed by
+            the path of the copy that is kept)
+        """
+        kept = []
+        primaries: Dict[str, Any] = {}
+        aliases: Dict[str, List[str]] = {}
+        for entry in pdf_entries:
+            key = self._content_key(entry)
+            primary = primaries.get(key) if key else None
+            if primary is not None:
+                aliases[primary.path_display].append(entry.path_display)
+                continue
+            if key:
+                primaries[key] = entry
+            aliases[entry.path_display] = []
+            kept.append(entry)
+
+        duplicates = len(pdf_entries) - len(kept)
+        if duplicates:
+            logger.info(f"Skipping {duplicates} duplicate PDF files with the same content")
+        return kept, aliases
+
+    async def _open_unique(
+        self,
+        entry: Any,
+        total_files: int,
+        index: int,
+        aliases: Dict[str, List[str]],
+        opened: Dict[str, Dict]
+    ) -> Optional[Dict[str, Union[str, DocumentHandle]]]:
+        """
+        Open a report unless its bytes match a report already opened.
+
+        Reports listed without a content hash are hashed once opened; a
+        copy of a report opened before is released and recorded as one of
+        its aliases instead.
+
+        Args:
+            entry: Entry returned by _list_day_folder
+            total_files: Total number of reports being opened
+            index: Current report index
+            aliases: Paths of duplicate copies keyed by kept path, from
+                    _drop_duplicate_entries
+            opened: Reports opened so far, keyed by content hash
+
+        Returns:
+            Report dictionary with its 'aliases', or None if it could not be
+            opened or duplicates another report
+        """
+        record = await self._open_report(entry, total_files, index)
+        if record is None:
+            return None
+        record['aliases'] = aliases.setdefault(record['path'], [])
+
+        key = self._content_key(entry)
+        if not key:
+            # Byte hash fallback, in the same form as Dropbox content hashes
+            key = await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._hash_document, record['document']
+            )
+        original = opened.get(key)
+        if original is None:
+            opened[key] = record
+            return record
+
+        logger.info(f"Skipping {record['path']}: same content as {original['path']}")
+        original['aliases'].extend([record['path']] + record['aliases'])
+        record['document'].release()
+        return None
+
+    @staticmethod
+    def _hash_document(document: DocumentHandle) -> str:
+        """Compute the Dropbox content hash of an opened report."""
+        stream = document.open_stream()
+        try:
+            return stream_content_hash(stream)
+        finally:
+            stream.close()
+
+    async def fetch_reports(self, config, day: Optional[date] = None) -> List[Dict[str, Union[str, DocumentHandle]]]:
+        """
+        Fetch the PDF reports of the most recent day with any, concurrently.
+
+        Args:
+            config: Application configuration
+            day: Optional day to fetch instead of the most recent one
+
+        Returns:
+            List of dictionaries containing file names and document handles
+        """
+        try:
+            pdf_entries = await self._find_report_entries(day)
+            if not pdf_entries:
+                return []
+            pdf_entries, aliases = self._drop_duplicate_entries(pdf_entries)
+
+            # Open reports concurrently
+            total_files = len(pdf_entries)
+            opened: Dict[str, Dict] = {}
+            pdf_files = await asyncio.gather(*[
+                self._open_unique(entry, total_files, i, aliases, opened)
+                for i, entry in enumerate(pdf_entries, 1)
+            ])
+
+            # Filter out failed and duplicate reports
+            pdf_files = [f for f in pdf_files if f is not None]
+
+            logger.info(f"Successfully fetched {len(pdf_files)} PDF files")
+            self._log_fetch_stats()
+            return pdf_files
+
+        except Exception as e:
+            logger.error(f"Error fetching reports: {e}")
+            raise
+
+    async def iter_reports(
+        self,
+        config,
+        queue_size: int = DEFAULT_REPORT_QUEUE_SIZE,
+        day: Optional[date] = None
+    ) -> AsyncIterator[Dict[str, Union[str, DocumentHandle]]]:
+        """
+        Stream PDF reports as they become available.
+
+        Finds reports like fetch_reports, but yields each one as soon as it
+        is opened, in completion order, so extraction can start while other
+        downloads are still running. Opened reports wait in a queue of
+        queue_size; while it is full, further downloads pause until the
+        consumer catches up. Reports that could not be opened are skipped.
+        A duplicate found only once opened is added to the aliases of the
+        copy yielded earlier, so aliases are complete once the stream ends.
+
+        Args:
+            config: Application configuration
+            queue_size: Maximum number of opened reports waiting to be consumed
+            day: Optional day to stream instead of the most recent one
+
+        Yields:
+            Dictionaries containing file names and document handles; the
+            consumer releases each handle after extraction
+        """
+        try:
+            pdf_entries = await self._find_report_entries(day)
+        except Exception as e:
+            logger.error(f"Error fetching reports: {e}")
+            raise
+        if not pdf_entries:
+            return
+        pdf_entries, aliases = self._drop_duplicate_entries(pdf_entries)
+
+        total_files = len(pdf_entries)
+        opened: Dict[str, Dict] = {}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, 1))
+
+        async def open_report(entry, index: int):
+            async with self._open_slots:
+                try:
+                    result = await self._open_unique(entry, total_files, index, aliases, opened)
+                except Exception as e:
+                    result = e
+                try:
+                    await queue.put(result)
+                except asyncio.CancelledError:
+                    if isinstance(result, dict):
+                        result['document'].release()
+                    raise
+
+        tasks = [
+            asyncio.create_task(open_report(entry, i))
+            for i, entry in enumerate(pdf_entries, 1)
+        ]
+        delivered = 0
+        try:
+            for _ in range(total_files):
+                result = await queue.get()
+                if isinstance(result, Exception):
+                    logger.error(f"Error fetching reports: {result}")
+                    raise result
+                if result is not None:
+                    delivered += 1
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Reports the consumer never took
+            while not queue.empty():
+                result = queue.get_nowait()
+                if isinstance(result, dict):
+                    result['document'].release()
+
+            logger.info(f"Streamed {delivered} of {total_files} PDF files")
+            self._log_fetch_stats()
@@ -62,6 +62,38 @@ class Config:
         self.chunk_ratio = float(os.getenv('CHUNK_RATIO', '0.8'))
         self.token_ratio = float(os.getenv('TOKEN_RATIO', '1.3'))
         
+        # PDF Extraction Settings
+        self.pdf_backend = os.getenv('PDF_BACKEND', 'thread')  # 'thread' or 'process'
+        self.pdf_workers = int(os.getenv('PDF_WORKERS', str(os.cpu_count() or 4)))
+        self.pdf_page_parallel_threshold = int(os.getenv('PDF_PAGE_PARALLEL_THRESHOLD', '40'))
+        self.pdf_pages_per_range = int(os.getenv('PDF_PAGES_PER_RANGE', '16'))
+        self.pdf_extraction_strategy = os.getenv('PDF_EXTRACTION_STRATEGY', 'layout')  # or 'text_layer_first'
+        self.pdf_document_timeout = float(os.getenv('PDF_DOCUMENT_TIMEOUT', '300'))  # Seconds, 0 disables
+        self.pdf_max_pages = int(os.getenv('PDF_MAX_PAGES', '0'))  # 0 means no limit
+        self.pdf_figure_mode = os.getenv('PDF_FIGURE_MODE', 'full')  # or 'skip'
+        self.pdf_table_mode = os.getenv('PDF_TABLE_MODE', 'text')  # or 'tsv'
+        self.remove_repeated_lines = os.getenv('REMOVE_REPEATED_LINES', 'true').lower() == 'true'
+        self.truncate_disclosures = os.getenv('TRUNCATE_DISCLOSURES', 'true').lower() == 'true'
+        self.spool_threshold_mb = float(os.getenv('SPOOL_THRESHOLD_MB', '8'))  # Larger downloads go to disk
+        self.spool_dir = os.getenv('SPOOL_DIR') or None  # Defaults to the system temp dir
+        self.sync_dir = os.getenv('SYNC_DIR', '.cache/dropbox_sync')  # Empty disables incremental sync
+        self.blob_store_dir = os.getenv('BLOB_STORE_DIR', '.cache/dropbox_blobs')  # Empty disables, or uses SYNC_DIR/blobs when syncing
+        self.blob_store_max_mb = int(os.getenv('BLOB_STORE_MAX_MB', '2048'))
+        self.download_resume_threshold_mb = float(os.getenv('DOWNLOAD_RESUME_THRESHOLD_MB', '16'))  # Larger downloads resume
+        self.download_max_resumes = int(os.getenv('DOWNLOAD_MAX_RESUMES', '5'))
+        self.dropbox_max_connections = int(os.getenv('DROPBOX_MAX_CONNECTIONS', '16'))  # Concurrent Dropbox requests
+        self.report_queue_size = int(os.getenv('REPORT_QUEUE_SIZE', '4'))  # Downloaded reports waiting for extraction
+        self.backfill_max_days = int(os.getenv('BACKFILL_MAX_DAYS', '2'))  # Days processed at once when backfilling
+        self.extraction_cache_dir = os.getenv('EXTRACTION_CACHE_DIR', '.cache/extraction')  # Empty disables
+        self.extraction_cache_max_mb = int(os.getenv('EXTRACTION_CACHE_MAX_MB', '512'))
+        self.page_cache_dir = os.getenv('PAGE_CACHE_DIR', '.cache/extraction_pages')  # Empty disables
+        self.page_cache_max_mb = int(os.getenv('PAGE_CACHE_MAX_MB', '256'))
+        
+        # Report Source Settings
+        self.report_source = os.getenv('REPORT_SOURCE', 'dropbox')  # or 'local'
+        self.local_reports_dir = os.getenv('LOCAL_REPORTS_DIR', 'reports')  # Holds Current/{year}/{Month}/{Mon D}
+        self.report_date = os.getenv('REPORT_DATE') or None  # YYYY-MM-DD lookback start for local reports
+        
         # Proxy Settings
         self.http_proxy = os.getenv('HTTP_PROXY')
         self.https_proxy = os.getenv('HTTPS_PROXY')
@@ -82,6 +114,28 @@ class Config:
         logger.debug(f"Max Chunk Size: {self.max_chunk_size}")
         logger.debug(f"Chunk Ratio: {self.chunk_ratio}")
         logger.debug(f"Token Ratio: {self.token_ratio}")
+        logger.debug(f"PDF Backend: {self.pdf_backend}")
+        logger.debug(f"PDF Workers: {self.pdf_workers}")
+        logger.debug(f"PDF Page-Parallel Threshold: {self.pdf_page_parallel_threshold}")
+        logger.debug(f"PDF Extraction Strategy: {self.pdf_extraction_strategy}")
+        logger.debug(f"PDF Document Timeout: {self.pdf_document_timeout or 'disabled'}")
+        logger.debug(f"PDF Max Pages: {self.pdf_max_pages or 'unlimited'}")
+        logger.debug(f"PDF Figure Mode: {self.pdf_figure_mode}")
+        logger.debug(f"PDF Table Mode: {self.pdf_table_mode}")
+        logger.debug(f"Remove Repeated Lines: {self.remove_repeated_lines}")
+        logger.debug(f"Truncate Disclosures: {self.truncate_disclosures}")
+        logger.debug(f"Spool Threshold: {self.spool_threshold_mb} MB in {self.spool_dir or 'system temp dir'}")
+        logger.debug(f"Report Source: {self.report_source}")
+        if self.report_source == 'local':
+            logger.debug(f"Local Reports Dir: {self.local_reports_dir} (as of {self.report_date or 'today'})")
+        logger.debug(f"Sync Dir: {self.sync_dir or 'disabled'}")
+        logger.debug(f"Blob Store Dir: {self.blob_store_dir or ('under sync dir' if self.sync_dir else 'disabled')}")
+        logger.debug(f"Download Resume Threshold: {self.download_resume_threshold_mb} MB, up to {self.download_max_resumes} resumes")
+        logger.debug(f"Dropbox Max Connections: {self.dropbox_max_connections}")
+        logger.debug(f"Report Queue Size: {self.report_queue_size}")
+        logger.debug(f"Backfill Max Days: {self.backfill_max_days}")
+        logger.debug(f"Extraction Cache Dir: {self.extraction_cache_dir or 'disabled'}")
+        logger.debug(f"Page Cache Dir: {self.page_cache_dir or 'disabled'}")
         if self.http_proxy:
             logger.debug(f"HTTP Proxy configured")
         if self.https_proxy:
@@ -91,12 +145,19 @@ class Config:
         """Validate required configuration settings"""
         required_settings = {
             'OPENAI_API_KEY': self.openai_key,
-            'DROPBOX_REFRESH_TOKEN': self.dropbox_refresh_token,
-            'DROPBOX_APP_KEY': self.dropbox_app_key,
-            'DROPBOX_APP_SECRET': self.dropbox_app_secret,
             'EMAIL_USERNAME': self.sender_email,
             'EMAIL_PASSWORD': self.email_password
         }
+        if self.report_source == 'dropbox':
+            required_settings.update({
+                'DROPBOX_REFRESH_TOKEN': self.dropbox_refresh_token,
+                'DROPBOX_APP_KEY': self.dropbox_app_key,
+                'DROPBOX_APP_SECRET': self.dropbox_app_secret
+            })
+        elif self.report_source != 'local':
+            error_msg = f"Unknown REPORT_SOURCE {self.report_source!r}; expected 'dropbox' or 'local'"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
         
         missing_settings = [
             key for key, value in required_settings.items()
@@ -8,10 +8,10 @@ from collections import defaultdict
 from contextlib import contextmanager
 import time
 import re
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 from config import Config
-from clients.dropbox_client import DropboxClient
+from clients.report_source import ReportSource
 from clients.openai_client import OpenAIClient
 from utils.pdf_processor import PDFProcessor
 from utils.email_handler import EmailSender
@@ -42,20 +42,24 @@ class ReportPipeline:
     def __init__(
         self,
         config: Config,
-        dropbox_client: DropboxClient,
+        report_source: ReportSource,
         pdf_processor: PDFProcessor,
         summarizer_service: SummarizerService,
         email_sender: EmailSender
     ):
         """Initialize pipeline with required services."""
         self.config = config
-        self.dropbox_client = dropbox_client
+        self.report_source = report_source
         self.pdf_processor = pdf_processor
         self.summarizer_service = summarizer_service
         self.email_sender = email_sender
         self.email_notifier = EmailNotifier(EmailSender(config))
         self.analysis_store = AnalysisStore()
         self.start_time = time.time()  # Initialize start_time
+        # Taking a report only once an extraction slot is free leaves the
+        # rest in the download queue, which pauses downloads when full. The
+        # slots are shared by all days of a backfill.
+        self.extraction_slots = asyncio.Semaphore(self.pdf_processor.max_workers)
         
         # Initialize clients
         self.openai_client = OpenAIClient(config.openai_key)
@@ -76,63 +80,66 @@ class ReportPipeline:
             )
         )
 
-    async def run(self):
-        """Run the full report processing pipeline."""
+    async def run(self, report_day: Optional[date] = None, notify: bool = True) -> Optional[str]:
+        """
+        Run the full report processing pipeline.
+
+        Args:
+            report_day: Optional day whose reports are processed; defaults to
+                    the most recent day with reports
+            notify: Whether to email the final analysis once it is stored
+
+        Returns:
+            Path of the stored analysis, or None if none was generated
+        """
         try:
-            logger.info("Starting report processing")
-            
-            # Get PDF files from Dropbox
-            pdf_files = await self.dropbox_client.fetch_reports(self.config)
-            if not pdf_files:
-                logger.warning("No PDF files found")
-                return
-            
-            print(f"\nFound {len(pdf_files)} PDF files\n")
-            
-            # Extract text from PDFs concurrently
-            extraction_tasks = []
-            for pdf_file in pdf_files:
-                task = asyncio.create_task(self.pdf_processor.extract(pdf_file))
-                extraction_tasks.append(task)
+            logger.info(f"Starting report processing{f' for {report_day}' if report_day else ''}")
             
-            # Wait for all extractions to complete
-            extraction_results = await asyncio.gather(*extraction_tasks, return_exceptions=True)
-            
-            # Process results and handle any errors
-            pdf_texts = []
+            # Stream PDF files from the report source, extracting each as soon as it is
+            # downloaded and summarizing each text as soon as it is extracted
             successful_files = []
+            successful_paths = []
             failed_files = []
+            # Paths of skipped copies of each report by its path; filled in until the stream ends
+            source_aliases: Dict[str, List[str]] = {}
+            extracted_texts: asyncio.Queue = asyncio.Queue()
+            summaries_task = asyncio.create_task(
+                self.summarizer_service.generate_initial_summaries_as_ready(
+                    self._drain(extracted_texts),
+                    max_tokens=4000,
+                    model="gpt-4o-mini"
+                )
+            )
             
-            for i, result in enumerate(extraction_results):
-                file_name = pdf_files[i].get('name', f'File {i}')
+            extraction_tasks = []
+            try:
+                async for pdf_file in self.report_source.iter_reports(
+                    self.config,
+                    queue_size=self.config.report_queue_size,
+                    day=report_day
+                ):
+                    await self.extraction_slots.acquire()
+                    source_aliases[self._report_path(pdf_file)] = pdf_file.get('aliases', [])
+                    task = asyncio.create_task(self._extract_and_forward(
+                        pdf_file, extracted_texts, successful_files, successful_paths, failed_files
+                    ))
+                    task.add_done_callback(lambda _: self.extraction_slots.release())
+                    extraction_tasks.append(task)
                 
-                if isinstance(result, Exception):
-                    logger.error(f"Failed to process {file_name}: {str(result)}")
-                    print(f"❌ Failed to process {file_name}")
-                    failed_files.append(file_name)
-                    continue
-                    
-                if result and isinstance(result, dict):
-                    if result.get('error'):
-                        logger.error(f"Error processing {file_name}: {result['error']}")
-                        print(f"❌ Failed to process {file_name}")
-                        failed_files.append(file_name)
-                        continue
-                        
-                    if result.get('text'):
-                        pdf_texts.append(result['text'])
-                        successful_files.append(file_name)
-                        logger.info(f"Successfully extracted text from {file_name}")
-                        logger.info(f"Preview: {result['preview']}")
-                        print(f"✅ Successfully processed {file_name}")
-                    else:
-                        logger.error(f"No text extracted from {file_name}")
-                        print(f"❌ Failed to process {file_name}")
-                        failed_files.append(file_name)
-                else:
-                    logger.error(f"Invalid extraction result for {file_name}")
-                    print(f"❌ Failed to process {file_name}")
-                    failed_files.append(file_name)
+                # Wait for all extractions to complete
+                await asyncio.gather(*extraction_tasks)
+            except BaseException:
+                for task in extraction_tasks + [summaries_task]:
+                    task.cancel()
+                raise
+            await extracted_texts.put(None)
+            initial_summaries = await summaries_task
+            
+            if not extraction_tasks:
+                logger.warning("No PDF files found")
+                return
+            
+            print(f"\nFound {len(extraction_tasks)} PDF files\n")
             
             # Log summary
             print(f"\nProcessing Summary:")
@@ -144,19 +151,13 @@ class ReportPipeline:
                 for file in failed_files:
                     print(f"- {file}")
             
-            if not pdf_texts:
+            if not successful_files:
                 logger.error("No text extracted from PDFs")
                 return None
                 
             # Process extracted texts through the pipeline
             with timing_context("Full Report Processing"):
-                # Stage 1: Generate initial summaries for each PDF
-                initial_summaries = await self.summarizer_service.generate_initial_summaries(
-                    pdf_texts,
-                    max_tokens=4000,
-                    model="gpt-4o-mini"
-                )
-                
+                # Stage 1: Initial summaries for each PDF were generated as texts arrived
                 if not initial_summaries:
                     logger.error("No initial summaries generated")
                     return None
@@ -164,7 +165,10 @@ class ReportPipeline:
                 import os
                 os.makedirs("memlog", exist_ok=True)
                 combined_initial = "\n".join(initial_summaries)
-                file_path = "memlog/combined_initial_summaries.md"
+                file_path = (
+                    f"memlog/combined_initial_summaries_{report_day.isoformat()}.md"
+                    if report_day else "memlog/combined_initial_summaries.md"
+                )
                 with open(file_path, "w") as f:
                     f.write(combined_initial)
                     f.flush()
@@ -193,15 +197,14 @@ class ReportPipeline:
                     print("Preview of final analysis:")
                     print(f"{final_analysis[:100]}...\n")
                     
-                    # Store the analysis
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    analysis_path = f"analysis_archive/{datetime.now().year:04d}/{datetime.now().month:02d}-{datetime.now().strftime('%B')}/{datetime.now().day:02d}"
-                    filename = f"analysis_{timestamp}.json"
-                    
                     # Create analysis object with metadata
                     analysis_data = {
                         "timestamp": datetime.now().isoformat(),
-                        "source_files": successful_files,
+                        "source_files": self._with_aliases(successful_files, successful_paths, source_aliases),
+                        "source_aliases": {
+                            path: source_aliases[path] for path in successful_paths
+                            if source_aliases.get(path)
+                        },
                         "failed_files": failed_files,
                         "analysis": {
                             "raw_text": final_analysis,
@@ -219,14 +222,17 @@ class ReportPipeline:
                         }
                     }
                     
-                    self.analysis_store.store_analysis(
-                        analysis_data
+                    analysis_file = self.analysis_store.store_analysis(
+                        analysis_data,
+                        report_day=report_day
                     )
                     
-                    print(f"💾 Analysis stored at: {analysis_path}/{filename}\n")
+                    print(f"💾 Analysis stored at: {analysis_file}\n")
                     
                     # Send email notification
-                    await self.email_notifier.send_analysis(final_analysis)
+                    if notify:
+                        await self.email_notifier.send_analysis(final_analysis)
+                    return analysis_file
                     
                 else:
                     logger.error("Failed to generate final analysis")
@@ -237,6 +243,181 @@ class ReportPipeline:
             logger.error("Error in report processing pipeline: %s", e, exc_info=True)
             return None
 
+    async def backfill(self, start: date, end: date, max_concurrent_days: int = 2) -> Dict[date, Optional[str]]:
+        """
+        Process the reports of every day from start to end, inclusive.
+
+        Days run concurrently, up to max_concurrent_days at once, through
+        this pipeline's clients and caches; downloads and extractions draw
+        on the same slots whichever day they belong to. Each day's analysis
+        is stored in that day's archive slot and its memlog files; no
+        analysis emails are sent for backfilled days.
+
+        Args:
+            start: First day to process
+            end: Last day to process
+            max_concurrent_days: Maximum number of days processed at once
+
+        Returns:
+            Path of each day's stored analysis, or None for days without one
+        """
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        day_slots = asyncio.Semaphore(max(max_concurrent_days, 1))
+
+        async def run_day(day: date) -> Optional[str]:
+            async with day_slots:
+                logger.info(f"Backfilling reports for {day.isoformat()}")
+                return await self.run(report_day=day, notify=False)
+
+        results = dict(zip(days, await asyncio.gather(*[run_day(day) for day in days])))
+        stored = sum(1 for path in results.values() if path)
+        logger.info(f"Backfill of {start.isoformat()} to {end.isoformat()}: {stored} of {len(days)} days stored")
+        return results
+
+    async def _extract_and_release(self, pdf_file: Dict) -> Dict:
+        """Extract a downloaded PDF, releasing its bytes as soon as extraction finishes."""
+        try:
+            return await self.pdf_processor.extract(pdf_file)
+        finally:
+            self._release_document(pdf_file)
+
+    @staticmethod
+    def _release_document(pdf_file: Dict) -> None:
+        """Release the downloaded bytes of a PDF once it has been extracted."""
+        document = pdf_file.get('document')
+        if document is not None:
+            document.release()
+
+    async def _extract_and_forward(
+        self,
+        pdf_file: Dict,
+        extracted_texts: asyncio.Queue,
+        successful_files: List[str],
+        successful_paths: List[str],
+        failed_files: List[str]
+    ) -> None:
+        """Extract a downloaded PDF, record the outcome and pass the result on for summarization."""
+        file_name = pdf_file.get('name', 'unknown')
+        if await self.pdf_processor.should_stream(pdf_file):
+            await self._stream_and_forward(
+                pdf_file, extracted_texts, successful_files, successful_paths, failed_files
+            )
+            return
+        try:
+            result = await self._extract_and_release(pdf_file)
+        except Exception as e:
+            logger.error(f"Failed to process {file_name}: {str(e)}")
+            print(f"❌ Failed to process {file_name}")
+            failed_files.append(file_name)
+            return
+        
+        if result and isinstance(result, dict):
+            if result.get('error'):
+                logger.error(f"Error processing {file_name}: {result['error']}")
+                print(f"❌ Failed to process {file_name}")
+                failed_files.append(file_name)
+                return
+                
+            if result.get('text'):
+                successful_files.append(file_name)
+                successful_paths.append(self._report_path(pdf_file))
+                # Pass the whole result on, so chunks can resolve page references
+                await extracted_texts.put(result)
+                logger.info(f"Successfully extracted text from {file_name}")
+                logger.info(f"Preview: {result['preview']}")
+                if result.get('partial'):
+                    reason = result.get('stats', {}).get('partial_reason')
+                    print(f"⚠️ Partially processed {file_name} ({reason})")
+                else:
+                    print(f"✅ Successfully processed {file_name}")
+            else:
+                logger.error(f"No text extracted from {file_name}")
+                print(f"❌ Failed to process {file_name}")
+                failed_files.append(file_name)
+        else:
+            logger.error(f"Invalid extraction result for {file_name}")
+            print(f"❌ Failed to process {file_name}")
+            failed_files.append(file_name)
+
+    async def _stream_and_forward(
+        self,
+        pdf_file: Dict,
+        extracted_texts: asyncio.Queue,
+        successful_files: List[str],
+        successful_paths: List[str],
+        failed_files: List[str]
+    ) -> None:
+        """Pass a long PDF on for summarization page by page while it is extracted, then record the outcome."""
+        file_name = pdf_file.get('name', 'unknown')
+        # Unbounded, so extraction never waits on a summary that has given up
+        page_queue: asyncio.Queue = asyncio.Queue()
+        await extracted_texts.put({'name': file_name, 'pages': self._drain(page_queue)})
+        
+        pages_with_text = 0
+        error = None
+        try:
+            pages = self.pdf_processor.iter_pages(pdf_file)
+            try:
+                async for page in pages:
+                    if page.text:
+                        pages_with_text += 1
+                    await page_queue.put(page)
+            finally:
+                await pages.aclose()
+        except Exception as e:
+            error = e
+        finally:
+            page_queue.put_nowait(None)
+            self._release_document(pdf_file)
+        
+        if not pages_with_text:
+            if error is not None:
+                logger.error(f"Failed to process {file_name}: {str(error)}")
+            else:
+                logger.error(f"No text extracted from {file_name}")
+            print(f"❌ Failed to process {file_name}")
+            failed_files.append(file_name)
+            return
+        
+        successful_files.append(file_name)
+        successful_paths.append(self._report_path(pdf_file))
+        if error is not None:
+            # The pages before the error have already been summarized
+            logger.error(f"Error streaming {file_name} after {pages_with_text} pages: {str(error)}")
+            print(f"⚠️ Partially processed {file_name} ({str(error)})")
+        else:
+            logger.info(f"Successfully streamed text from {file_name}")
+            print(f"✅ Successfully processed {file_name}")
+
+    @staticmethod
+    def _report_path(pdf_file: Dict) -> str:
+        """Get the path identifying a report, as same-named reports may sit in different folders."""
+        return pdf_file.get('path') or pdf_file.get('name', 'unknown')
+
+    @staticmethod
+    def _with_aliases(
+        file_names: List[str],
+        file_paths: List[str],
+        source_aliases: Dict[str, List[str]]
+    ) -> List[str]:
+        """List processed files followed by the names of their skipped duplicate copies."""
+        names = list(file_names)
+        for file_path in file_paths:
+            for path in source_aliases.get(file_path, []):
+                alias = path.rsplit('/', 1)[-1]
+                if alias not in names:
+                    names.append(alias)
+        return names
+
+    @staticmethod
+    async def _drain(queue: asyncio.Queue):
+        """Yield items from a queue until a None sentinel arrives."""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            yield item
+
     def extract_section(self, text: str, section_name: str) -> str:
         """Extract a section from the analysis text."""
         pattern = f"{section_name}:?\\s*(.*?)(?=\n\n[A-Z][A-Z\\s]+:|$)"
@@ -3,7 +3,7 @@
 import os
 import json
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -27,27 +27,33 @@ class AnalysisStore:
             os.makedirs(self.base_dir)
             logger.info(f"Created analysis archive directory: {self.base_dir}")
     
-    def store_analysis(self, analysis_data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> str:
+    def store_analysis(
+        self,
+        analysis_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        report_day: Optional[date] = None
+    ) -> str:
         """
         Store an analysis report with metadata.
         
         Args:
             analysis_data: The analysis content to store
             metadata: Additional metadata about the analysis
+            report_day: Day the analysed reports belong to, e.g. when
+                    backfilling (defaults to today)
             
         Returns:
             Path to the stored analysis file
         """
-        # Create timestamp-based directory structure
+        # Create date-based directory structure
         now = datetime.now()
-        year_dir = os.path.join(self.base_dir, str(now.year))
-        month_dir = os.path.join(year_dir, now.strftime("%m-%B"))
-        day_dir = os.path.join(month_dir, now.strftime("%d"))
+        slot = report_day or now
+        year_dir = os.path.join(self.base_dir, str(slot.year))
+        month_dir = os.path.join(year_dir, slot.strftime("%m-%B"))
+        day_dir = os.path.join(month_dir, slot.strftime("%d"))
         
         # Ensure directories exist
-        for dir_path in [year_dir, month_dir, day_dir]:
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
+        os.makedirs(day_dir, exist_ok=True)
         
         # Prepare the complete data structure
         full_data = {
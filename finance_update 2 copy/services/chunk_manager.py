@@ -3,11 +3,12 @@
 import re
 import time
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, AsyncIterator, Any
 from dataclasses import dataclass
 from prometheus_client import Histogram, Counter
 
 from utils.exceptions import ChunkError, create_error_report
+from utils.page_index import PageOffsetIndex
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,7 @@ class ChunkMetadata:
     token_count: int
     sentence_count: int
     paragraph_count: int
+    page_ref: Optional[str] = None  # Pages the chunk came from, e.g. '3' or '3-4'
 
 class ChunkManager:
     """Handles text chunking strategies and optimization."""
@@ -70,7 +72,13 @@ class ChunkManager:
             r'(?<=\n)\s*(?=[A-Z])'
         ]
 
-    def chunk_text(self, text: str, preserve_context: bool = True, max_tokens: Optional[int] = None) -> List[Tuple[str, ChunkMetadata]]:
+    def chunk_text(
+        self,
+        text: str,
+        preserve_context: bool = True,
+        max_tokens: Optional[int] = None,
+        page_index: Optional[PageOffsetIndex] = None
+    ) -> List[Tuple[str, ChunkMetadata]]:
         """
         Split text into optimal chunks while preserving context.
         
@@ -78,6 +86,8 @@ class ChunkManager:
             text: Text to chunk
             preserve_context: Whether to preserve paragraph/section context
             max_tokens: Optional maximum tokens per chunk (overrides max_chunk_size)
+            page_index: Optional page offsets into text (an extraction
+                    result's 'page_offsets'), used to set each chunk's page_ref
             
         Returns:
             List of (chunk_text, chunk_metadata) tuples
@@ -112,6 +122,10 @@ class ChunkManager:
             current_chunk = []
             current_token_count = 0
             current_sentence_count = 0
+            # Character span of each chunk in text, and of the chunk being built
+            chunk_spans = []
+            current_span = None
+            cursor = 0
             
             # Track metrics
             CHUNK_OPERATIONS.labels(operation='split_paragraphs', status='success').inc()
@@ -120,6 +134,13 @@ class ChunkManager:
                 # Estimate tokens in paragraph
                 para_tokens = self._estimate_tokens(para)
                 
+                # Paragraphs are stripped slices of text, in order
+                para_start = text.find(para, cursor)
+                if para_start < 0:
+                    para_start = cursor
+                para_span = (para_start, para_start + len(para))
+                cursor = para_span[1]
+                
                 # If paragraph alone exceeds chunk size, split it
 
                 if para_tokens > effective_max_tokens:
@@ -130,13 +151,16 @@ class ChunkManager:
                             current_token_count,
                             current_sentence_count
                         ))
+                        chunk_spans.append(current_span)
                         current_chunk = []
                         current_token_count = 0
                         current_sentence_count = 0
+                        current_span = None
                     
-                    # Split large paragraph
+                    # Split large paragraph; its pieces share the paragraph's span
                     para_chunks = self._split_large_paragraph(para, effective_max_tokens)
                     chunks.extend(para_chunks)
+                    chunk_spans.extend([para_span] * len(para_chunks))
                     continue
             
                 # Check if adding paragraph exceeds chunk size
@@ -147,14 +171,17 @@ class ChunkManager:
                         current_token_count,
                         current_sentence_count
                     ))
+                    chunk_spans.append(current_span)
                     current_chunk = []
                     current_token_count = 0
                     current_sentence_count = 0
+                    current_span = None
                 
                 # Add paragraph to current chunk
                 current_chunk.append(para)
                 current_token_count += para_tokens
                 current_sentence_count += len(self._split_sentences(para))
+                current_span = (current_span[0] if current_span else para_span[0], para_span[1])
         
             # Add final chunk if not empty
             if current_chunk:
@@ -163,17 +190,20 @@ class ChunkManager:
                     current_token_count,
                     current_sentence_count
                 ))
+                chunk_spans.append(current_span)
         
             # Add metadata to chunks
+            has_pages = page_index is not None and page_index.page_count > 0
             result = [
                 (chunk[0], ChunkMetadata(
                     index=i + 1,
                     total_chunks=len(chunks),
                     token_count=chunk[1],
                     sentence_count=chunk[2],
-                    paragraph_count=len(chunk[0].split('\n\n'))
+                    paragraph_count=len(chunk[0].split('\n\n')),
+                    page_ref=page_index.page_ref(*span) if has_pages else None
                 ))
-                for i, chunk in enumerate(chunks)
+                for i, (chunk, span) in enumerate(zip(chunks, chunk_spans))
             ]
             
             # Record success metrics
@@ -200,6 +230,70 @@ class ChunkManager:
             logger.error(f"Chunking error: {create_error_report(e)}")
             raise e
 
+    async def iter_chunks(
+        self,
+        pages: AsyncIterator[Any],
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Chunk a stream of pages, yielding each chunk as soon as it is full.
+        
+        Args:
+            pages: Async iterator of page objects with 'page_number' and
+                   'text' attributes (e.g. PDFProcessor.iter_pages)
+            max_tokens: Optional maximum tokens per chunk (overrides max_chunk_size)
+            
+        Yields:
+            (chunk_text, page_ref) tuples in document order, where page_ref
+            names the pages the chunk came from, e.g. '3' or '3-4'
+            
+        Raises:
+            ChunkError: If parameters are invalid
+        """
+        effective_max_tokens = max_tokens if max_tokens is not None else self.max_chunk_size
+        if effective_max_tokens <= 0:
+            raise ChunkError(
+                "Invalid max_tokens value",
+                chunk_size=effective_max_tokens,
+                recovery_action="Set max_tokens to a positive integer"
+            )
+            
+        current_chunk = []
+        current_token_count = 0
+        first_page = last_page = None
+        
+        async for page in pages:
+            for para in self._split_paragraphs(page.text):
+                para_tokens = self._estimate_tokens(para)
+                
+                # Flush the current chunk before it would overflow
+                if current_chunk and current_token_count + para_tokens > effective_max_tokens:
+                    yield '\n\n'.join(current_chunk), self._page_range(first_page, last_page)
+                    current_chunk = []
+                    current_token_count = 0
+                
+                # Split paragraphs that are too large on their own
+                if para_tokens > effective_max_tokens:
+                    for chunk_text, _, _ in self._split_large_paragraph(para, effective_max_tokens):
+                        yield chunk_text, str(page.page_number)
+                    continue
+                    
+                if not current_chunk:
+                    first_page = page.page_number
+                last_page = page.page_number
+                current_chunk.append(para)
+                current_token_count += para_tokens
+        
+        if current_chunk:
+            yield '\n\n'.join(current_chunk), self._page_range(first_page, last_page)
+        
+        CHUNK_OPERATIONS.labels(operation='iter_chunks', status='success').inc()
+
+    @staticmethod
+    def _page_range(first: int, last: int) -> str:
+        """Format a page range as '3' or '3-4'."""
+        return str(first) if first == last else f"{first}-{last}"
+
     def _split_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs using multiple break patterns."""
         # Combine all paragraph break patterns
@@ -418,7 +512,8 @@ class ChunkManager:
                 total_chunks=len(optimized),
                 token_count=meta.token_count,
                 sentence_count=meta.sentence_count,
-                paragraph_count=meta.paragraph_count
+                paragraph_count=meta.paragraph_count,
+                page_ref=meta.page_ref
             ))
             for i, (text, meta) in enumerate(optimized)
         ]
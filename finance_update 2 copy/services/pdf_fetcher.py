@@ -1,34 +1,40 @@
-"""Service for fetching PDFs from Dropbox."""
+"""Service for fetching PDFs from the report source."""
 
 import logging
-from typing import List, Dict, Union, BinaryIO
+from typing import List, Dict, Union
 from config import Config
-from clients.dropbox_client import DropboxClient
+from clients.report_source import ReportSource
+from utils.document_handle import DocumentHandle
 from utils.exceptions import ProcessingError
 
 logger = logging.getLogger(__name__)
 
 class PDFFetcher:
-    """Handles fetching PDFs from Dropbox."""
+    """Handles fetching PDFs from the report source."""
     
-    def __init__(self, dropbox_client: DropboxClient):
+    def __init__(self, dropbox_client: ReportSource):
         """
         Initialize PDFFetcher.
         
         Args:
-            dropbox_client: Initialized Dropbox client
+            dropbox_client: Initialized report source (Dropbox or local)
         """
         self.dropbox_client = dropbox_client
         
-    async def fetch_pdfs(self, config: Config) -> List[Dict[str, Union[str, BinaryIO]]]:
+    async def fetch_pdfs(self, config: Config) -> List[Dict[str, Union[str, DocumentHandle]]]:
         """
         Fetch PDF files from Dropbox.
         
+        Each report keeps its DocumentHandle, so large documents stay
+        spooled on disk. Callers own the handles and must pass the list to
+        release_pdfs() once they are done with it.
+        
         Args:
             config: Application configuration
             
         Returns:
-            List of dictionaries containing file names and binary streams
+            List of dictionaries containing file names, paths and the
+            report's DocumentHandle under 'document'
             
         Raises:
             ProcessingError: If there's an error fetching PDFs
@@ -45,3 +51,11 @@ class PDFFetcher:
                 details=f"Error fetching PDF files: {str(e)}",
                 recovery_action="Check Dropbox connection and permissions"
             )
+
+    @staticmethod
+    def release_pdfs(pdf_files: List[Dict]) -> None:
+        """Release the document handles of fetched PDFs."""
+        for pdf_file in pdf_files:
+            document = pdf_file.get('document')
+            if document is not None:
+                document.release()
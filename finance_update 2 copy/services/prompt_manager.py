@@ -7,7 +7,7 @@ from dataclasses import dataclass
 import random
 from datetime import datetime
 
-from utils.text_processor import get_token_count
+from utils.tokenizer import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +26,7 @@ class PromptTemplate:
     @property
     def base_token_count(self) -> int:
         """Calculate base token count without variables."""
-        return get_token_count(self.template)
+        return get_tokenizer().count(self.template)
 
 class PromptVariant:
     """Variant of a prompt template for A/B testing."""
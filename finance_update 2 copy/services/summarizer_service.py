@@ -1,14 +1,17 @@
 """Service for handling text summarization with optimized token management."""
 
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple, AsyncIterator, Union
 from dataclasses import dataclass
 import math
+from datetime import date
 
 from clients.openai_client import OpenAIClient
-from utils.text_processor import get_token_count, TextProcessor
+from utils.text_processor import TextProcessor
+from utils.tokenizer import TokenizerService, get_tokenizer
 from services.chunk_manager import ChunkManager
 from services.prompt_manager import PromptManager
+from utils.page_index import PageOffsetIndex
 from utils.exceptions import (
     SummaryError,
     ChunkError,
@@ -36,11 +39,13 @@ class SummarizerService:
         self,
         openai_client: OpenAIClient,
         chunk_manager: ChunkManager,
-        prompt_manager: PromptManager
+        prompt_manager: PromptManager,
+        tokenizer: Optional[TokenizerService] = None
     ):
         self.openai_client = openai_client
         self.chunk_manager = chunk_manager
         self.prompt_manager = prompt_manager
+        self.tokenizer = tokenizer or get_tokenizer()
         
         # Model configurations
         self.MODEL_CONFIGS = {
@@ -66,22 +71,75 @@ class SummarizerService:
         self.MIN_TOKENS_PER_SUMMARY = 1000
         self.MAX_TOKENS_PER_SUMMARY = 8000
 
-    def _save_summaries(self, stage: str, summary_text: str) -> None:
+    def _save_summaries(self, stage: str, summary_text: str, report_day: Optional[date] = None) -> None:
         """
         Save combined summaries to a TXT file in the memlog folder.
-        The file is named with a timestamp for tracking progression.
+        The file is named with a timestamp for tracking progression, and
+        with the report day when given, so days processed together keep
+        separate files.
         """
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = f"memlog/{stage}_summaries_{timestamp}.txt"
+        prefix = f"memlog/{stage}_summaries_{report_day.isoformat()}" if report_day else f"memlog/{stage}_summaries"
+        filepath = f"{prefix}_{timestamp}.txt"
         with open(filepath, "w", encoding="utf-8") as f:
             f.write(summary_text)
         
         # Also save to a "latest" file for easy access
-        latest_filepath = f"memlog/{stage}_summaries_latest.txt"
+        latest_filepath = f"{prefix}_latest.txt"
         with open(latest_filepath, "w", encoding="utf-8") as f:
             f.write(summary_text)
 
+    def _initial_summary_config(self, max_tokens: int, model: str) -> SummaryConfig:
+        """Build the summary configuration for initial per-PDF summaries."""
+        return SummaryConfig(
+            model=model,
+            context_window=self.MODEL_CONFIGS[model]['context_window'],
+            max_output_tokens=max_tokens,
+            min_output_tokens=self.MIN_TOKENS_PER_SUMMARY
+        )
+
+    async def _initial_summary(
+        self,
+        text: str,
+        index: int,
+        config: SummaryConfig,
+        page_index: Optional[PageOffsetIndex] = None
+    ) -> Optional[str]:
+        """Summarize one PDF, logging and skipping failures."""
+        try:
+            return await self.process_report_text(
+                text=str(text),  # Ensure text is a string
+                config=config,
+                name=f"PDF {index}",
+                enable_variants=True,
+                page_index=page_index
+            )
+        except Exception as e:
+            logger.error(f"Error generating initial summary for PDF {index}: {e}")
+            return None
+
+    async def _streamed_summary(
+        self,
+        pages: AsyncIterator[Any],
+        index: int,
+        config: SummaryConfig
+    ) -> Optional[str]:
+        """Summarize one PDF from its pages as they are extracted, logging and skipping failures."""
+        chunks = self.chunk_manager.iter_chunks(
+            pages,
+            max_tokens=int(config.context_window * config.chunk_ratio)
+        )
+        try:
+            return await self.process_report_chunks(
+                chunks,
+                config=config,
+                name=f"PDF {index}",
+                enable_variants=True
+            )
+        finally:
+            await chunks.aclose()
+
     async def generate_initial_summaries(
         self,
         pdf_texts: List[str],
@@ -91,31 +149,61 @@ class SummarizerService:
         """Generate initial summaries for each PDF using gpt-4o-mini."""
         logger.info(f"Generating initial summaries for {len(pdf_texts)} PDFs")
         initial_summaries = []
-        
-        config = SummaryConfig(
-            model=model,
-            context_window=self.MODEL_CONFIGS[model]['context_window'],
-            max_output_tokens=max_tokens,
-            min_output_tokens=self.MIN_TOKENS_PER_SUMMARY
-        )
+        config = self._initial_summary_config(max_tokens, model)
         
         for i, text in enumerate(pdf_texts):
-            try:
-                summary = await self.process_report_text(
-                    text=str(text),  # Ensure text is a string
-                    config=config,
-                    name=f"PDF {i+1}",
-                    enable_variants=True
-                )
-                
-                if summary:
-                    initial_summaries.append(summary)
-                    logger.info(f"Generated initial summary {i+1}/{len(pdf_texts)}")
-                
-            except Exception as e:
-                logger.error(f"Error generating initial summary for PDF {i+1}: {e}")
-                continue
+            summary = await self._initial_summary(text, i + 1, config)
+            if summary:
+                initial_summaries.append(summary)
+                logger.info(f"Generated initial summary {i+1}/{len(pdf_texts)}")
+        
+        return initial_summaries
+
+    async def generate_initial_summaries_as_ready(
+        self,
+        pdf_texts: AsyncIterator[Union[str, Dict]],
+        max_tokens: int = 4000,
+        model: str = "gpt-4o-mini"
+    ) -> List[str]:
+        """
+        Generate initial summaries for PDF texts as they arrive.
+        
+        Same as generate_initial_summaries, but starts on each text as soon
+        as it is extracted instead of waiting for the whole batch. Extraction
+        results carrying 'page_offsets' get page references on their chunks.
+        Results carrying 'pages' instead of 'text' are long reports still
+        being extracted; their pages are chunked and summarized as they arrive.
+        
+        Args:
+            pdf_texts: Extracted texts, or extraction results with a 'text'
+                    and optional 'page_offsets', or with 'pages' (an async
+                    iterator of PageText), ending when extraction is done
+            max_tokens: Maximum output tokens per summary
+            model: Model to summarize with
+            
+        Returns:
+            Summaries in the order the texts arrived
+        """
+        initial_summaries = []
+        config = self._initial_summary_config(max_tokens, model)
         
+        index = 0
+        async for text in pdf_texts:
+            index += 1
+            if isinstance(text, dict) and 'pages' in text:
+                summary = await self._streamed_summary(text['pages'], index, config)
+            else:
+                page_index = None
+                if isinstance(text, dict):
+                    if text.get('page_offsets'):
+                        page_index = PageOffsetIndex.from_list(text['page_offsets'])
+                    text = text['text']
+                summary = await self._initial_summary(text, index, config, page_index)
+            if summary:
+                initial_summaries.append(summary)
+                logger.info(f"Generated initial summary {index} (more PDFs may follow)")
+        
+        logger.info(f"Generated {len(initial_summaries)} initial summaries for {index} PDFs")
         return initial_summaries
 
     async def recursive_group_summarize(
@@ -128,7 +216,7 @@ class SummarizerService:
         """Recursively combine summaries only if total tokens exceed 180k.
         When summarization is needed, target getting as close to 180k as possible.
         """
-        total_tokens = sum(get_token_count(s, model) for s in summaries)
+        total_tokens = sum(self.tokenizer.count_batch(summaries, model))
         logger.info(f"Current total tokens: {total_tokens}, Target: {target_tokens}")
         
         # If under 180k tokens, no need for recursive summarization
@@ -241,9 +329,10 @@ class SummarizerService:
         self,
         pdf_texts: List[str],
         initial_max_tokens: int = 4000,
-        final_max_tokens: int = None
+        final_max_tokens: int = None,
+        report_day: Optional[date] = None
     ) -> str:
-        """Process multiple PDFs through the three-stage pipeline."""
+        """Process multiple PDFs through the three-stage pipeline, keying memlog files by report_day."""
         try:
             # Stage 1: Initial Summaries
             initial_summaries = await self.generate_initial_summaries(
@@ -258,7 +347,7 @@ class SummarizerService:
                 )
             # Save initial summaries
             combined_initial = "\n\n---\n\n".join(initial_summaries)
-            self._save_summaries("initial", combined_initial)
+            self._save_summaries("initial", combined_initial, report_day)
             
             # Stage 2: Recursive Summarization (only if total tokens > 180k)
             combined_summary = await self.recursive_group_summarize(
@@ -268,7 +357,7 @@ class SummarizerService:
                 final_model="o3-mini"
             )
             # Save recursive summaries
-            self._save_summaries("recursive", combined_summary)
+            self._save_summaries("recursive", combined_summary, report_day)
             
             # Stage 3: Final Analysis using o3-mini
             try:
@@ -280,7 +369,7 @@ class SummarizerService:
                 
                 # Save final analysis even if later stages fail
                 if final_analysis:
-                    self._save_summaries("final", final_analysis)
+                    self._save_summaries("final", final_analysis, report_day)
                     logger.info("Saved final analysis to memlog/final_summaries.txt")
                 
                 return final_analysis
@@ -288,7 +377,7 @@ class SummarizerService:
             except Exception as e:
                 # If we have a partial final analysis, save it before re-raising
                 if 'final_analysis' in locals() and final_analysis:
-                    self._save_summaries("final_partial", final_analysis)
+                    self._save_summaries("final_partial", final_analysis, report_day)
                     logger.info("Saved partial final analysis to memlog/final_partial_summaries.txt")
                 raise
             
@@ -351,7 +440,7 @@ class SummarizerService:
                 raise SummaryError(
                     "Generated summary is empty",
                     model=model,
-                    token_count=get_token_count(batch_text),
+                    token_count=self.tokenizer.count(batch_text),
                     recovery_action="Try adjusting the max_tokens parameter or using a different model"
                 )
             
@@ -361,7 +450,7 @@ class SummarizerService:
             error = SummaryError(
                 f"Failed to generate summary: {str(e)}",
                 model=model,
-                token_count=get_token_count(batch_text),
+                token_count=self.tokenizer.count(batch_text),
                 max_tokens=max_tokens,
                 text_preview=TextProcessor.format_preview(batch_text)
             )
@@ -421,7 +510,7 @@ class SummarizerService:
                 raise SummaryError(
                     "Generated consolidated summary is empty",
                     model=model,
-                    token_count=get_token_count(combined_text),
+                    token_count=self.tokenizer.count(combined_text),
                     recovery_action="Try adjusting consolidation parameters"
                 )
             
@@ -432,7 +521,7 @@ class SummarizerService:
                 f"Failed to consolidate chunks: {str(e)}",
                 model=model,
                 chunk_count=len(chunks),
-                total_tokens=get_token_count("\n\n".join(chunks))
+                total_tokens=self.tokenizer.count("\n\n".join(chunks))
             )
             logger.error("Chunk consolidation error: %s", create_error_report(error))
             raise error
@@ -442,7 +531,8 @@ class SummarizerService:
         text: str,
         config: SummaryConfig,
         name: str = "report",
-        enable_variants: bool = True
+        enable_variants: bool = True,
+        page_index: Optional[PageOffsetIndex] = None
     ) -> Optional[str]:
         """
         Process a single report's text into a summary.
@@ -452,6 +542,8 @@ class SummarizerService:
             config: Configuration for summarization
             name: Name of the report for logging
             enable_variants: Whether to enable A/B testing variants
+            page_index: Optional page offsets into text, used to label each
+                    chunk with the pages it came from
             
         Returns:
             Summarized text if successful, None otherwise
@@ -460,79 +552,145 @@ class SummarizerService:
             text_chunks = self.chunk_manager.chunk_text(
                 text,
                 preserve_context=True,
-                max_tokens=int(config.context_window * config.chunk_ratio)
+                max_tokens=int(config.context_window * config.chunk_ratio),
+                page_index=page_index
             )
             
             chunk_summaries = []
-            for i, chunk in enumerate(text_chunks):
-                try:
-                    chunk_prompt = self.prompt_manager.format_prompt(
-                        name="initial_summary",
-                        variables={
-                            "text": str(chunk),
-                            "part": f"{name} (Part {i+1}/{len(text_chunks)})"
-                        },
-                        enable_variants=enable_variants,
-                        max_tokens=int(config.max_output_tokens * config.density_ratio)
-                    )
-                except Exception as e:
-                    raise PromptError(
-                        f"Failed to format prompt: {str(e)}",
-                        template_name="initial_summary",
-                        text_preview=TextProcessor.format_preview(chunk)
-                    )
-                
-                template = self.prompt_manager.get_template(
-                    "initial_summary",
-                    enable_variants=enable_variants
+            for i, (chunk, metadata) in enumerate(text_chunks):
+                part = f"Part {i+1}/{len(text_chunks)}"
+                chunk_summary = await self._summarize_chunk(
+                    chunk, name, part, metadata.page_ref, config, enable_variants
                 )
-                variant_id = getattr(template, 'variant_id', None)
-                
-                chunk_summary = await self.openai_client.generate_summary(
-                    prompt=chunk_prompt,
-                    model=config.model,
-                    max_tokens=int(config.max_output_tokens * config.density_ratio)
-                )
-                
-                if variant_id:
-                    success = bool(chunk_summary and len(chunk_summary.strip()) > 0)
-                    self.prompt_manager.record_variant_result(
-                        "initial_summary",
-                        variant_id,
-                        success
-                    )
-                
                 if chunk_summary:
                     chunk_summaries.append(chunk_summary)
-                    logger.info(f"Processed chunk {i+1}/{len(text_chunks)} of {name}")
             
-            if len(chunk_summaries) > 1:
-                try:
-                    consolidation_prompt = self.prompt_manager.format_prompt(
-                        name="group_summary",
-                        variables={"text": str("\n\n---\n\n".join(chunk_summaries))},
-                        enable_variants=enable_variants,
-                        max_tokens=int(config.max_output_tokens)
-                    )
-                    
-                    final_summary = await self.openai_client.generate_summary(
-                        prompt=consolidation_prompt,
-                        model=config.model,
-                        max_tokens=int(config.max_output_tokens)
-                    )
-                    
-                    return final_summary
-                except Exception as e:
-                    raise PromptError(
-                        f"Failed to consolidate chunks: {str(e)}",
-                        template_name="group_summary",
-                        text_preview=TextProcessor.format_preview("\n".join(chunk_summaries))
-                    )
-            elif chunk_summaries:
-                return chunk_summaries[0]
+            return await self._combine_chunk_summaries(chunk_summaries, config, enable_variants)
             
+        except Exception as e:
+            logger.error(f"Error processing report {name}: {str(e)}", exc_info=True)
             return None
+
+    async def process_report_chunks(
+        self,
+        chunks: AsyncIterator[Tuple[str, Optional[str]]],
+        config: SummaryConfig,
+        name: str = "report",
+        enable_variants: bool = True
+    ) -> Optional[str]:
+        """
+        Process a report's chunks into a summary as they are produced.
+        
+        Same as process_report_text for a report that is still being
+        extracted, e.g. the chunks of ChunkManager.iter_chunks. Part labels
+        carry no chunk total, since it is not known until the stream ends.
+        
+        Args:
+            chunks: Async iterator of (chunk text, page reference or None)
+            config: Configuration for summarization
+            name: Name of the report for logging
+            enable_variants: Whether to enable A/B testing variants
+            
+        Returns:
+            Summarized text if successful, None otherwise
+        """
+        try:
+            chunk_summaries = []
+            count = 0
+            async for chunk, page_ref in chunks:
+                count += 1
+                chunk_summary = await self._summarize_chunk(
+                    chunk, name, f"Part {count}", page_ref, config, enable_variants
+                )
+                if chunk_summary:
+                    chunk_summaries.append(chunk_summary)
+            
+            return await self._combine_chunk_summaries(chunk_summaries, config, enable_variants)
             
         except Exception as e:
             logger.error(f"Error processing report {name}: {str(e)}", exc_info=True)
             return None
+
+    async def _summarize_chunk(
+        self,
+        chunk: str,
+        name: str,
+        part: str,
+        page_ref: Optional[str],
+        config: SummaryConfig,
+        enable_variants: bool
+    ) -> Optional[str]:
+        """Summarize one chunk of a report, recording the prompt variant's result."""
+        label = f"{name} ({part}, page {page_ref})" if page_ref else f"{name} ({part})"
+        try:
+            chunk_prompt = self.prompt_manager.format_prompt(
+                name="initial_summary",
+                variables={
+                    "text": str(chunk),
+                    "part": label
+                },
+                enable_variants=enable_variants,
+                max_tokens=int(config.max_output_tokens * config.density_ratio)
+            )
+        except Exception as e:
+            raise PromptError(
+                f"Failed to format prompt: {str(e)}",
+                template_name="initial_summary",
+                text_preview=TextProcessor.format_preview(chunk)
+            )
+        
+        template = self.prompt_manager.get_template(
+            "initial_summary",
+            enable_variants=enable_variants
+        )
+        variant_id = getattr(template, 'variant_id', None)
+        
+        chunk_summary = await self.openai_client.generate_summary(
+            prompt=chunk_prompt,
+            model=config.model,
+            max_tokens=int(config.max_output_tokens * config.density_ratio)
+        )
+        
+        if variant_id:
+            success = bool(chunk_summary and len(chunk_summary.strip()) > 0)
+            self.prompt_manager.record_variant_result(
+                "initial_summary",
+                variant_id,
+                success
+            )
+        
+        if chunk_summary:
+            logger.info(f"Processed {part.lower()} of {name}{f' (page {page_ref})' if page_ref else ''}")
+        return chunk_summary
+
+    async def _combine_chunk_summaries(
+        self,
+        chunk_summaries: List[str],
+        config: SummaryConfig,
+        enable_variants: bool
+    ) -> Optional[str]:
+        """Consolidate a report's chunk summaries into one, if there are several."""
+        if len(chunk_summaries) > 1:
+            try:
+                consolidation_prompt = self.prompt_manager.format_prompt(
+                    name="group_summary",
+                    variables={"text": str("\n\n---\n\n".join(chunk_summaries))},
+                    enable_variants=enable_variants,
+                    max_tokens=int(config.max_output_tokens)
+                )
+                
+                return await self.openai_client.generate_summary(
+                    prompt=consolidation_prompt,
+                    model=config.model,
+                    max_tokens=int(config.max_output_tokens)
+                )
+            except Exception as e:
+                raise PromptError(
+                    f"Failed to consolidate chunks: {str(e)}",
+                    template_name="group_summary",
+                    text_preview=TextProcessor.format_preview("\n".join(chunk_summaries))
+                )
+        elif chunk_summaries:
+            return chunk_summaries[0]
+        
+        return None
@@ -1,10 +1,16 @@
 """Service for extracting and validating text from PDFs."""
 
+import asyncio
 import logging
-from typing import Dict, Union, BinaryIO
+from typing import AsyncIterator, Dict, List, Union, BinaryIO, Optional, Tuple
 from collections import Counter
-from utils.pdf_processor import PDFProcessor
+from prometheus_client import Summary, Gauge, Counter as MetricCounter
+from utils.pdf_processor import PDFProcessor, PageText
+from utils.extraction_cache import ExtractionCache
 from utils.text_processor import TextProcessor
+from utils.text_cleaning import TextStats, filter_indexed_lines, measure_text
+from utils.page_index import PageOffsetIndex
+from utils.running_stats import RunningStats
 from utils.exceptions import ExtractionError
 import re
 
@@ -19,22 +25,77 @@ MAX_SPECIAL_CHAR_RATIO = 0.20  # Increased to allow more special characters
 MIN_LINE_LENGTH = 15  # Reduced minimum line length for better capture
 MIN_VALID_LINE_RATIO = 0.20  # Reduced to capture more reports
 
+# Bump when boilerplate removal changes its output (invalidates cached extractions)
+BOILERPLATE_VERSION = 1
+
+# Boilerplate lines, matched case-insensitively at the start of each line
+BOILERPLATE_PATTERN = re.compile(
+    '|'.join([
+        r'disclaimer',
+        r'confidential',
+        r'all rights reserved',
+        r'for institutional',
+        r'not for distribution',
+        r'copyright',
+        r'\s*page\s+\d+\s*$',
+        r'\s*\d+\s*$',  # Page numbers
+        r'strictly\s+private',
+        r'proprietary\s+and\s+confidential',
+        r'this\s+document\s+is\s+solely\s+for',
+        r'important\s+disclosures\s+appear',
+        r'please\s+see\s+important\s+disclosures'
+    ]),
+    re.IGNORECASE
+)
+EDGE_LINES = 3  # Header/footer lines dropped from each end of the document
+
+# Statistics from text validation aggregated across documents
+VALIDATION_STAT_KEYS = ('text_length', 'total_lines', 'valid_lines', 'valid_line_ratio', 'special_char_ratio')
+
+# Metrics
+VALIDATION_STAT = Summary(
+    'extraction_validation_stat',
+    'Text validation statistics of extracted documents',
+    ['stat']
+)
+
+VALIDATION_STAT_QUANTILE = Gauge(
+    'extraction_validation_stat_quantile',
+    'Streaming quantile estimates of text validation statistics',
+    ['stat', 'quantile']
+)
+
+DISCLOSURE_TOKENS_REMOVED = MetricCounter(
+    'extraction_disclosure_tokens_removed_total',
+    'Estimated tokens of disclosure appendices dropped before chunking'
+)
+
 class PDFTextExtractor:
     """Handles PDF text extraction and validation."""
 
-    def __init__(self):
-        """Initialize PDFTextExtractor."""
-        self.pdf_processor = PDFProcessor()
+    def __init__(
+        self,
+        pdf_processor: Optional[PDFProcessor] = None,
+        cache: Optional[ExtractionCache] = None
+    ):
+        """
+        Initialize PDFTextExtractor.
+        
+        Args:
+            pdf_processor: Optional configured PDFProcessor (defaults to the thread backend)
+            cache: Optional cache of extraction results keyed by PDF content
+        """
+        self.pdf_processor = pdf_processor or PDFProcessor()
+        self.cache = cache
         self.error_counter = Counter()
-        self.validation_stats = {
-            'text_length': [],
-            'total_lines': [],
-            'valid_lines': [],
-            'valid_line_ratio': [],
-            'special_char_ratio': []
-        }
+        self.validation_stats = {key: RunningStats() for key in VALIDATION_STAT_KEYS}
         self.sample_extracts = []
 
+    @property
+    def max_workers(self) -> int:
+        """Number of documents the underlying processor extracts at once."""
+        return self.pdf_processor.max_workers
+
     def _log_stage(self, stage: str, progress: float = None):
         """Log stage transition with optional progress."""
         status = f"STAGE: {stage}"
@@ -42,20 +103,35 @@ class PDFTextExtractor:
             status += f" ({progress:.1f}% complete)"
         if self.error_counter:
             status += f"\nErrors: {dict(self.error_counter)}"
-        if self.validation_stats:
-            status += f"\nValidation Stats: {dict(self.validation_stats)}"
+        documents = self.validation_stats['text_length'].count
+        if documents:
+            status += (
+                f"\nValidation ({documents} docs): "
+                f"valid_line_ratio {self.validation_stats['valid_line_ratio']}, "
+                f"special_char_ratio {self.validation_stats['special_char_ratio']}"
+            )
+        if self.cache:
+            status += f"\nCache: {self.cache.stats}"
         progress_logger.info(status)
 
-    def _log_sample_extract(self, text: str, filename: str, validation_result: bool):
+    def _log_sample_extract(
+        self,
+        text: str,
+        filename: str,
+        validation_result: bool,
+        text_stats: Optional[TextStats] = None
+    ):
         """Store sample extract with validation result."""
+        if text_stats is None:
+            text_stats = measure_text(text, MIN_LINE_LENGTH)
         sample = {
             'filename': filename,
             'preview': self._format_preview(text),
             'validation': validation_result,
             'stats': {
-                'length': len(text),
-                'lines': len(text.split('\n')),
-                'special_char_ratio': sum(1 for c in text if not c.isalnum() and not c.isspace()) / len(text) if text else 0
+                'length': text_stats.chars,
+                'lines': text_stats.lines,
+                'special_char_ratio': text_stats.special_char_ratio if text else 0
             }
         }
 
@@ -75,35 +151,72 @@ class PDFTextExtractor:
             filename = pdf_data['name']
             self._log_stage(f"Extracting {filename}")
 
+            # Reuse a previous extraction of the same bytes and settings
+            cache_key, cached = await self._lookup_cache(pdf_data)
+            if cached:
+                return cached
+
             # Process the PDF file
             result = await self.pdf_processor.extract(pdf_data)
             if not result or not isinstance(result, dict) or 'text' not in result:
                 raise ExtractionError(f"Failed to extract text from {filename}", "Invalid extraction result")
 
-            # Clean the text before validation
-            cleaned_text = self._clean_boilerplate(result['text'])
+            removed_lines = result.get('stats', {}).get('repeated_lines_removed')
+            if removed_lines:
+                progress_logger.info(
+                    f"Removed {removed_lines} repeated header/footer lines from {filename} "
+                    f"(~{result['stats']['repeated_tokens_removed']} tokens)"
+                )
+
+            table_regions = result.get('stats', {}).get('table_regions')
+            if table_regions:
+                progress_logger.info(
+                    f"Rendered {table_regions} tables in {filename} as TSV: "
+                    f"~{result['stats']['table_tokens_before']} -> "
+                    f"~{result['stats']['table_tokens_after']} tokens"
+                )
+
+            cached_pages = result.get('stats', {}).get('page_cache_pages')
+            if cached_pages:
+                progress_logger.info(f"Reused {cached_pages} unchanged pages of {filename} from the page cache")
+
+            disclosure_tokens = result.get('stats', {}).get('disclosure_tokens_removed')
+            if disclosure_tokens:
+                DISCLOSURE_TOKENS_REMOVED.inc(disclosure_tokens)
+                progress_logger.info(
+                    f"Dropped {result['stats']['disclosure_pages_removed']} disclosure pages from "
+                    f"{filename} starting on page {result['stats']['disclosure_start_page']} "
+                    f"(~{disclosure_tokens} tokens)"
+                )
+
+            # Clean the text before validation, measuring it in the same pass
+            page_index = None
+            if result.get('page_offsets'):
+                page_index = PageOffsetIndex.from_list(result['page_offsets'])
+            cleaned_text, text_stats, page_index = self._clean_boilerplate(result['text'], page_index)
             result['text'] = cleaned_text
+            if page_index is not None:
+                result['page_offsets'] = page_index.to_list()
 
             # Validate extracted text
-            validation_details = self._validate_extracted_text(cleaned_text)
+            validation_details = self._validate_extracted_text(cleaned_text, text_stats)
             
             # Update validation stats
-            stats = validation_details['stats']
-            for key, value in stats.items():
-                if key in self.validation_stats:
-                    self.validation_stats[key].append(value)
+            self._record_validation_stats(validation_details['stats'])
 
             # Log sample with validation result
-            self._log_sample_extract(cleaned_text, filename, validation_details['passed'])
+            self._log_sample_extract(cleaned_text, filename, validation_details['passed'], text_stats)
 
             if validation_details['passed']:
                 progress_logger.info(f"✓ Successfully extracted {filename}")
                 progress_logger.info(f"Validation details: {validation_details['stats']}")
+                await self._store_in_cache(cache_key, result)
                 return result
             else:
                 # Accept if we have enough valid lines, even if ratio is low
                 if validation_details['stats']['valid_lines'] >= 30:
                     progress_logger.info(f"⚠ Accepting {filename} despite validation failures due to sufficient valid lines")
+                    await self._store_in_cache(cache_key, result)
                     return result
                 
                 self.error_counter['validation_failures'] += 1
@@ -119,8 +232,150 @@ class PDFTextExtractor:
             logger.error(f"Error extracting text from PDF: {e}", exc_info=True)
             raise ExtractionError(str(e), "PDF processing failed")
 
-    def _validate_extracted_text(self, text: str) -> Dict:
-        """Validate extracted text quality with detailed reporting."""
+    async def should_stream(self, pdf_data: Dict[str, Union[str, BinaryIO]]) -> bool:
+        """
+        Check whether a document is long enough to summarize while it is extracted.
+        
+        Documents with at least the processor's page_parallel_threshold pages
+        are streamed with iter_pages; shorter ones are extracted whole.
+        """
+        threshold = self.pdf_processor.page_parallel_threshold
+        if not threshold:
+            return False
+        try:
+            return await self.pdf_processor.count_pages_async(pdf_data) >= threshold
+        except Exception as e:
+            # Let extract() report unreadable files
+            logger.debug(f"Could not count pages of {pdf_data.get('name')}: {e}")
+            return False
+
+    async def iter_pages(self, pdf_data: Dict[str, Union[str, BinaryIO]]) -> AsyncIterator[PageText]:
+        """
+        Stream the cleaned pages of a PDF as they are extracted.
+        
+        Pages get the cleaning extract() applies, the processor's page cleaning
+        followed by boilerplate and edge line removal, so they join into the
+        text extract() returns. The last pages are held back until EDGE_LINES
+        lines follow them. A cached extraction is replayed page by page.
+        Streamed text is neither validated nor stored in the cache, since it
+        is consumed before the document is complete.
+        
+        Args:
+            pdf_data: PDF input in any format accepted by PDFProcessor.iter_pages
+            
+        Yields:
+            PageText for each page in document order
+        """
+        _, cached = await self._lookup_cache(pdf_data)
+        if cached:
+            for page in self._cached_pages(cached):
+                yield page
+            return
+
+        self._log_stage(f"Streaming {pdf_data['name']}")
+        pages = self.pdf_processor.iter_pages(pdf_data)
+        leading = EDGE_LINES  # Lines still to drop from the start of the document
+        held = []  # Pages not yet followed by EDGE_LINES lines, as (page number, lines)
+        seen_text = False
+        try:
+            async for page in pages:
+                lines = page.text.split('\n') if page.text else []
+                if lines and seen_text:
+                    # Joined pages are separated by a blank line, which counts as an edge line
+                    lines.insert(0, None)
+                seen_text = seen_text or bool(lines)
+                dropped = min(leading, len(lines))
+                lines[:dropped] = [None] * dropped
+                leading -= dropped
+                held.append((page.page_number, lines))
+                while len(held) > 1 and sum(len(later) for _, later in held[1:]) >= EDGE_LINES:
+                    yield self._filter_page(*held.pop(0))
+            # Drop the edge lines at the end of the document
+            trailing = EDGE_LINES
+            for _, lines in reversed(held):
+                dropped = min(trailing, len(lines))
+                lines[len(lines) - dropped:] = [None] * dropped
+                trailing -= dropped
+            for page_number, lines in held:
+                yield self._filter_page(page_number, lines)
+        finally:
+            await pages.aclose()
+
+    @staticmethod
+    def _filter_page(page_number: int, lines: List[Optional[str]]) -> PageText:
+        """Build a streamed page from its lines, skipping dropped and boilerplate lines."""
+        kept = [line for line in lines if line is not None and not BOILERPLATE_PATTERN.match(line)]
+        return PageText(page_number=page_number, text='\n'.join(kept).strip('\n'))
+
+    @staticmethod
+    def _cached_pages(result: Dict) -> List[PageText]:
+        """Split a cached extraction result back into its pages."""
+        text = result['text']
+        starts = result.get('page_offsets') or [0]
+        ends = starts[1:] + [len(text)]
+        return [
+            PageText(page_number=number, text=text[start:end].rstrip('\n'))
+            for number, (start, end) in enumerate(zip(starts, ends), 1)
+        ]
+
+    async def _lookup_cache(self, pdf_data: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Look up an earlier extraction of the same bytes and settings.
+        
+        Hashing the file and reading the entry run off the event loop.
+        
+        Returns:
+            Tuple of (cache key or None without a cache, cached result or None)
+        """
+        if not self.cache:
+            return None, None
+        loop = asyncio.get_running_loop()
+        cache_key = await loop.run_in_executor(None, self.cache.make_key, pdf_data, self._cache_fingerprint())
+        cached = await loop.run_in_executor(None, self.cache.get, cache_key)
+        if cached:
+            cached['file_name'] = pdf_data['name']
+            progress_logger.info(f"✓ Extraction cache hit for {pdf_data['name']}")
+        return cache_key, cached
+
+    def _record_validation_stats(self, stats: Dict[str, float]):
+        """Add one document's validation statistics to the running aggregates and metrics."""
+        for key, value in stats.items():
+            running = self.validation_stats.get(key)
+            if running is None:
+                continue
+            running.add(value)
+            VALIDATION_STAT.labels(stat=key).observe(value)
+            for quantile, estimate in running.quantiles().items():
+                VALIDATION_STAT_QUANTILE.labels(stat=key, quantile=f"{quantile:g}").set(estimate)
+
+    def get_validation_stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Get aggregates of the validation statistics of every document extracted so far.
+        
+        Returns:
+            Dictionary mapping each statistic to its count, mean, stdev,
+            min, max and quantile estimates
+        """
+        return {key: running.summary() for key, running in self.validation_stats.items()}
+
+    def _cache_fingerprint(self) -> str:
+        """Describe the extraction and cleaning settings for cache keys."""
+        return f"{self.pdf_processor.cache_fingerprint()}|boilerplate={BOILERPLATE_VERSION}"
+
+    async def _store_in_cache(self, cache_key: Optional[str], result: Dict):
+        """Store an accepted extraction result in the cache, writing it off the event loop."""
+        # Partial results depend on timing, so a later run may do better
+        if self.cache and cache_key and not result.get('partial'):
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.put, cache_key, result)
+
+    def _validate_extracted_text(self, text: str, text_stats: Optional[TextStats] = None) -> Dict:
+        """
+        Validate extracted text quality with detailed reporting.
+        
+        Args:
+            text: Cleaned text
+            text_stats: Optional statistics already measured for the text
+        """
         validation_result = {
             'passed': False,
             'stats': {},
@@ -131,78 +386,48 @@ class PDFTextExtractor:
             validation_result['failures'].append('No text content')
             return validation_result
 
+        if text_stats is None:
+            text_stats = measure_text(text, MIN_LINE_LENGTH)
+
         # Basic length check
-        text_length = len(text.strip())
+        text_length = text_stats.text_length
         if text_length < MIN_VALID_TEXT_LENGTH:
             validation_result['failures'].append(
                 f'Text too short: {text_length} chars (min: {MIN_VALID_TEXT_LENGTH})'
             )
 
         # Line quality checks
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        if not lines:
+        if not text_stats.total_lines:
             validation_result['failures'].append('No valid lines found')
 
-        valid_lines = [line for line in lines if len(line) >= MIN_LINE_LENGTH]
-        valid_line_ratio = len(valid_lines) / len(lines) if lines else 0
-
+        valid_line_ratio = text_stats.valid_line_ratio
         if valid_line_ratio < MIN_VALID_LINE_RATIO:
             validation_result['failures'].append(
                 f'Too few valid lines: {valid_line_ratio:.1%} (min: {MIN_VALID_LINE_RATIO:.1%})'
             )
 
         # Special character ratio
-        special_chars = sum(1 for c in text if not c.isalnum() and not c.isspace())
-        special_char_ratio = special_chars / len(text) if text else 1
-
+        special_char_ratio = text_stats.special_char_ratio
         if special_char_ratio > MAX_SPECIAL_CHAR_RATIO:
             validation_result['failures'].append(
                 f'Too many special characters: {special_char_ratio:.1%} (max: {MAX_SPECIAL_CHAR_RATIO:.1%})'
             )
 
         # Store statistics
-        validation_result['stats'] = {
-            'text_length': text_length,
-            'total_lines': len(lines),
-            'valid_lines': len(valid_lines),
-            'valid_line_ratio': valid_line_ratio,
-            'special_char_ratio': special_char_ratio
-        }
+        validation_result['stats'] = text_stats.validation_stats()
 
         # Set passed if no failures
         validation_result['passed'] = len(validation_result['failures']) == 0
 
         return validation_result
 
-    def _clean_boilerplate(self, text: str) -> str:
-        """Remove common boilerplate text from financial documents."""
-        lines = text.split('\n')
-        cleaned_lines = []
-
-        skip_patterns = [
-            r'^disclaimer',
-            r'^confidential',
-            r'^all rights reserved',
-            r'^for institutional',
-            r'^not for distribution',
-            r'^copyright',
-            r'^\s*page\s+\d+\s*$',
-            r'^\s*\d+\s*$',  # Page numbers
-            r'^strictly\s+private',
-            r'^proprietary\s+and\s+confidential',
-            r'^this\s+document\s+is\s+solely\s+for',
-            r'^important\s+disclosures\s+appear',
-            r'^please\s+see\s+important\s+disclosures'
-        ]
-
-        header_footer_buffer = 3  # Lines to skip at start/end
-        content_lines = lines[header_footer_buffer:-header_footer_buffer]
-
-        for line in content_lines:
-            if not any(re.match(pattern, line.lower()) for pattern in skip_patterns):
-                cleaned_lines.append(line)
-
-        return '\n'.join(cleaned_lines)
+    def _clean_boilerplate(
+        self,
+        text: str,
+        page_index: Optional[PageOffsetIndex] = None
+    ) -> Tuple[str, TextStats, Optional[PageOffsetIndex]]:
+        """Remove common boilerplate text from financial documents, measuring what remains."""
+        return filter_indexed_lines(text, BOILERPLATE_PATTERN, MIN_LINE_LENGTH, EDGE_LINES, page_index)
 
     def _format_preview(self, text: str, max_length: int = 100) -> str:
         """Format text preview while preserving structure."""
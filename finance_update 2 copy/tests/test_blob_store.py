@@ -0,0 +1,77 @@
+"""Tests for the content-addressed blob store."""
+
+import hashlib
+import os
+import threading
+import pytest
+
+from utils.blob_store import BlobStore, ContentHasher, ContentHashMismatch, content_hash, CONTENT_HASH_BLOCK_SIZE
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+def test_content_hash_spans_blocks():
+    """Test the block-wise hash against a direct computation, fed in uneven chunks."""
+    data = os.urandom(CONTENT_HASH_BLOCK_SIZE + 1000)
+    expected = hashlib.sha256(
+        hashlib.sha256(data[:CONTENT_HASH_BLOCK_SIZE]).digest()
+        + hashlib.sha256(data[CONTENT_HASH_BLOCK_SIZE:]).digest()
+    ).hexdigest()
+
+    hasher = ContentHasher()
+    for start in range(0, len(data), 777_777):
+        hasher.update(data[start:start + 777_777])
+
+    assert hasher.hexdigest() == expected
+    assert content_hash(data) == expected
+
+async def test_put_rejects_mismatched_content(tmp_path):
+    """Test that bytes are only stored under their own content hash."""
+    store = BlobStore(str(tmp_path), max_size_mb=1)
+
+    with pytest.raises(ContentHashMismatch):
+        await store.put(content_hash(b'expected'), chunks(b'corrupted'))
+
+    assert store.checkout(content_hash(b'expected')) is None
+    assert os.listdir(tmp_path) == []
+
+async def test_put_hashes_and_writes_off_event_loop(tmp_path, monkeypatch):
+    """Test that stored chunks are hashed and written outside the event loop thread."""
+    store = BlobStore(str(tmp_path), max_size_mb=1)
+    key = content_hash(b'%PDF-1.4 note')
+    threads = []
+    update = ContentHasher.update
+
+    def record(self, data):
+        threads.append(threading.current_thread())
+        return update(self, data)
+
+    monkeypatch.setattr(ContentHasher, 'update', record)
+
+    path = await store.put(key, chunks(b'%PDF-', b'1.4 note'))
+
+    assert open(path, 'rb').read() == b'%PDF-1.4 note'
+    assert len(threads) == 2
+    assert all(thread is not threading.main_thread() for thread in threads)
+
+async def test_eviction_skips_pinned_blobs(tmp_path):
+    """Test LRU eviction down to the size bound, keeping blobs that are in use."""
+    store = BlobStore(str(tmp_path), max_size_mb=2500 / (1024 * 1024))
+    blobs = [bytes([i]) * 1000 for i in range(3)]
+    keys = [content_hash(blob) for blob in blobs]
+
+    await store.put(keys[0], chunks(blobs[0]))
+    store.release(keys[0])
+    await store.put(keys[1], chunks(blobs[1]))
+    await store.put(keys[2], chunks(blobs[2]))  # Over the bound; the oldest unpinned blob goes
+
+    assert store.checkout(keys[0]) is None
+    assert store.stats['evictions'] == 1
+
+    # Pinned blobs stay past the bound until released
+    await store.put(keys[0], chunks(blobs[0]))
+    assert store.stats['entries'] == 3
+    store.release(keys[1])
+    assert store.stats['entries'] == 2
+    assert store.checkout(keys[1]) is None
@@ -268,3 +268,29 @@ def test_chunk_text_error_recovery(chunk_manager, mock_metrics):
             'chunk_operations_total',
             {'operation': 'chunk_text', 'status': 'failure'}
         )
+
+@pytest.mark.asyncio
+async def test_iter_chunks_streams_pages(chunk_manager):
+    """Test chunking a stream of pages as they arrive."""
+    from utils.pdf_processor import PageText
+
+    async def pages():
+        for i in range(6):
+            yield PageText(page_number=i + 1, text=f"Paragraph {i} " + "word " * 20)
+
+    chunks = [chunk async for chunk in chunk_manager.iter_chunks(pages(), max_tokens=60)]
+
+    assert len(chunks) == 3
+    assert chunks[0][0].startswith("Paragraph 0")
+    assert all(chunk_manager._estimate_tokens(text) <= 60 for text, _ in chunks)
+    assert [page_ref for _, page_ref in chunks] == ['1-2', '3-4', '5-6']
+
+@pytest.mark.asyncio
+async def test_iter_chunks_invalid_max_tokens(chunk_manager):
+    """Test streaming chunking with invalid token limit."""
+    async def pages():
+        yield None
+
+    with pytest.raises(ChunkError):
+        async for _ in chunk_manager.iter_chunks(pages(), max_tokens=0):
+            pass
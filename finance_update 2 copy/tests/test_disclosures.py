@@ -0,0 +1,114 @@
+"""Tests for disclosure appendix detection."""
+
+from utils.disclosures import (
+    DisclosureTailDetector,
+    find_disclosure_start,
+    is_disclosure_page,
+    truncate_disclosure_tail
+)
+
+RESEARCH_LINES = [
+    "Margins expanded as pricing held up better than we expected.",
+    "We raise our 2025 EPS estimate on stronger volumes in Europe.",
+    "Free cash flow conversion should improve as capex normalizes.",
+    "The balance sheet leaves room for buybacks through next year.",
+]
+
+DISCLOSURE_LINES = [
+    "The research analyst received compensation based on investment banking revenues.",
+    "FINRA rules require disclosure of conflicts of interest with covered companies.",
+    "Our affiliates may act as market maker or hold 1% or more of the shares.",
+    "This material is not an offer or solicitation in any jurisdiction.",
+]
+
+def research_page(lines: int = 12) -> str:
+    return "\n".join(RESEARCH_LINES[i % len(RESEARCH_LINES)] for i in range(lines))
+
+def disclosure_page(heading: str = '', lines: int = 12) -> str:
+    body = [DISCLOSURE_LINES[i % len(DISCLOSURE_LINES)] for i in range(lines)]
+    return "\n".join(([heading] if heading else []) + body)
+
+def test_disclosure_page_density():
+    """Test that disclosure vocabulary density separates appendix pages from research."""
+    assert is_disclosure_page(disclosure_page())
+    assert not is_disclosure_page(research_page())
+
+def test_appendix_starts_at_heading():
+    """Test truncation at a heading partway down the last research page."""
+    pages = [
+        research_page(),
+        research_page() + "\nImportant Disclosures\n" + disclosure_page(lines=4),
+        disclosure_page(),
+        disclosure_page('Analyst Certification')
+    ]
+
+    kept, stats = truncate_disclosure_tail(pages)
+
+    assert len(kept) == 2
+    assert kept[1] == research_page()
+    assert stats['disclosure_start_page'] == 2
+    assert stats['disclosure_pages_removed'] == 2
+    assert stats['disclosure_tokens_removed'] > stats['disclosure_words_removed']
+
+def test_appendix_without_heading_needs_long_run():
+    """Test that headingless tails are only cut when they span several pages."""
+    short_tail = [research_page(), research_page(), disclosure_page(), disclosure_page()]
+    long_tail = short_tail + [disclosure_page()]
+
+    assert find_disclosure_start(short_tail) is None
+    assert find_disclosure_start(long_tail) == (2, 0)
+
+def test_contents_entry_is_not_an_appendix():
+    """Test that a heading followed by research text does not start an appendix."""
+    pages = [research_page(), "Important Disclosures\n" + research_page(), research_page()]
+
+    assert truncate_disclosure_tail(pages) == (pages, {})
+
+def test_first_page_is_kept():
+    """Test that a document that is all disclosures is left alone."""
+    pages = [disclosure_page('Important Disclosures'), disclosure_page()]
+
+    assert truncate_disclosure_tail(pages) == (pages, {})
+
+def test_detector_confirms_on_following_page():
+    """Test that the streaming detector waits for a second disclosure page."""
+    detector = DisclosureTailDetector()
+
+    assert not detector.add(research_page())
+    assert not detector.add(disclosure_page('Disclosure Appendix'))
+    assert detector.pending
+    assert detector.add(disclosure_page())
+
+    detector = DisclosureTailDetector()
+    detector.add(research_page())
+    detector.add(disclosure_page('Disclosure Appendix'))
+    assert not detector.add(research_page())
+    assert not detector.pending
+
+def test_detector_ignores_short_page_after_heading():
+    """Test that a chart page after a footer heading neither confirms nor stops the detector."""
+    pages = [
+        research_page(),
+        research_page() + "\nImportant Disclosures",
+        "Figure 3: EBITDA bridge",
+        research_page(),
+        research_page()
+    ]
+    detector = DisclosureTailDetector()
+
+    assert not any(detector.add(page) for page in pages)
+    assert not detector.pending
+    assert find_disclosure_start(pages) is None
+
+def test_detector_agrees_with_batch_rule():
+    """Test that the detector confirms the appendix where find_disclosure_start puts it."""
+    pages = [
+        research_page(),
+        research_page() + "\nImportant Disclosures\n" + disclosure_page(lines=4),
+        "Figure 9: Ratings distribution",
+        disclosure_page()
+    ]
+    detector = DisclosureTailDetector()
+
+    assert [detector.add(page) for page in pages] == [False, False, False, True]
+    assert detector.start == find_disclosure_start(pages) == (1, 12)
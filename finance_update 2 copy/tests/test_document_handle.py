@@ -0,0 +1,113 @@
+"""Tests for spooled document handles."""
+
+import os
+import threading
+import pytest
+
+from utils.document_handle import DocumentHandle, map_file
+from utils.extraction_cache import hash_pdf_source
+
+def test_small_document_stays_in_memory():
+    """Test that documents under the threshold are kept in memory."""
+    handle = DocumentHandle.from_chunks('note.pdf', [b'%PDF-', b'1.4'], spool_threshold=1024)
+
+    assert not handle.on_disk
+    assert handle.size == 8
+    with handle.open_stream() as stream:
+        assert stream.read() == b'%PDF-1.4'
+
+def test_large_document_spools_to_disk(tmp_path):
+    """Test that documents over the threshold are spooled and memory-mapped."""
+    chunks = [bytes([i]) * 100 for i in range(5)]
+    handle = DocumentHandle.from_chunks(
+        'deck.pdf',
+        chunks,
+        spool_threshold=250,
+        spool_dir=str(tmp_path)
+    )
+
+    assert handle.on_disk
+    assert handle.content is None
+    assert os.path.dirname(handle.file_path) == str(tmp_path)
+    stream = handle.open_stream()
+    try:
+        assert stream.read() == b''.join(chunks)
+        stream.seek(100)
+        assert stream.read(1) == b'\x01'
+    finally:
+        stream.close()
+
+async def test_async_chunks_are_written_off_event_loop(tmp_path, monkeypatch):
+    """Test that streamed chunks are written, and spooled, outside the event loop thread."""
+    threads = []
+    write = DocumentHandle.write
+
+    def record(self, chunk):
+        threads.append(threading.current_thread())
+        return write(self, chunk)
+
+    monkeypatch.setattr(DocumentHandle, 'write', record)
+
+    async def chunks():
+        for i in range(3):
+            yield bytes([i]) * 100
+
+    handle = await DocumentHandle.from_async_chunks('deck.pdf', chunks(), spool_threshold=150, spool_dir=str(tmp_path))
+    try:
+        assert handle.on_disk and handle.size == 300
+        assert len(threads) == 3
+        assert all(thread is not threading.main_thread() for thread in threads)
+    finally:
+        handle.release()
+
+def test_release_removes_spooled_file(tmp_path):
+    """Test that releasing a spooled document deletes its file."""
+    with DocumentHandle.from_chunks('deck.pdf', [b'x' * 10], spool_threshold=5, spool_dir=str(tmp_path)) as handle:
+        file_path = handle.file_path
+        assert os.path.exists(file_path)
+
+    assert not os.path.exists(file_path)
+    with pytest.raises(ValueError):
+        handle.open_stream()
+
+def test_write_after_finish_rejected():
+    """Test that finished documents are read-only."""
+    handle = DocumentHandle.from_chunks('note.pdf', [b'abc'])
+    with pytest.raises(ValueError):
+        handle.write(b'more')
+
+def test_map_file_rejects_empty_file(tmp_path):
+    """Test that empty files cannot be mapped."""
+    empty = tmp_path / 'empty.pdf'
+    empty.write_bytes(b'')
+    with pytest.raises(ValueError):
+        map_file(str(empty))
+
+def test_hash_matches_across_storage(tmp_path):
+    """Test that spooled and in-memory copies hash the same as the raw bytes."""
+    content = b'%PDF-1.4 ' * 50
+    in_memory = DocumentHandle.from_chunks('a.pdf', [content])
+    spooled = DocumentHandle.from_chunks('a.pdf', [content], spool_threshold=10, spool_dir=str(tmp_path))
+    try:
+        expected = hash_pdf_source({'name': 'a.pdf', 'content': content})
+        assert hash_pdf_source({'name': 'a.pdf', 'document': in_memory}) == expected
+        assert hash_pdf_source({'name': 'a.pdf', 'document': spooled}) == expected
+    finally:
+        in_memory.release()
+        spooled.release()
+
+def test_file_handle_leaves_file_on_release(tmp_path):
+    """Test that handles over caller-owned files read in place and keep the file."""
+    path = tmp_path / 'kept.pdf'
+    path.write_bytes(b'%PDF-1.4 kept')
+
+    with DocumentHandle.from_file('kept.pdf', str(path)) as handle:
+        assert handle.on_disk
+        assert handle.size == 13
+        stream = handle.open_stream()
+        try:
+            assert stream.read() == b'%PDF-1.4 kept'
+        finally:
+            stream.close()
+
+    assert path.exists()
@@ -0,0 +1,315 @@
+"""Tests for listing, incremental sync and streaming of Dropbox reports."""
+
+import asyncio
+import aiohttp
+import pytz
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from dropbox.files import FileMetadata, DeletedMetadata, ListFolderResult, ListFolderContinueError
+from dropbox.exceptions import ApiError, InternalServerError
+
+from clients.dropbox_client import DropboxClient
+from clients.report_source import LOOKBACK_DAYS
+from utils.sync_manifest import SyncManifest
+from utils.blob_store import content_hash
+
+FOLDER = DropboxClient._day_folder_path(datetime.now(pytz.timezone("US/Pacific")))
+
+def file_entry(name: str, rev: str, body: str = None) -> FileMetadata:
+    path = f"{FOLDER}/{name}"
+    content = f"%PDF-{body or rev}".encode()
+    return FileMetadata(
+        name=name.rsplit("/", 1)[-1],
+        id=f"id:{name}",
+        client_modified=datetime(2025, 3, 3, 8),
+        server_modified=datetime(2025, 3, 3, 8),
+        rev=rev,
+        size=len(content),
+        path_lower=path.lower(),
+        path_display=path,
+        content_hash=content_hash(content)
+    )
+
+def listing(entries, cursor: str) -> ListFolderResult:
+    return ListFolderResult(entries=entries, cursor=cursor, has_more=False)
+
+def download_response(*chunks, status=200):
+    """Fake download response; chunks that are exceptions are raised when reached."""
+    async def iter_chunked(chunk_size):
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    response = MagicMock()
+    response.status = status
+    response.content.iter_chunked.side_effect = iter_chunked
+    return response
+
+def serve(client, full=None, changes=None):
+    """Serve listings for today's folder; the other day folders are empty."""
+    def list_folder(path, recursive=False):
+        if path == FOLDER and full is not None:
+            return full
+        return listing([], f"empty:{path}")
+
+    def list_folder_continue(cursor):
+        if cursor.startswith('empty:'):
+            return listing([], cursor)
+        if isinstance(changes, Exception):
+            raise changes
+        return changes
+
+    client.transport.list_folder = AsyncMock(side_effect=list_folder)
+    client.transport.list_folder_continue = AsyncMock(side_effect=list_folder_continue)
+
+def cursors_used(client):
+    """Cursors passed to files_list_folder_continue for today's folder."""
+    return [
+        c.args[0] for c in client.transport.list_folder_continue.call_args_list
+        if not c.args[0].startswith('empty:')
+    ]
+
+def make_client(tmp_path, bodies=None, max_workers=5, blob_store=True) -> DropboxClient:
+    client = DropboxClient(
+        'token', 'key', 'secret',
+        max_workers=max_workers,
+        sync_dir=str(tmp_path / 'sync'),
+        blob_store_dir=str(tmp_path / 'blobs') if blob_store else None
+    )
+    client.transport = MagicMock()
+
+    def download(path, rev=None, offset=0):
+        return download_response(f"%PDF-{(bodies or {}).get(rev, rev)}".encode())
+
+    client.transport.download = AsyncMock(side_effect=download)
+    return client
+
+async def fetch(client):
+    reports = await client.fetch_reports(None)
+    contents = {}
+    for report in reports:
+        with report['document'] as document:
+            stream = document.open_stream()
+            try:
+                contents[report['name']] = stream.read()
+            finally:
+                stream.close()
+    return contents
+
+async def test_unchanged_folder_costs_one_listing_call(tmp_path):
+    """Test that a re-run reuses stored copies after a single cursor call."""
+    client = make_client(tmp_path)
+    serve(client, full=listing(
+        [file_entry('a.pdf', '0000000a1'), file_entry('b.pdf', '0000000b1')], 'cursor-1'
+    ))
+
+    first = await fetch(client)
+    assert first == {'a.pdf': b'%PDF-0000000a1', 'b.pdf': b'%PDF-0000000b1'}
+    assert client.transport.download.call_count == 2
+
+    # A new client picks up the persisted manifest
+    rerun = make_client(tmp_path)
+    serve(rerun, changes=listing([], 'cursor-2'))
+    second = await fetch(rerun)
+
+    assert second == first
+    rerun.transport.list_folder.assert_not_called()
+    assert cursors_used(rerun) == ['cursor-1']
+    # Older day folders are not probed while today's still holds reports
+    assert rerun.transport.list_folder_continue.call_count == 1
+    rerun.transport.download.assert_not_called()
+
+async def test_sync_without_blob_store_still_reuses_unchanged_files(tmp_path):
+    """Test that syncing with no blob store configured keeps stored copies under the sync directory."""
+    client = make_client(tmp_path, blob_store=False)
+    serve(client, full=listing([file_entry('a.pdf', '0000000a1')], 'cursor-1'))
+    await fetch(client)
+
+    rerun = make_client(tmp_path, blob_store=False)
+    serve(rerun, changes=listing([], 'cursor-2'))
+
+    assert await fetch(rerun) == {'a.pdf': b'%PDF-0000000a1'}
+    rerun.transport.download.assert_not_called()
+    assert rerun.blob_store.store_dir == str(tmp_path / 'sync' / 'blobs')
+
+async def test_emptied_folder_probes_older_days(tmp_path):
+    """Test that the rest of the lookback window is probed once the known folder has no reports."""
+    client = make_client(tmp_path)
+    serve(client, full=listing([file_entry('a.pdf', '0000000a1')], 'cursor-1'))
+    await fetch(client)
+
+    serve(client, changes=listing([
+        DeletedMetadata(name='a.pdf', path_lower=f"{FOLDER}/a.pdf".lower(), path_display=f"{FOLDER}/a.pdf")
+    ], 'cursor-2'))
+    assert await fetch(client) == {}
+
+    assert client.transport.list_folder_continue.call_count == LOOKBACK_DAYS
+    client.transport.list_folder.assert_not_called()
+
+async def test_only_changed_files_are_downloaded(tmp_path):
+    """Test that changed revisions are fetched and deleted files dropped."""
+    client = make_client(tmp_path)
+    serve(client, full=listing(
+        [file_entry('a.pdf', '0000000a1'), file_entry('b.pdf', '0000000b1')], 'cursor-1'
+    ))
+    await fetch(client)
+
+    client.transport.download.reset_mock()
+    serve(client, changes=listing([
+        file_entry('a.pdf', '0000000a2'),
+        DeletedMetadata(name='b.pdf', path_lower=f"{FOLDER}/b.pdf".lower(), path_display=f"{FOLDER}/b.pdf")
+    ], 'cursor-2'))
+    contents = await fetch(client)
+
+    assert contents == {'a.pdf': b'%PDF-0000000a2'}
+    client.transport.download.assert_called_once_with(f"{FOLDER}/a.pdf".lower(), rev='0000000a2', offset=0)
+    assert SyncManifest(str(tmp_path / 'sync')).cursor(FOLDER) == 'cursor-2'
+
+async def test_failed_downloads_skip_only_their_report(tmp_path):
+    """Test that transport errors on one report log and skip it instead of ending the fetch."""
+    client = make_client(tmp_path)
+    serve(client, full=listing(
+        [file_entry(name, f"0000000{name[0]}1") for name in ('a.pdf', 'b.pdf', 'c.pdf')], 'cursor-1'
+    ))
+    failures = {
+        '0000000a1': InternalServerError('request-id', 503, 'unavailable'),
+        '0000000b1': aiohttp.ClientResponseError(MagicMock(), (), status=400, message='token refresh failed')
+    }
+
+    def download(path, rev=None, offset=0):
+        if rev in failures:
+            raise failures[rev]
+        return download_response(f"%PDF-{rev}".encode())
+
+    client.transport.download = AsyncMock(side_effect=download)
+
+    assert await fetch(client) == {'c.pdf': b'%PDF-0000000c1'}
+
+async def test_expired_cursor_falls_back_to_full_listing(tmp_path):
+    """Test that a reset cursor relists the folder and keeps unchanged copies."""
+    client = make_client(tmp_path)
+    serve(client, full=listing([file_entry('a.pdf', '0000000a1')], 'cursor-1'))
+    await fetch(client)
+
+    client.transport.download.reset_mock()
+    serve(
+        client,
+        full=listing([file_entry('a.pdf', '0000000a1')], 'cursor-3'),
+        changes=ApiError('request-id', ListFolderContinueError.reset, 'reset', None)
+    )
+    contents = await fetch(client)
+
+    assert contents == {'a.pdf': b'%PDF-0000000a1'}
+    assert [c.args[0] for c in client.transport.list_folder.call_args_list] == [FOLDER]
+    assert client.manifest.cursor(FOLDER) == 'cursor-3'
+
+async def test_identical_reports_are_opened_once(tmp_path):
+    """Test that copies of one report in several subfolders are collapsed into one with aliases."""
+    bodies = {'0000000c1': 'same', '0000000c2': 'same'}
+    client = make_client(tmp_path, bodies)
+    full = listing([
+        file_entry('Equity/c.pdf', '0000000c1', 'same'),
+        file_entry('Macro/c.pdf', '0000000c2', 'same')
+    ], 'cursor-1')
+    serve(client, full=full)
+
+    reports = await client.fetch_reports(None)
+    try:
+        assert [(report['path'], report['aliases']) for report in reports] == [
+            (f"{FOLDER}/Equity/c.pdf", [f"{FOLDER}/Macro/c.pdf"])
+        ]
+        assert client.transport.download.call_count == 1
+        assert client.blob_store.stats['misses'] == 1
+    finally:
+        for report in reports:
+            report['document'].release()
+
+    # Later runs, even from a fresh listing, read it from the store
+    rerun = make_client(tmp_path, bodies)
+    rerun.manifest.reset_folder(FOLDER)
+    serve(rerun, full=full)
+    assert await fetch(rerun) == {'c.pdf': b'%PDF-same'}
+    rerun.transport.download.assert_not_called()
+
+async def test_streamed_reports_apply_backpressure(tmp_path):
+    """Test that streaming yields every report and pauses downloads while the queue is full."""
+    client = make_client(tmp_path, max_workers=1)
+    serve(client, full=listing(
+        [file_entry(f"r{i}.pdf", f"00000000{i}") for i in range(6)], 'cursor-1'
+    ))
+
+    stream = client.iter_reports(None, queue_size=1)
+    first = await stream.__anext__()
+    first['document'].release()
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+    # One taken, one queued, one waiting for room in the queue
+    assert client.transport.download.call_count == 3
+
+    names = {first['name']}
+    async for report in stream:
+        names.add(report['name'])
+        report['document'].release()
+    assert names == {f"r{i}.pdf" for i in range(6)}
+
+async def test_abandoned_stream_releases_downloads(tmp_path):
+    """Test that reports downloaded but never taken are released when the stream closes."""
+    client = make_client(tmp_path)
+    serve(client, full=listing(
+        [file_entry(f"r{i}.pdf", f"00000000{i}") for i in range(4)], 'cursor-1'
+    ))
+
+    stream = client.iter_reports(None, queue_size=2)
+    first = await stream.__anext__()
+    first['document'].release()
+    await asyncio.sleep(0.05)
+    await stream.aclose()
+
+    assert client.blob_store._pins == {}
+
+async def test_lookback_probes_run_concurrently(tmp_path):
+    """Test that day folders are probed in parallel and the most recent non-empty one wins."""
+    client = DropboxClient('token', 'key', 'secret')
+    client.transport = MagicMock()
+    yesterday = DropboxClient._day_folder_path(
+        datetime.now(pytz.timezone("US/Pacific")) - timedelta(days=1)
+    )
+    entry = file_entry('y.pdf', '0000000f1')
+    in_flight = []
+    peak = []
+
+    async def list_folder(path, recursive=False):
+        in_flight.append(path)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.remove(path)
+        return listing([entry] if path == yesterday else [], 'cursor')
+
+    client.transport.list_folder = AsyncMock(side_effect=list_folder)
+    entries = await client._find_report_entries()
+
+    assert entries == [entry]
+    assert client.transport.list_folder.call_count == LOOKBACK_DAYS
+    assert max(peak) > 1
+
+async def test_large_download_resumes_with_range(tmp_path, monkeypatch):
+    """Test that large files are re-requested from the last byte after a dropped connection."""
+    monkeypatch.setattr('utils.resumable_download.RESUME_BACKOFF_SECONDS', 0)
+    client = make_client(tmp_path)
+    client.resume_threshold = 1
+    entry = file_entry('deck.pdf', '0000000d1')
+    serve(client, full=listing([entry], 'cursor-1'))
+    content = b'%PDF-0000000d1'
+
+    def download(path, rev=None, offset=0):
+        if not offset:
+            return download_response(content[:6], aiohttp.ClientPayloadError("reset by peer"))
+        assert offset == 6
+        return download_response(content[6:], status=206)
+
+    client.transport.download = AsyncMock(side_effect=download)
+    assert await fetch(client) == {'deck.pdf': content}
+    assert client.transport.download.call_count == 2
+    assert client.download_resumes == 1
@@ -0,0 +1,117 @@
+"""Tests for the async Dropbox transport against a local stand-in for the API."""
+
+import json
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from dropbox.exceptions import ApiError, HttpError
+from clients.dropbox_transport import DropboxTransport
+
+CONTENT = b'%PDF-' + bytes(range(256)) * 4
+
+class FakeDropbox:
+    """Token, listing and download endpoints; tokens stay valid until revoke() is called."""
+
+    def __init__(self):
+        self.issued = 0
+        self.valid_token = None
+
+    def revoke(self):
+        self.valid_token = None
+
+    async def token(self, request):
+        form = await request.post()
+        assert form['grant_type'] == 'refresh_token' and form['refresh_token'] == 'refresh'
+        await asyncio.sleep(0.01)
+        self.issued += 1
+        self.valid_token = f"token-{self.issued}"
+        return web.json_response({'access_token': self.valid_token, 'expires_in': 14400})
+
+    def authorized(self, request) -> bool:
+        return request.headers.get('Authorization') == f"Bearer {self.valid_token}"
+
+    async def list_folder(self, request):
+        if not self.authorized(request):
+            return web.json_response(
+                {'error_summary': 'expired_access_token/', 'error': {'.tag': 'expired_access_token'}},
+                status=401
+            )
+        arg = await request.json()
+        if arg['path'] == '/missing':
+            return web.json_response(
+                {'error_summary': 'path/not_found/', 'error': {'.tag': 'path', 'path': {'.tag': 'not_found'}}},
+                status=409
+            )
+        if arg['path'] == '/conflict':
+            return web.Response(text='Conflict', status=409)
+        return web.json_response({'entries': [], 'cursor': f"cursor:{arg['path']}", 'has_more': False})
+
+    async def download(self, request):
+        assert self.authorized(request)
+        assert json.loads(request.headers['Dropbox-API-Arg']) == {'path': '/a.pdf', 'rev': '0000000a1'}
+        offset = int(request.headers.get('Range', 'bytes=0-')[len('bytes='):-1])
+        return web.Response(body=CONTENT[offset:], status=206 if offset else 200)
+
+@pytest.fixture
+async def api():
+    fake = FakeDropbox()
+    app = web.Application()
+    app.router.add_post('/oauth2/token', fake.token)
+    app.router.add_post('/2/files/list_folder', fake.list_folder)
+    app.router.add_post('/2/files/download', fake.download)
+    server = TestServer(app)
+    await server.start_server()
+
+    transport = DropboxTransport('refresh', 'key', 'secret', max_connections=4)
+    transport.api_url = str(server.make_url('/2'))
+    transport.content_url = transport.api_url
+    transport.token_url = str(server.make_url('/oauth2/token'))
+    yield fake, transport
+    await transport.close()
+    await server.close()
+
+async def test_concurrent_requests_share_one_token_refresh(api):
+    """Test that requests in flight refresh the token once, also after it is revoked."""
+    fake, transport = api
+
+    results = await asyncio.gather(*[transport.list_folder(f"/day{i}") for i in range(8)])
+    assert [result.cursor for result in results] == [f"cursor:/day{i}" for i in range(8)]
+    assert fake.issued == 1
+
+    fake.revoke()
+    await asyncio.gather(*[transport.list_folder(f"/day{i}") for i in range(8)])
+    assert fake.issued == 2
+
+async def test_api_errors_decode_to_sdk_types(api):
+    """Test that endpoint errors raise the SDK's ApiError with a decoded error union."""
+    fake, transport = api
+
+    with pytest.raises(ApiError) as raised:
+        await transport.list_folder('/missing')
+
+    assert raised.value.error.is_path()
+    assert raised.value.error.get_path().is_not_found()
+
+async def test_conflict_without_error_body(api):
+    """Test that a 409 without a decodable error raises a plain HttpError."""
+    fake, transport = api
+
+    with pytest.raises(HttpError) as raised:
+        await transport.list_folder('/conflict')
+
+    assert raised.value.status_code == 409
+    assert raised.value.body == 'Conflict'
+
+async def test_download_from_offset(api):
+    """Test that downloads stream the body and send a range when resuming."""
+    fake, transport = api
+
+    for offset in (0, 100):
+        response = await transport.download('/a.pdf', rev='0000000a1', offset=offset)
+        try:
+            assert response.status == (206 if offset else 200)
+            assert await response.content.read() == CONTENT[offset:]
+        finally:
+            response.release()
@@ -0,0 +1,152 @@
+"""Tests for the ExtractionCache."""
+
+import os
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from utils.extraction_cache import ExtractionCache, hash_pdf_source
+from services.text_extractor import PDFTextExtractor
+
+@pytest.fixture
+def cache(tmp_path) -> ExtractionCache:
+    """Create ExtractionCache in a temporary directory."""
+    return ExtractionCache(cache_dir=str(tmp_path / 'cache'), max_size_mb=1)
+
+@pytest.fixture
+def extraction_result() -> dict:
+    """Create a sample extraction result."""
+    return {
+        'text': "Rates strategy weekly\nCurve steepening continues into year end",
+        'file_name': 'rates.pdf',
+        'preview': 'Rates strategy weekly',
+        'stats': {'pages': 2}
+    }
+
+def test_hash_pdf_source_matches_across_inputs(tmp_path):
+    """Test that bytes and file paths with the same content hash equally."""
+    pdf_path = tmp_path / 'note.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4 sample')
+
+    assert (
+        hash_pdf_source({'name': 'a.pdf', 'content': b'%PDF-1.4 sample'})
+        == hash_pdf_source({'name': 'b.pdf', 'file_path': str(pdf_path)})
+    )
+
+def test_cache_miss_then_hit(cache, extraction_result):
+    """Test hit and miss accounting."""
+    key = cache.make_key({'name': 'rates.pdf', 'content': b'pdf-bytes'}, 'v1')
+
+    assert cache.get(key) is None
+    cache.put(key, extraction_result)
+    assert cache.get(key) == extraction_result
+
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 1
+    assert cache.stats['entries'] == 1
+
+def test_cache_key_depends_on_settings(cache):
+    """Test that extraction settings are part of the key."""
+    pdf_data = {'name': 'rates.pdf', 'content': b'pdf-bytes'}
+
+    assert cache.make_key(pdf_data, 'v1') != cache.make_key(pdf_data, 'v2')
+
+def test_cache_lru_eviction(tmp_path, extraction_result):
+    """Test that least recently used entries are evicted first."""
+    entry_size = len(str(extraction_result))
+    cache = ExtractionCache(
+        cache_dir=str(tmp_path / 'cache'),
+        max_size_mb=(entry_size * 2.5) / (1024 * 1024)
+    )
+    keys = [cache.make_key({'name': 'f.pdf', 'content': bytes([i])}, 'v1') for i in range(3)]
+
+    cache.put(keys[0], extraction_result)
+    cache.put(keys[1], extraction_result)
+    cache.get(keys[0])  # Touch the oldest entry
+    cache.put(keys[2], extraction_result)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats['evictions'] == 1
+
+def test_trim_bounds_entries_written_by_workers(tmp_path, extraction_result):
+    """Test that trimming counts entries from every worker sharing the directory."""
+    cache_dir = str(tmp_path / 'cache')
+    entry_size = len(str(extraction_result))
+    max_size_mb = (entry_size * 2.5) / (1024 * 1024)
+    workers = [ExtractionCache(cache_dir=cache_dir, max_size_mb=max_size_mb, evict=False) for _ in range(2)]
+    owner = ExtractionCache(cache_dir=cache_dir, max_size_mb=max_size_mb)
+    keys = [ExtractionCache.make_digest_key(f"page-{i}", 'v1') for i in range(4)]
+
+    for i, key in enumerate(keys):
+        workers[i % 2].put(key, extraction_result)
+        os.utime(os.path.join(cache_dir, f"{key}.json"), (1000 + i, 1000 + i))
+    assert all(worker.stats['evictions'] == 0 for worker in workers)
+
+    owner.trim()
+
+    assert sorted(name[:-5] for name in os.listdir(cache_dir)) == sorted(keys[2:])
+    assert owner.stats['evictions'] == 2
+    assert owner.stats['size_mb'] <= max_size_mb
+
+def test_cache_index_survives_restart(tmp_path, extraction_result):
+    """Test that entries are found again by a new cache instance."""
+    cache_dir = str(tmp_path / 'cache')
+    key = ExtractionCache(cache_dir=cache_dir).make_key({'name': 'f.pdf', 'content': b'x'}, 'v1')
+    ExtractionCache(cache_dir=cache_dir).put(key, extraction_result)
+
+    assert ExtractionCache(cache_dir=cache_dir).get(key) == extraction_result
+
+@pytest.mark.asyncio
+async def test_text_extractor_uses_cache(cache):
+    """Test that a re-run of the same PDF skips extraction."""
+    text = "\n".join(f"Line {i} of the weekly market commentary report" for i in range(40))
+    pdf_processor = MagicMock()
+    pdf_processor.cache_fingerprint.return_value = 'layout-v1'
+    pdf_processor.extract = AsyncMock(return_value={
+        'text': text,
+        'file_name': 'weekly.pdf',
+        'preview': text[:100]
+    })
+    extractor = PDFTextExtractor(pdf_processor=pdf_processor, cache=cache)
+
+    first = await extractor.extract({'name': 'weekly.pdf', 'content': b'pdf-bytes'})
+    second = await extractor.extract({'name': 'weekly-copy.pdf', 'content': b'pdf-bytes'})
+
+    assert pdf_processor.extract.await_count == 1
+    assert second['text'] == first['text']
+    assert second['file_name'] == 'weekly-copy.pdf'
+    assert cache.stats['hits'] == 1
+
+@pytest.mark.asyncio
+async def test_text_extractor_cache_io_runs_off_event_loop(cache, monkeypatch):
+    """Test that hashing, lookups and stores run outside the event loop thread."""
+    text = "\n".join(f"Line {i} of the weekly market commentary report" for i in range(40))
+    pdf_processor = MagicMock()
+    pdf_processor.cache_fingerprint.return_value = 'layout-v1'
+    pdf_processor.extract = AsyncMock(return_value={'text': text, 'file_name': 'weekly.pdf', 'preview': text[:100]})
+    extractor = PDFTextExtractor(pdf_processor=pdf_processor, cache=cache)
+    threads = {}
+    for name in ('make_key', 'get', 'put'):
+        def record(*args, _name=name, _method=getattr(cache, name)):
+            threads[_name] = threading.current_thread()
+            return _method(*args)
+        monkeypatch.setattr(cache, name, record)
+
+    await extractor.extract({'name': 'weekly.pdf', 'content': b'pdf-bytes'})
+
+    assert set(threads) == {'make_key', 'get', 'put'}
+    assert all(thread is not threading.main_thread() for thread in threads.values())
+
+def test_cache_sees_entries_from_other_processes(tmp_path, extraction_result):
+    """Test that entries written through another instance are found."""
+    cache_dir = str(tmp_path / 'cache')
+    reader = ExtractionCache(cache_dir=cache_dir)
+    writer = ExtractionCache(cache_dir=cache_dir)
+    key = ExtractionCache.make_digest_key('page-digest', 'v1')
+
+    writer.put(key, extraction_result)
+
+    assert reader.get(key) == extraction_result
+    assert reader.stats['entries'] == 1
@@ -0,0 +1,72 @@
+"""Tests for reading reports from a local copy of the folder layout."""
+
+import os
+from datetime import date
+
+from clients.local_report_source import LocalReportSource
+
+def write_report(root, day_folder: str, name: str, content: bytes, mtime: float):
+    path = root.joinpath('Current', *day_folder.split('/'), *name.split('/'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+    return path
+
+async def test_fetches_most_recent_day_in_lookback(tmp_path):
+    """Test that the newest day folder with PDFs wins and files are read in place."""
+    write_report(tmp_path, '2025/March/Mar 1', 'old.pdf', b'%PDF-old', 1000)
+    newer = write_report(tmp_path, '2025/March/Mar 2', 'Equity/b.pdf', b'%PDF-b', 3000)
+    write_report(tmp_path, '2025/March/Mar 2', 'a.pdf', b'%PDF-a', 2000)
+    write_report(tmp_path, '2025/March/Mar 2', 'notes.txt', b'skip', 4000)
+
+    source = LocalReportSource(str(tmp_path), as_of=date(2025, 3, 3))
+    reports = await source.fetch_reports(None)
+
+    assert [report['name'] for report in reports] == ['b.pdf', 'a.pdf']
+    assert reports[0]['path'] == '/Current/2025/March/Mar 2/Equity/b.pdf'
+    with reports[0]['document'] as document:
+        assert document.file_path == str(newer)
+        stream = document.open_stream()
+        try:
+            assert stream.read() == b'%PDF-b'
+        finally:
+            stream.close()
+    reports[1]['document'].release()
+    assert newer.exists()
+
+async def test_streams_nothing_outside_lookback(tmp_path):
+    """Test that folders older than the lookback window are ignored."""
+    write_report(tmp_path, '2025/February/Feb 20', 'a.pdf', b'%PDF-a', 1000)
+
+    source = LocalReportSource(str(tmp_path), as_of=date(2025, 3, 3))
+    assert [report async for report in source.iter_reports(None)] == []
+
+async def test_identical_files_are_streamed_once(tmp_path):
+    """Test that copies under other names are hashed, dropped and recorded as aliases."""
+    write_report(tmp_path, '2025/March/Mar 2', 'Equity/outlook.pdf', b'%PDF-same', 3000)
+    write_report(tmp_path, '2025/March/Mar 2', 'Macro/outlook (1).pdf', b'%PDF-same', 2000)
+    write_report(tmp_path, '2025/March/Mar 2', 'other.pdf', b'%PDF-other', 1000)
+
+    source = LocalReportSource(str(tmp_path), as_of=date(2025, 3, 3), max_workers=1)
+    reports = []
+    async for report in source.iter_reports(None):
+        reports.append(report)
+        report['document'].release()
+
+    assert [(report['name'], report['aliases']) for report in reports] == [
+        ('outlook.pdf', ['/Current/2025/March/Mar 2/Macro/outlook (1).pdf']),
+        ('other.pdf', [])
+    ]
+
+async def test_backfill_day_reads_only_its_folder(tmp_path):
+    """Test that a requested day is read without falling back to earlier days."""
+    write_report(tmp_path, '2025/March/Mar 1', 'fri.pdf', b'%PDF-fri', 1000)
+    write_report(tmp_path, '2025/March/Mar 3', 'mon.pdf', b'%PDF-mon', 2000)
+    source = LocalReportSource(str(tmp_path), as_of=date(2025, 3, 3))
+
+    friday = [report async for report in source.iter_reports(None, day=date(2025, 3, 1))]
+    saturday = [report async for report in source.iter_reports(None, day=date(2025, 3, 2))]
+
+    assert [report['name'] for report in friday] == ['fri.pdf']
+    assert saturday == []
+    friday[0]['document'].release()
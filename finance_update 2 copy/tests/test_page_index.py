@@ -0,0 +1,99 @@
+"""Tests for the page offset index."""
+
+import re
+from unittest.mock import AsyncMock, MagicMock
+
+from services.chunk_manager import ChunkManager
+from services.summarizer_service import SummarizerService
+from utils.page_index import PageOffsetIndex
+from utils.text_cleaning import filter_indexed_lines
+from utils.structured_extractor import StructuredExtractor
+
+def test_join_records_page_starts():
+    """Test that joined pages start at the recorded offsets."""
+    pages = ["Overview\nRates rallied", "", "Credit\nSpreads tightened", "Appendix"]
+    text, index = PageOffsetIndex.join(pages)
+
+    assert text == "Overview\nRates rallied\n\nCredit\nSpreads tightened\n\nAppendix"
+    assert index.page_count == 4
+    assert text[index.starts[2]:].startswith("Credit")
+    # The empty page starts where the next page does
+    assert index.starts[1] == index.starts[2]
+
+def test_page_at_and_page_ref():
+    """Test offset lookups across page boundaries."""
+    text, index = PageOffsetIndex.join(["alpha beta", "gamma", "delta"])
+
+    assert index.page_at(0) == 1
+    assert index.page_at(text.index("gamma")) == 2
+    assert index.page_at(len(text) + 10) == 3
+    assert index.page_ref(text.index("beta"), text.index("gamma") + 5) == "1-2"
+    assert index.page_ref(text.index("delta"), len(text)) == "3"
+    assert PageOffsetIndex.from_list(index.to_list()) == index
+
+def test_filter_lines_remaps_index():
+    """Test that dropping lines keeps each page's text under its page number."""
+    pages = [
+        "Header\nEquities\nValuations look stretched",
+        "Disclaimer: not advice\nFixed income\nDuration is attractive",
+        "Footer"
+    ]
+    text, index = PageOffsetIndex.join(pages)
+
+    filtered, _, remapped = filter_indexed_lines(
+        text, re.compile(r'disclaimer', re.IGNORECASE), 1, edge_lines=1, page_index=index
+    )
+
+    assert "Disclaimer" not in filtered
+    assert remapped.page_count == 3
+    assert remapped.page_at(filtered.index("Valuations")) == 1
+    assert remapped.page_at(filtered.index("Fixed income")) == 2
+    assert remapped.page_at(filtered.index("Duration")) == 2
+    # The last page's only line was an edge line
+    assert remapped.starts[2] == len(filtered)
+
+def test_structured_extractor_resolves_pages():
+    """Test that data points resolve to their own page when an index is given."""
+    text, index = PageOffsetIndex.join([
+        "Revenue rose 12% in the quarter.",
+        "Guidance implies $4.2 billion of sales."
+    ])
+
+    data = StructuredExtractor().extract_financial_data(text, 'note.pdf', '1', page_index=index)
+
+    refs = {point.value: point.page_ref for point in data['numbers']}
+    assert refs['12%'] == '1'
+    assert refs['$4.2 billion'] == '2'
+
+def test_chunks_resolve_pages():
+    """Test that chunks record the pages their paragraphs came from."""
+    pages = [
+        "Equities\n\nValuations look stretched across large caps.",
+        "Fixed income\n\nDuration is attractive again.",
+        "Credit\n\nSpreads tightened further."
+    ]
+    text, index = PageOffsetIndex.join(pages)
+
+    chunks = ChunkManager().chunk_text(text, max_tokens=12, page_index=index)
+
+    assert [(chunk, meta.page_ref) for chunk, meta in chunks] == [
+        ("Equities\n\nValuations look stretched across large caps.\n\nFixed income", '1-2'),
+        ("Duration is attractive again.\n\nCredit\n\nSpreads tightened further.", '2-3')
+    ]
+    assert all(meta.page_ref is None for _, meta in ChunkManager().chunk_text(text, max_tokens=12))
+
+async def test_summaries_use_page_offsets_of_extraction_results():
+    """Test that extraction results streamed to the summarizer keep their page index."""
+    text, index = PageOffsetIndex.join(["Rates rallied.", "Spreads tightened."])
+    summarizer = SummarizerService(MagicMock(), ChunkManager(), MagicMock())
+    summarizer.process_report_text = AsyncMock(return_value="Summary")
+
+    async def results():
+        yield {'text': text, 'page_offsets': index.to_list()}
+        yield "Plain text without pages."
+
+    assert await summarizer.generate_initial_summaries_as_ready(results()) == ["Summary", "Summary"]
+
+    calls = summarizer.process_report_text.call_args_list
+    assert calls[0].kwargs['text'] == text and calls[0].kwargs['page_index'] == index
+    assert calls[1].kwargs['page_index'] is None
@@ -0,0 +1,29 @@
+"""Tests for the PDFFetcher."""
+
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+from services.pdf_fetcher import PDFFetcher
+from utils.document_handle import DocumentHandle
+
+async def test_fetched_documents_stay_spooled_until_released(tmp_path):
+    """Test that spooled reports come back as handles and release_pdfs removes their files."""
+    documents = [
+        DocumentHandle.from_chunks(f"{name}.pdf", [f"%PDF-{name}".encode()], spool_threshold=0, spool_dir=str(tmp_path))
+        for name in ('a', 'b')
+    ]
+    source = MagicMock()
+    source.fetch_reports = AsyncMock(return_value=[
+        {'name': document.name, 'path': f"/Current/{document.name}", 'document': document, 'aliases': []}
+        for document in documents
+    ])
+
+    pdf_files = await PDFFetcher(source).fetch_pdfs(None)
+
+    assert [pdf['document'] for pdf in pdf_files] == documents
+    assert all('content' not in pdf for pdf in pdf_files)
+    assert len(os.listdir(tmp_path)) == 2
+
+    PDFFetcher.release_pdfs(pdf_files)
+
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,700 @@
+"""Tests for the PDFProcessor."""
+
+import io
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+from typing import List
+
+import utils.pdf_processor as pdf_processor_module
+from utils.pdf_processor import PDFProcessor, PageText
+from utils.page_index import PageOffsetIndex
+
+def build_pdf(pages: List[str]) -> bytes:
+    """Build an in-memory PDF with one text block per page."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    for page_text in pages:
+        text_object = c.beginText(40, 750)
+        text_object.setFont('Helvetica', 12)
+        for line in page_text.split('\n'):
+            text_object.textLine(line)
+        c.drawText(text_object)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+@pytest.fixture
+def sample_pages() -> List[str]:
+    """Create sample page texts."""
+    return [
+        f"Page {i + 1} market commentary\nRevenue grew {i + 10}% year over year"
+        for i in range(3)
+    ]
+
+@pytest.fixture
+def sample_pdf(sample_pages) -> bytes:
+    """Create a small multi-page PDF."""
+    return build_pdf(sample_pages)
+
+@pytest.fixture
+def thread_processor():
+    """Create thread-backed PDFProcessor."""
+    processor = PDFProcessor(max_workers=2)
+    yield processor
+    processor.close()
+
+@pytest.fixture
+def process_processor():
+    """Create process-backed PDFProcessor."""
+    processor = PDFProcessor(max_workers=2, backend='process')
+    yield processor
+    processor.close()
+
+def test_invalid_backend():
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError):
+        PDFProcessor(backend='gpu')
+
+@pytest.mark.asyncio
+async def test_extract_thread_backend(thread_processor, sample_pdf):
+    """Test extraction on the thread backend."""
+    result = await thread_processor.extract({'name': 'note.pdf', 'content': sample_pdf})
+
+    assert 'error' not in result
+    assert 'Page 1 market commentary' in result['text']
+    assert 'Revenue grew 12%' in result['text']
+    assert result['stats']['pages'] == 3
+    assert result['stats']['backend'] == 'thread'
+
+@pytest.mark.asyncio
+async def test_extract_process_backend_matches_thread(
+    thread_processor,
+    process_processor,
+    sample_pdf
+):
+    """Test that the process backend returns the same text as the thread backend."""
+    pdf_data = {'name': 'note.pdf', 'content': sample_pdf}
+    thread_result = await thread_processor.extract(pdf_data)
+    process_result = await process_processor.extract(pdf_data)
+
+    assert process_result['text'] == thread_result['text']
+    assert process_result['file_name'] == 'note.pdf'
+    assert process_result['stats']['backend'] == 'process'
+    assert process_result['stats']['pages'] == 3
+
+@pytest.mark.asyncio
+async def test_extract_process_backend_from_path(process_processor, sample_pdf, tmp_path):
+    """Test that workers can read the PDF from a file path."""
+    pdf_path = tmp_path / 'note.pdf'
+    pdf_path.write_bytes(sample_pdf)
+
+    result = await process_processor.extract({'name': 'note.pdf', 'file_path': str(pdf_path)})
+
+    assert 'Page 3 market commentary' in result['text']
+
+@pytest.mark.asyncio
+async def test_extract_process_backend_error(process_processor):
+    """Test that worker failures come back as error results."""
+    result = await process_processor.extract({'name': 'broken.pdf', 'content': b'not a pdf'})
+
+    assert result['text'] == ''
+    assert 'broken.pdf' in result['error']
+
+@pytest.mark.asyncio
+async def test_page_parallel_extraction_preserves_order(thread_processor):
+    """Test that page ranges are reassembled in page order."""
+    pages = [f"Section {i + 1} strategy outlook" for i in range(9)]
+    pdf_data = {'name': 'deck.pdf', 'content': build_pdf(pages)}
+    processor = PDFProcessor(
+        max_workers=3,
+        backend='process',
+        page_parallel_threshold=5,
+        pages_per_range=2
+    )
+    try:
+        result = await processor.extract(pdf_data)
+    finally:
+        processor.close()
+    expected = await thread_processor.extract(pdf_data)
+
+    assert result['stats']['page_ranges'] == 5
+    assert result['stats']['pages'] == 9
+    assert result['text'] == expected['text']
+
+@pytest.mark.asyncio
+async def test_page_parallel_below_threshold(sample_pdf):
+    """Test that small documents keep the single-worker path."""
+    processor = PDFProcessor(max_workers=2, backend='process', page_parallel_threshold=10)
+    try:
+        result = await processor.extract({'name': 'note.pdf', 'content': sample_pdf})
+    finally:
+        processor.close()
+
+    assert 'page_ranges' not in result['stats']
+    assert result['stats']['pages'] == 3
+
+def test_count_pages(thread_processor, sample_pdf):
+    """Test page counting without layout analysis."""
+    assert thread_processor.count_pages({'name': 'note.pdf', 'content': sample_pdf}) == 3
+
+async def collect_pages(processor: PDFProcessor, pdf_data) -> List[PageText]:
+    """Collect all pages from the streaming API."""
+    return [page async for page in processor.iter_pages(pdf_data)]
+
+@pytest.mark.asyncio
+async def test_iter_pages_thread_backend(thread_processor, sample_pdf, sample_pages):
+    """Test streaming pages on the thread backend."""
+    pages = await collect_pages(thread_processor, {'name': 'note.pdf', 'content': sample_pdf})
+
+    assert [page.page_number for page in pages] == [1, 2, 3]
+    for page, expected in zip(pages, sample_pages):
+        assert page.text == expected
+
+@pytest.mark.asyncio
+async def test_iter_pages_process_backend(thread_processor):
+    """Test streaming pages from page ranges on the process backend."""
+    page_texts = [f"Section {i + 1} rates outlook" for i in range(7)]
+    pdf_data = {'name': 'deck.pdf', 'content': build_pdf(page_texts)}
+    processor = PDFProcessor(max_workers=2, backend='process', pages_per_range=3)
+    try:
+        pages = await collect_pages(processor, pdf_data)
+    finally:
+        processor.close()
+
+    assert [page.page_number for page in pages] == list(range(1, 8))
+    assert [page.text for page in pages] == page_texts
+
+@pytest.mark.asyncio
+async def test_iter_pages_early_exit(thread_processor, sample_pdf):
+    """Test that a consumer can stop streaming early."""
+    pages = thread_processor.iter_pages({'name': 'note.pdf', 'content': sample_pdf})
+    async for page in pages:
+        assert page.page_number == 1
+        break
+    await pages.aclose()
+
+@pytest.fixture
+def mixed_pdf() -> bytes:
+    """Create a PDF with one prose page and one sparse page."""
+    prose = "\n".join(
+        "Treasury yields rose as investors priced fewer rate cuts this year"
+        for _ in range(4)
+    )
+    return build_pdf([prose, "Figure 3"])
+
+def test_text_layer_acceptable():
+    """Test the text-layer quality check."""
+    prose = "Equity markets rallied on strong earnings and softer inflation data " * 3
+
+    assert PDFProcessor.text_layer_acceptable(prose)
+    assert not PDFProcessor.text_layer_acceptable("Chart 1 Source")
+    assert not PDFProcessor.text_layer_acceptable("R e v e n u e g r o w t h " * 5)
+    assert not PDFProcessor.text_layer_acceptable("Equitymarketsralliedonstrongearnings " * 25)
+
+def test_invalid_extraction_strategy():
+    """Test that unknown strategies are rejected."""
+    with pytest.raises(ValueError):
+        PDFProcessor(extraction_strategy='ocr')
+
+@pytest.mark.asyncio
+async def test_text_layer_first_falls_back_per_page(mixed_pdf):
+    """Test that only pages failing the quality check use layout analysis."""
+    processor = PDFProcessor(max_workers=1, extraction_strategy='text_layer_first')
+    try:
+        result = await processor.extract({'name': 'mixed.pdf', 'content': mixed_pdf})
+    finally:
+        processor.close()
+
+    stats = result['stats']
+    assert stats['page_paths'] == ['text_layer', 'layout']
+    assert stats['text_layer_pages'] == 1
+    assert stats['layout_pages'] == 1
+    assert 'estimated_seconds_saved' in stats
+    assert 'Treasury yields rose' in result['text']
+    assert 'Figure 3' in result['text']
+
+@pytest.mark.asyncio
+async def test_text_layer_first_page_ranges(mixed_pdf):
+    """Test that page paths are merged across parallel page ranges."""
+    processor = PDFProcessor(
+        max_workers=2,
+        backend='process',
+        page_parallel_threshold=2,
+        pages_per_range=1,
+        extraction_strategy='text_layer_first'
+    )
+    try:
+        result = await processor.extract({'name': 'mixed.pdf', 'content': mixed_pdf})
+    finally:
+        processor.close()
+
+    assert result['stats']['page_paths'] == ['text_layer', 'layout']
+
+def test_max_pages_keeps_leading_pages(sample_pdf):
+    """Test that the page cap keeps the first pages and marks the result partial."""
+    processor = PDFProcessor(max_workers=1, max_pages=2)
+    try:
+        result = processor.process_pdf({'name': 'note.pdf', 'content': sample_pdf})
+    finally:
+        processor.close()
+
+    assert result['partial']
+    assert result['stats']['partial_reason'] == 'page_limit'
+    assert result['stats']['pages'] == 2
+    assert 'Page 2 market commentary' in result['text']
+    assert 'Page 3' not in result['text']
+
+def test_deadline_keeps_extracted_pages(thread_processor, sample_pdf, monkeypatch):
+    """Test that pages extracted before the deadline are kept."""
+    stats = {}
+    deadline = time.time() + 60
+    pages = thread_processor.iter_page_texts(io.BytesIO(sample_pdf), stats=stats, deadline=deadline)
+    first_page = next(pages)
+
+    # Jump past the deadline between pages
+    monkeypatch.setattr(pdf_processor_module, 'time', SimpleNamespace(time=lambda: deadline + 1))
+    remaining = list(pages)
+
+    assert 'Page 1 market commentary' in first_page
+    assert remaining == []
+    assert stats['partial']
+    assert stats['partial_reason'] == 'deadline'
+
+def test_deadline_interrupts_page_in_worker(monkeypatch):
+    """Test that worker processes interrupt a page that runs past the deadline."""
+    monkeypatch.setattr(pdf_processor_module, '_in_worker_process', True)
+
+    with pytest.raises(pdf_processor_module._DeadlineExceeded):
+        with pdf_processor_module._interrupt_at(time.time() + 0.1):
+            time.sleep(5)
+
+def test_invalid_limits():
+    """Test that non-positive deadlines and page caps are rejected."""
+    with pytest.raises(ValueError):
+        PDFProcessor(document_timeout=0)
+    with pytest.raises(ValueError):
+        PDFProcessor(max_pages=-1)
+
+@pytest.mark.asyncio
+async def test_page_parallel_max_pages():
+    """Test that the page cap limits the ranges handed to workers."""
+    pages = [f"Section {i + 1} credit outlook" for i in range(9)]
+    processor = PDFProcessor(
+        max_workers=2,
+        backend='process',
+        page_parallel_threshold=5,
+        pages_per_range=2,
+        max_pages=5
+    )
+    try:
+        result = await processor.extract({'name': 'deck.pdf', 'content': build_pdf(pages)})
+    finally:
+        processor.close()
+
+    assert result['partial']
+    assert result['stats']['page_ranges'] == 3
+    assert result['stats']['pages'] == 5
+    assert 'Section 5 credit outlook' in result['text']
+    assert 'Section 6' not in result['text']
+
+@pytest.mark.asyncio
+async def test_stuck_worker_restarts_pool(sample_pdf, monkeypatch):
+    """Test that a worker that ignores its deadline gets its pool replaced."""
+    monkeypatch.setattr(pdf_processor_module, 'DEADLINE_GRACE_SECONDS', 0.5)
+    processor = PDFProcessor(max_workers=1, backend='process')
+    try:
+        original_executor = processor.executor
+        stuck = asyncio.ensure_future(processor._run_in_worker(time.time(), time.sleep, 2))
+        await asyncio.sleep(0.1)
+        # Documents queued behind the stuck worker still complete after the restart
+        queued = asyncio.gather(*(
+            processor.extract({'name': f'queued{i}.pdf', 'content': sample_pdf}) for i in range(3)
+        ))
+        with pytest.raises(asyncio.TimeoutError):
+            await stuck
+
+        assert processor.executor is not original_executor
+        assert [result['stats']['pages'] for result in await queued] == [3, 3, 3]
+        result = await processor.extract({'name': 'note.pdf', 'content': sample_pdf})
+        assert result['stats']['pages'] == 3
+    finally:
+        processor.close()
+
+@pytest.mark.asyncio
+async def test_page_count_timeout_returns_deadline_error(sample_pdf, monkeypatch):
+    """Test that a page count killed at the deadline fails the document instead of retrying it."""
+    processor = PDFProcessor(max_workers=1, backend='process', document_timeout=5)
+    calls = []
+
+    async def run_in_worker(deadline, func, *args):
+        calls.append(func)
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(processor, '_run_in_worker', run_in_worker)
+    try:
+        result = await processor.extract({'name': 'note.pdf', 'content': sample_pdf})
+    finally:
+        processor.close()
+
+    assert calls == [pdf_processor_module._count_pages_in_worker]
+    assert 'did not stop within 5s deadline' in result['error']
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+async def test_extract_spooled_document(backend, sample_pdf, tmp_path):
+    """Test extraction from a document spooled to disk."""
+    from utils.document_handle import DocumentHandle
+
+    document = DocumentHandle.from_chunks(
+        'note.pdf',
+        [sample_pdf],
+        spool_threshold=1024,
+        spool_dir=str(tmp_path)
+    )
+    processor = PDFProcessor(max_workers=1, backend=backend, extraction_strategy='text_layer_first')
+    try:
+        assert document.on_disk
+        result = await processor.extract({'name': 'note.pdf', 'document': document})
+    finally:
+        processor.close()
+        document.release()
+
+    assert result['stats']['pages'] == 3
+    assert 'Page 2 market commentary' in result['text']
+
+def test_repeated_header_lines_removed(thread_processor):
+    """Test that running headers are stripped before pages are joined."""
+    pages = [
+        "\n".join(
+            ["Credit Strategy Weekly", "Analyst: A. Chen"]
+            + [f"Issuer {chr(65 + i)} note {k}: spreads moved on supply" for k in range(6)]
+            + [f"Page {i + 1}"]
+        )
+        for i in range(4)
+    ]
+    result = thread_processor.process_pdf({'name': 'weekly.pdf', 'content': build_pdf(pages)})
+
+    assert result['stats']['repeated_lines_removed'] == 12
+    assert 'Credit Strategy Weekly' not in result['text']
+    assert 'Issuer C note 5' in result['text']
+
+def test_page_offsets_mark_page_starts(thread_processor, sample_pdf):
+    """Test that the page offset index points at each page's cleaned text."""
+    result = thread_processor.process_pdf({'name': 'note.pdf', 'content': sample_pdf})
+
+    offsets = result['page_offsets']
+    assert len(offsets) == 3
+    for page_number, offset in enumerate(offsets, start=1):
+        assert result['text'][offset:].startswith(f"Page {page_number} market commentary")
+
+def disclosure_report_pages() -> List[str]:
+    """Three research pages followed by a four-page disclosure appendix."""
+    regions = ['Americas', 'Europe', 'Asia']
+    research = [
+        "\n".join(f"{region} segment {k} revenue grew on pricing and volume gains" for k in range(12))
+        for region in regions
+    ]
+    disclosures = "\n".join(
+        "The research analyst received compensation tied to investment banking; "
+        "FINRA conflicts of interest apply"
+        for _ in range(12)
+    )
+    return research + ["Important Disclosures\n" + disclosures] + [disclosures] * 3
+
+def test_disclosure_appendix_stops_extraction(thread_processor):
+    """Test that extraction stops at a confirmed appendix and drops it."""
+    pages = disclosure_report_pages()
+    result = thread_processor.process_pdf({'name': 'note.pdf', 'content': build_pdf(pages)})
+
+    stats = result['stats']
+    assert 'Asia segment 11 revenue' in result['text']
+    assert 'FINRA' not in result['text']
+    assert stats['pages'] == 5
+    assert stats['disclosure_pages_skipped'] == 2
+    assert stats['disclosure_start_page'] == 4
+    assert stats['disclosure_pages_removed'] == 4
+    assert len(result['page_offsets']) == 3
+    # Skipped pages are priced like the extracted disclosure pages
+    appendix_words = sum(len(page.split()) for page in pages[3:])
+    assert stats['disclosure_tokens_removed'] == pytest.approx(appendix_words * 1.3, rel=0.05)
+
+@pytest.mark.asyncio
+async def test_iter_pages_stops_at_disclosures(thread_processor):
+    """Test that streamed pages end before the disclosure appendix."""
+    pdf = build_pdf(disclosure_report_pages())
+    pages = await collect_pages(thread_processor, {'name': 'note.pdf', 'content': pdf})
+
+    assert [page.page_number for page in pages] == [1, 2, 3]
+    assert all('FINRA' not in page.text for page in pages)
+
+@pytest.mark.asyncio
+async def test_iter_pages_cuts_at_later_candidate(thread_processor):
+    """Test that streaming cuts at the heading that was confirmed, not an earlier rejected one."""
+    research = disclosure_report_pages()[:3]
+    disclosures = disclosure_report_pages()[-1]
+    pages = [
+        research[0],
+        research[1] + "\nImportant Disclosures",
+        "\n".join([research[2]] * 3) + "\nImportant Disclosures\n" + disclosures.split("\n")[0],
+        disclosures
+    ]
+    streamed = await collect_pages(thread_processor, {'name': 'note.pdf', 'content': build_pdf(pages)})
+
+    assert [page.page_number for page in streamed] == [1, 2, 3]
+    assert 'Europe segment 11 revenue' in streamed[1].text
+    assert 'Asia segment 11 revenue' in streamed[2].text
+    assert all('FINRA' not in page.text for page in streamed)
+
+def running_header_pages(count: int) -> List[str]:
+    """Research pages under a running header and a numbered footer."""
+    topics = ['Treasuries', 'Bunds', 'Gilts', 'JGBs', 'Swaps', 'Munis', 'Agencies', 'Linkers']
+    return [
+        f"Acme Research | Weekly Rates\n"
+        f"{topics[i]} saw curve moves across tenors\n"
+        f"Real yields on {topics[i]} rose on supply\n"
+        f"Page {i + 1} of {count}"
+        for i in range(count)
+    ]
+
+@pytest.mark.asyncio
+async def test_iter_pages_cleans_like_extract(thread_processor):
+    """Test that streamed pages drop running headers and footers and join to extract()'s text."""
+    pdf_data = {'name': 'note.pdf', 'content': build_pdf(running_header_pages(5))}
+
+    streamed = await collect_pages(thread_processor, pdf_data)
+    result = thread_processor.process_pdf(pdf_data)
+
+    assert all('Acme Research' not in page.text and 'Page ' not in page.text for page in streamed)
+    text, index = PageOffsetIndex.join([page.text for page in streamed])
+    assert text == result['text']
+    assert index.to_list() == result['page_offsets']
+
+@pytest.mark.asyncio
+async def test_repeated_lines_are_learned_from_lookahead_window():
+    """Test that pages after the window are stripped with the lines found within it."""
+    pages = running_header_pages(6)
+    pages[4] = "Acme Research | Weekly Rates\nCharts follow\nPage 5 of 6"
+
+    async def raw_pages():
+        for page in pages:
+            yield page
+
+    stripped = [page async for page in PDFProcessor._without_repeated_lines(raw_pages(), window=3)]
+
+    assert stripped[0] == "Treasuries saw curve moves across tenors\nReal yields on Treasuries rose on supply"
+    assert stripped[4] == "Charts follow"
+    assert stripped[5] == "Munis saw curve moves across tenors\nReal yields on Munis rose on supply"
+
+def test_footer_heading_before_chart_keeps_later_pages(thread_processor):
+    """Test that a footer heading followed by a chart page does not stop extraction."""
+    research = disclosure_report_pages()[:3]
+    pages = [
+        research[0],
+        research[1] + "\nImportant Disclosures",
+        "Figure 3: EBITDA bridge",
+        research[2],
+        research[0]
+    ]
+    result = thread_processor.process_pdf({'name': 'note.pdf', 'content': build_pdf(pages)})
+
+    assert result['stats']['pages'] == 5
+    assert 'disclosure_pages_skipped' not in result['stats']
+    assert 'Asia segment 11 revenue' in result['text']
+
+def test_unconfirmed_early_stop_extracts_skipped_pages(thread_processor, monkeypatch):
+    """Test that pages skipped at an appendix the document-wide rule rejects are extracted."""
+    class EagerDetector:
+        def __init__(self):
+            self.pages_seen = 0
+
+        def add(self, text):
+            self.pages_seen += 1
+            return self.pages_seen >= 2
+
+    monkeypatch.setattr(pdf_processor_module, 'DisclosureTailDetector', EagerDetector)
+    pages = disclosure_report_pages()[:3]
+    result = thread_processor.process_pdf({'name': 'note.pdf', 'content': build_pdf(pages)})
+
+    assert result['stats']['pages'] == 3
+    assert 'disclosure_pages_skipped' not in result['stats']
+    assert 'Asia segment 11 revenue' in result['text']
+
+def test_page_cache_reuses_unchanged_pages(tmp_path):
+    """Test that a revised PDF only runs layout analysis on changed pages."""
+    original = [f"Section {i + 1} credit outlook\nSpreads widened {i + 5}bp on supply" for i in range(4)]
+    revised = list(original)
+    revised[2] = "Section 3 credit outlook\nSpreads tightened 4bp on inflows (corrected)"
+    processor = PDFProcessor(page_cache_dir=str(tmp_path / 'pages'))
+    try:
+        first = processor.process_pdf({'name': 'v1.pdf', 'content': build_pdf(original)})
+        second = processor.process_pdf({'name': 'v2.pdf', 'content': build_pdf(revised)})
+    finally:
+        processor.close()
+    uncached = PDFProcessor().process_pdf({'name': 'v2.pdf', 'content': build_pdf(revised)})
+
+    assert first['stats']['layout_pages'] == 4
+    assert second['stats']['page_cache_pages'] == 3
+    assert second['stats']['layout_pages'] == 1
+    assert second['stats']['page_paths'][2] == 'layout'
+    assert second['text'] == uncached['text']
+    assert 'tightened 4bp' in second['text']
+
+@pytest.mark.asyncio
+async def test_process_backend_trims_shared_page_cache(tmp_path):
+    """Test that the page cache written by worker processes is held to its size bound."""
+    cache_dir = tmp_path / 'pages'
+    pages = [f"Section {i + 1} credit outlook\nSpreads widened {i + 5}bp on supply" for i in range(6)]
+    processor = PDFProcessor(
+        max_workers=2,
+        backend='process',
+        page_cache_dir=str(cache_dir),
+        page_cache_max_mb=200 / (1024 * 1024)
+    )
+    try:
+        result = await processor.extract({'name': 'note.pdf', 'content': build_pdf(pages)})
+    finally:
+        processor.close()
+
+    assert result['stats']['pages'] == 6
+    sizes = [entry.stat().st_size for entry in cache_dir.iterdir() if entry.suffix == '.json']
+    assert sizes and sum(sizes) <= 200
+
+def build_table_pdf(rows: List[List[str]], columns: List[int]) -> bytes:
+    """Build a one-page PDF with a sentence above and below a positioned grid of cells."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    c.setFont('Helvetica', 11)
+    c.drawString(40, 750, "Quarterly results beat expectations on stronger pricing.")
+    y = 720
+    for row in rows:
+        for x, cell in zip(columns, row):
+            c.drawString(x, y, cell)
+        y -= 16
+    c.drawString(40, y - 14, "We reiterate our Overweight rating and price target.")
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def test_invalid_table_mode():
+    """Test that unknown table modes are rejected."""
+    with pytest.raises(ValueError):
+        PDFProcessor(table_mode='html')
+
+def test_table_mode_tsv_renders_rows():
+    """Test that a numeric grid comes out as tab-separated rows between prose."""
+    rows = [
+        ["Metric", "Q3 2024", "Q3 2023", "Chg"],
+        ["Revenue", "4,210", "3,905", "7.8%"],
+        ["EBITDA", "1,120", "980", "14.3%"],
+        ["Net debt", "5,400", "5,950", "-9.2%"]
+    ]
+    pdf_data = {'name': 'results.pdf', 'content': build_table_pdf(rows, [40, 200, 300, 400])}
+
+    plain = PDFProcessor().process_pdf(pdf_data)
+    result = PDFProcessor(table_mode='tsv').process_pdf(pdf_data)
+
+    assert "Revenue\t4,210\t3,905\t7.8%\nEBITDA\t1,120\t980\t14.3%" in result['text']
+    assert result['text'].startswith("Quarterly results beat expectations")
+    assert result['text'].endswith("price target.")
+    assert "Revenue\t" not in plain['text']
+    stats = result['stats']
+    assert stats['table_regions'] == 1
+    assert stats['table_rows'] == 4
+    assert stats['table_tokens_saved'] == stats['table_tokens_before'] - stats['table_tokens_after']
+
+def test_table_mode_tsv_leaves_prose(sample_pdf):
+    """Test that pages without tables, including side-by-side columns, are unchanged."""
+    columns = [
+        ["Rates rallied as inflation", "Credit spreads tightened on"],
+        ["cooled more than expected", "strong demand for new issues"],
+        ["and growth data softened", "from insurers and pensions"]
+    ]
+    for pdf in (sample_pdf, build_table_pdf(columns, [40, 320])):
+        pdf_data = {'name': 'note.pdf', 'content': pdf}
+        result = PDFProcessor(table_mode='tsv').process_pdf(pdf_data)
+
+        assert result['text'] == PDFProcessor().process_pdf(pdf_data)['text']
+        assert 'table_regions' not in result['stats']
+
+def build_chart_pdf(pages: int, lines_per_chart: int = 600) -> bytes:
+    """Build a PDF whose pages are a title plus a vector chart in a Form XObject."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        c.beginForm(f'chart{page}')
+        for i in range(lines_per_chart):
+            c.line(50 + i % 500, 100, 50 + (i * 7) % 500, 700)
+        c.drawString(60, 110, f"Axis label {page}")
+        c.endForm()
+        c.drawString(40, 750, f"Options watch page {page + 1} dealer gamma positioning")
+        c.doForm(f'chart{page}')
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def test_invalid_figure_mode():
+    """Test that unknown figure modes are rejected."""
+    with pytest.raises(ValueError):
+        PDFProcessor(figure_mode='ocr')
+
+def test_figure_skip_mode_skips_chart_pages():
+    """Test that figures on graphics-dominated pages are skipped and the trade-off reported."""
+    pdf_data = {'name': 'options.pdf', 'content': build_chart_pdf(2)}
+    full = PDFProcessor(max_workers=1)
+    skip = PDFProcessor(max_workers=1, figure_mode='skip')
+    try:
+        full_result = full.process_pdf(pdf_data)
+        skip_result = skip.process_pdf(pdf_data)
+    finally:
+        full.close()
+        skip.close()
+
+    assert 'Axis label 1' in full_result['text']
+    assert 'Axis label 1' not in skip_result['text']
+    assert 'Options watch page 2 dealer gamma positioning' in skip_result['text']
+
+    stats = skip_result['stats']
+    assert stats['figure_pages_skipped'] == 2
+    assert stats['figure_ops_skipped'] >= 2 * 600 * 3
+    assert stats['figure_chars_lost'] > 0
+    assert 'estimated_figure_seconds_saved' in stats
+
+def test_figure_skip_mode_keeps_text_pages(sample_pdf):
+    """Test that skip mode leaves text on pages without dominant graphics unchanged."""
+    pdf_data = {'name': 'note.pdf', 'content': sample_pdf}
+    full = PDFProcessor(max_workers=1)
+    skip = PDFProcessor(max_workers=1, figure_mode='skip')
+    try:
+        full_result = full.process_pdf(pdf_data)
+        skip_result = skip.process_pdf(pdf_data)
+    finally:
+        full.close()
+        skip.close()
+
+    assert skip_result['text'] == full_result['text']
+    assert 'figure_pages_skipped' not in skip_result['stats']
+
+def test_scan_page_graphics_counts_invoked_forms():
+    """Test the per-page operator scan used by the figure heuristic."""
+    from pdfminer.pdfpage import PDFPage
+    from utils.pdf_figures import scan_page_graphics
+
+    pages = list(PDFPage.get_pages(io.BytesIO(build_chart_pdf(2, lines_per_chart=100))))
+    graphics = scan_page_graphics(pages[0])
+
+    assert graphics.text_ops == 1
+    # Only the form drawn on this page is counted, not every form in the resources
+    assert 300 <= graphics.form_path_ops < 600
+    assert graphics.form_text_ops == 1
+    assert not graphics.figure_dominated()
@@ -0,0 +1,240 @@
+"""Tests for the report processing pipeline."""
+
+import os
+import json
+import asyncio
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from typing import Dict, List
+from unittest.mock import AsyncMock, MagicMock
+
+from report_pipeline import ReportPipeline
+from services.analysis_store import AnalysisStore
+from utils.pdf_processor import PageText
+
+class FakeReportSource:
+    """Report source yielding prepared report dictionaries."""
+
+    def __init__(self, reports: List[Dict]):
+        self.reports = reports
+
+    async def iter_reports(self, config, queue_size: int = 4, day=None):
+        for report in self.reports:
+            yield report
+
+class FakeProcessor:
+    """Extracts the 'content' of a report after a short pause."""
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+
+    async def extract(self, pdf_file: Dict) -> Dict:
+        await asyncio.sleep(0.01)
+        text = pdf_file['content']
+        return {'text': text, 'preview': text[:100], 'page_offsets': [0]}
+
+    async def should_stream(self, pdf_file: Dict) -> bool:
+        return False
+
+class StreamingProcessor(FakeProcessor):
+    """Streams reports whose 'content' holds form-feed separated pages, page by page."""
+
+    def __init__(self, events: List, fail_after: int = None):
+        super().__init__()
+        self.events = events
+        self.fail_after = fail_after
+
+    async def should_stream(self, pdf_file: Dict) -> bool:
+        return '\f' in pdf_file['content']
+
+    async def iter_pages(self, pdf_file: Dict):
+        for number, text in enumerate(pdf_file['content'].split('\f'), 1):
+            if self.fail_after is not None and number > self.fail_after:
+                raise RuntimeError("Page range timed out")
+            await asyncio.sleep(0.01)
+            self.events.append(('extracted', number))
+            yield PageText(page_number=number, text=text)
+
+async def summarize_as_ready(results, **kwargs) -> List[str]:
+    summaries = []
+    async for result in results:
+        if 'pages' in result:
+            text = '\n'.join([page.text async for page in result['pages']])
+        else:
+            text = result['text']
+        summaries.append(f"Summary: {text}")
+    return summaries
+
+def report(path: str, content: str, aliases: List[str] = None) -> Dict:
+    return {'name': path.rsplit('/', 1)[-1], 'path': path, 'content': content, 'aliases': aliases or []}
+
+@pytest.fixture
+def make_pipeline(tmp_path, monkeypatch):
+    """Build a pipeline over fake reports, storing analyses under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+
+    def make(reports: List[Dict], processor=None) -> ReportPipeline:
+        summarizer = MagicMock()
+        summarizer.TARGET_TOKENS = 120000
+        summarizer.generate_initial_summaries_as_ready = AsyncMock(side_effect=summarize_as_ready)
+        summarizer.recursive_group_summarize = AsyncMock(return_value="Combined summary")
+        summarizer.generate_final_analysis = AsyncMock(return_value="MARKET OVERVIEW\nSteady.")
+        config = SimpleNamespace(openai_key='test', report_queue_size=4)
+        pipeline = ReportPipeline(
+            config,
+            FakeReportSource(reports),
+            processor or FakeProcessor(),
+            summarizer,
+            MagicMock()
+        )
+        pipeline.analysis_store = AnalysisStore(str(tmp_path / 'archive'))
+        pipeline.email_notifier = MagicMock(send_analysis=AsyncMock())
+        return pipeline
+    return make
+
+def stored_analysis(path: str) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['analysis']
+
+async def test_aliases_of_same_named_reports_stay_apart(make_pipeline, tmp_path):
+    """Test that reports sharing a file name in different folders keep their own aliases."""
+    pipeline = make_pipeline([
+        report('/Current/Mar 3/Bank A/daily.pdf', 'Bank A daily', ['/Current/Mar 3/Copies/bank_a.pdf']),
+        report('/Current/Mar 3/Bank B/daily.pdf', 'Bank B daily')
+    ])
+
+    analysis = stored_analysis(await pipeline.run())
+
+    assert analysis['source_files'] == ['daily.pdf', 'daily.pdf', 'bank_a.pdf']
+    assert analysis['source_aliases'] == {
+        '/Current/Mar 3/Bank A/daily.pdf': ['/Current/Mar 3/Copies/bank_a.pdf']
+    }
+    pipeline.email_notifier.send_analysis.assert_awaited_once()
+    with open(tmp_path / 'memlog' / 'combined_initial_summaries.md') as f:
+        assert f.read() == "Summary: Bank A daily\nSummary: Bank B daily"
+
+async def test_run_streams_extraction_within_slots(make_pipeline):
+    """Test that reports are taken only as extraction slots free up and summarized as extracted."""
+    events = []
+
+    class TrackingSource(FakeReportSource):
+        async def iter_reports(self, config, queue_size: int = 4, day=None):
+            for report in self.reports:
+                events.append(('taken', report['path']))
+                yield report
+
+    class TrackingProcessor(FakeProcessor):
+        def __init__(self):
+            super().__init__(max_workers=2)
+            self.running = 0
+            self.peak = 0
+
+        async def extract(self, pdf_file):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                return await super().extract(pdf_file)
+            finally:
+                self.running -= 1
+                events.append(('extracted', pdf_file['path']))
+
+    async def summarize(results, **kwargs):
+        summaries = []
+        async for result in results:
+            events.append(('summarized', result['text']))
+            summaries.append(f"Summary: {result['text']}")
+        return summaries
+
+    reports = [report(f"/Current/Mar 3/note{i}.pdf", f"Note {i}") for i in range(6)]
+    processor = TrackingProcessor()
+    pipeline = make_pipeline(reports, processor)
+    pipeline.report_source = TrackingSource(reports)
+    pipeline.summarizer_service.generate_initial_summaries_as_ready.side_effect = summarize
+
+    analysis = stored_analysis(await pipeline.run())
+
+    assert sorted(analysis['source_files']) == [f"note{i}.pdf" for i in range(6)]
+    assert processor.peak == 2
+    # Besides the reports extracting, only one waits for a slot; the rest stay in the source
+    for position, event in enumerate(events):
+        if event[0] == 'taken':
+            taken = sum(1 for kind, _ in events[:position] if kind == 'taken')
+            extracted = sum(1 for kind, _ in events[:position] if kind == 'extracted')
+            assert taken - extracted <= processor.max_workers
+    # Summarization starts before the last report is taken
+    first_summary = next(i for i, event in enumerate(events) if event[0] == 'summarized')
+    last_taken = max(i for i, event in enumerate(events) if event[0] == 'taken')
+    assert first_summary < last_taken
+
+async def test_backfill_stores_each_day_in_its_slot(make_pipeline, tmp_path):
+    """Test that backfill runs days concurrently up to the limit and files each under its day without emailing."""
+    class DaySource(FakeReportSource):
+        def __init__(self):
+            super().__init__([])
+            self.running = 0
+            self.peak = 0
+
+        async def iter_reports(self, config, queue_size: int = 4, day=None):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                await asyncio.sleep(0.02)
+                if day.weekday() < 5:
+                    yield report(f"/Current/{day.isoformat()}/note.pdf", f"Note for {day.isoformat()}")
+            finally:
+                self.running -= 1
+
+    pipeline = make_pipeline([])
+    source = pipeline.report_source = DaySource()
+
+    results = await pipeline.backfill(date(2025, 3, 7), date(2025, 3, 10), max_concurrent_days=2)
+
+    assert list(results) == [date(2025, 3, 7), date(2025, 3, 8), date(2025, 3, 9), date(2025, 3, 10)]
+    assert results[date(2025, 3, 8)] is None and results[date(2025, 3, 9)] is None
+    assert results[date(2025, 3, 7)].startswith(str(tmp_path / 'archive' / '2025' / '03-March' / '07'))
+    assert results[date(2025, 3, 10)].startswith(str(tmp_path / 'archive' / '2025' / '03-March' / '10'))
+    assert stored_analysis(results[date(2025, 3, 10)])['source_files'] == ['note.pdf']
+    assert source.peak == 2
+    pipeline.email_notifier.send_analysis.assert_not_called()
+    assert sorted(os.listdir(tmp_path / 'memlog')) == [
+        'combined_initial_summaries_2025-03-07.md', 'combined_initial_summaries_2025-03-10.md'
+    ]
+
+async def test_long_reports_are_summarized_while_extracted(make_pipeline, tmp_path):
+    """Test that the first pages of a long report are summarized before its last page is extracted."""
+    events = []
+
+    async def summarize(results, **kwargs):
+        summaries = []
+        async for result in results:
+            texts = []
+            async for page in result['pages']:
+                events.append(('summarized', page.page_number))
+                texts.append(page.text)
+            summaries.append(f"Summary: {' '.join(texts)}")
+        return summaries
+
+    pages = '\f'.join(f"Page {number}" for number in range(1, 5))
+    pipeline = make_pipeline([report('/Current/Mar 3/long.pdf', pages)], StreamingProcessor(events))
+    pipeline.summarizer_service.generate_initial_summaries_as_ready.side_effect = summarize
+
+    analysis = stored_analysis(await pipeline.run())
+
+    assert analysis['source_files'] == ['long.pdf']
+    assert events.index(('summarized', 1)) < events.index(('extracted', 4))
+    with open(tmp_path / 'memlog' / 'combined_initial_summaries.md') as f:
+        assert f.read() == "Summary: Page 1 Page 2 Page 3 Page 4"
+
+async def test_streamed_report_failing_midway_is_partial(make_pipeline):
+    """Test that a streamed report keeps the pages extracted before an error, and fails without any."""
+    pipeline = make_pipeline([
+        report('/Current/Mar 3/long.pdf', 'Page 1\fPage 2\fPage 3'),
+        report('/Current/Mar 3/broken.pdf', '\fPage 2'),
+        report('/Current/Mar 3/short.pdf', 'Short note')
+    ], StreamingProcessor([], fail_after=1))
+
+    analysis = stored_analysis(await pipeline.run())
+
+    assert sorted(analysis['source_files']) == ['long.pdf', 'short.pdf']
+    assert analysis['failed_files'] == ['broken.pdf']
@@ -0,0 +1,92 @@
+"""Tests for resumable chunked downloads."""
+
+import aiohttp
+import pytest
+from unittest.mock import MagicMock
+
+from utils import resumable_download
+from utils.resumable_download import resumable_chunks, DownloadStats, IncompleteDownload
+
+CONTENT = bytes(range(256)) * 40
+
+def response(data: bytes, fail_after: int = None, status: int = 206):
+    """Fake streaming response that optionally drops the connection after some bytes."""
+    async def iter_chunked(chunk_size):
+        for start in range(0, len(data), chunk_size):
+            if fail_after is not None and start >= fail_after:
+                raise aiohttp.ClientPayloadError("connection dropped")
+            yield data[start:start + chunk_size]
+
+    fake = MagicMock()
+    fake.status = status
+    fake.content.iter_chunked.side_effect = iter_chunked
+    return fake
+
+async def collect(chunks) -> bytes:
+    return b''.join([chunk async for chunk in chunks])
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resumable_download, 'RESUME_BACKOFF_SECONDS', 0)
+
+async def test_resumes_from_last_received_byte():
+    """Test that a dropped transfer continues with a ranged request."""
+    offsets = []
+
+    async def open_range(offset):
+        offsets.append(offset)
+        if len(offsets) == 1:
+            return response(CONTENT, fail_after=3000, status=200)
+        return response(CONTENT[offset:])
+
+    stats = DownloadStats()
+    data = await collect(resumable_chunks(open_range, len(CONTENT), 1000, stats=stats))
+
+    assert data == CONTENT
+    assert offsets == [0, 3000]
+    assert stats.resumes == 1
+    assert stats.bytes == len(CONTENT)
+
+async def test_ignored_range_resends_from_start():
+    """Test that a server answering a ranged request with the whole file is handled."""
+    calls = []
+
+    async def open_range(offset):
+        calls.append(offset)
+        fail_after = 2500 if len(calls) == 1 else None
+        return response(CONTENT, fail_after=fail_after, status=200)
+
+    assert await collect(resumable_chunks(open_range, len(CONTENT), 1000)) == CONTENT
+
+async def test_truncated_response_without_resumes_raises():
+    """Test that short bodies are detected and raised once resumes are used up."""
+    async def open_range(offset):
+        return response(CONTENT[:5000])
+
+    with pytest.raises(IncompleteDownload):
+        await collect(resumable_chunks(open_range, len(CONTENT), 1000, max_resumes=0))
+
+async def test_failed_reconnect_uses_resumes():
+    """Test that a reconnect that fails to open is retried within the same resume budget."""
+    offsets = []
+
+    async def open_range(offset):
+        offsets.append(offset)
+        if len(offsets) == 1:
+            return response(CONTENT, fail_after=3000, status=200)
+        if len(offsets) == 2:
+            raise aiohttp.ClientConnectionError("connection refused")
+        return response(CONTENT[offset:])
+
+    stats = DownloadStats()
+    data = await collect(resumable_chunks(open_range, len(CONTENT), 1000, stats=stats))
+
+    assert data == CONTENT
+    assert offsets == [0, 3000, 3000]
+    assert stats.resumes == 2
+
+    async def refused(offset):
+        raise aiohttp.ClientConnectionError("connection refused")
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await collect(resumable_chunks(refused, len(CONTENT), 1000, max_resumes=1))
@@ -0,0 +1,72 @@
+"""Tests for fixed-memory running statistics."""
+
+import random
+import statistics
+import pytest
+
+from utils.running_stats import P2Quantile, RunningStats
+from services.text_extractor import PDFTextExtractor
+
+def test_running_stats_moments():
+    """Test count, mean, spread and extremes against the statistics module."""
+    values = [3.5, 1.0, 7.25, 4.0, 2.5, 9.0, 0.5]
+    running = RunningStats()
+    for value in values:
+        running.add(value)
+
+    assert running.count == len(values)
+    assert running.mean == pytest.approx(statistics.mean(values))
+    assert running.stdev == pytest.approx(statistics.stdev(values))
+    assert running.min == 0.5
+    assert running.max == 9.0
+
+def test_quantiles_exact_for_small_samples():
+    """Test that quantiles are interpolated exactly before the markers fill."""
+    estimate = P2Quantile(0.5)
+    assert estimate.value is None
+    for value in [4.0, 1.0, 3.0, 2.0]:
+        estimate.add(value)
+    assert estimate.value == pytest.approx(2.5)
+
+@pytest.mark.parametrize('quantile', [0.5, 0.9, 0.99])
+def test_quantile_estimates_converge(quantile):
+    """Test streaming estimates against exact quantiles of a large sample."""
+    rng = random.Random(11)
+    values = [rng.lognormvariate(0, 0.5) for _ in range(20000)]
+    estimate = P2Quantile(quantile)
+    for value in values:
+        estimate.add(value)
+
+    exact = sorted(values)[int(quantile * (len(values) - 1))]
+    assert estimate.value == pytest.approx(exact, rel=0.05)
+
+def test_empty_summary():
+    """Test the summary before any values are added."""
+    summary = RunningStats().summary()
+
+    assert summary['count'] == 0
+    assert summary['mean'] is None
+    assert summary['p50'] is None
+    assert str(RunningStats()) == "n=0"
+
+def test_extractor_validation_stats_are_bounded():
+    """Test that the extractor aggregates validation statistics instead of storing them."""
+    extractor = PDFTextExtractor()
+    try:
+        for i in range(50):
+            extractor._record_validation_stats({
+                'text_length': 1000 + i,
+                'total_lines': 40,
+                'valid_lines': 30,
+                'valid_line_ratio': 0.75,
+                'special_char_ratio': 0.05
+            })
+
+        stats = extractor.get_validation_stats()
+        assert stats['text_length']['count'] == 50
+        assert stats['text_length']['min'] == 1000
+        assert stats['text_length']['max'] == 1049
+        assert stats['valid_line_ratio']['p50'] == pytest.approx(0.75)
+        assert isinstance(extractor.validation_stats['text_length'], RunningStats)
+    finally:
+        extractor.pdf_processor.close()
@@ -127,6 +127,38 @@ async def test_process_report_text_success(summarizer_service, test_context):
     assert len(call_history) > 0
     assert all(call['model'] == config.model for call in call_history)
 
+@pytest.mark.asyncio
+async def test_initial_summaries_stream_report_pages(summarizer_service, test_context, monkeypatch):
+    """Test summarizing a report from its pages as they are extracted."""
+    from utils.pdf_processor import PageText
+
+    report = create_test_report()
+    extracted = []
+
+    async def pages():
+        for number, text in enumerate(report['text'].split('\n\n'), 1):
+            extracted.append(number)
+            yield PageText(page_number=number, text=text)
+
+    async def results():
+        yield {'name': report['file_name'], 'pages': pages()}
+
+    labels = []
+    summarize_chunk = summarizer_service._summarize_chunk
+
+    async def record_chunk(chunk, name, part, page_ref, *args):
+        labels.append((name, part, page_ref))
+        return await summarize_chunk(chunk, name, part, page_ref, *args)
+
+    monkeypatch.setattr(summarizer_service, '_summarize_chunk', record_chunk)
+
+    summaries = await summarizer_service.generate_initial_summaries_as_ready(results())
+
+    assert len(summaries) == 1 and summaries[0]
+    assert extracted == [1, 2, 3]
+    assert labels == [('PDF 1', 'Part 1', '1-3')]
+    assert test_context.openai_client.get_call_history()
+
 @pytest.mark.asyncio
 async def test_process_report_text_empty_input(summarizer_service, test_context):
     """Test handling of empty input text."""
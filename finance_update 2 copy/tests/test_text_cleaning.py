@@ -0,0 +1,165 @@
+"""Tests for fused text cleaning."""
+
+import re
+import pytest
+
+from utils.text_cleaning import (
+    normalize_text,
+    count_special_chars,
+    filter_lines,
+    measure_text,
+    strip_repeated_lines
+)
+from services.text_extractor import BOILERPLATE_PATTERN, PDFTextExtractor
+from utils.page_index import PageOffsetIndex
+from utils.pdf_processor import PageText
+
+@pytest.mark.parametrize('raw, expected', [
+    ('', ''),
+    ('  Revenue   grew\x00 12%  ', 'Revenue grew 12%'),
+    ('line one   \n   line two', 'line one\nline two'),
+    ('para one\n\n\n\n  \npara two', 'para one\n\npara two'),
+    ('page one\fpage two\r\nend', 'page one\npage two\n\nend'),
+    ('tab\tkept\u200b here', 'tab\tkept here'),
+    ('emoji \U0001F4C8 and private \U000F0000 use', 'emoji \U0001F4C8 and private use'),
+])
+def test_normalize_text(raw, expected):
+    """Test control character and whitespace normalization."""
+    assert normalize_text(raw) == expected
+
+def test_count_special_chars_matches_definition():
+    """Test the special character count against the per-character definition."""
+    text = "EPS of $2.15 (+8% y/y) beat_consensus; Ω résumé — 10Y UST @ 4.3%"
+    expected = sum(1 for c in text if not c.isalnum() and not c.isspace())
+
+    assert count_special_chars(text) == expected
+
+def test_filter_lines_measures_kept_text():
+    """Test that filtered text and its statistics come from the same pass."""
+    text = "\n".join([
+        "Header line",
+        "Equity strategy weekly outlook for investors",
+        "Confidential - do not forward",
+        "short",
+        "",
+        "Page 4",
+        "Rates: 10Y yields rose 8bp on the week",
+        "Footer line",
+    ])
+    pattern = re.compile(r'confidential|\s*page\s+\d+\s*$', re.IGNORECASE)
+
+    filtered, stats = filter_lines(text, pattern, min_line_length=15, edge_lines=1)
+
+    assert filtered.split('\n') == [
+        "Equity strategy weekly outlook for investors",
+        "short",
+        "",
+        "Rates: 10Y yields rose 8bp on the week",
+    ]
+    assert stats == measure_text(filtered, 15)
+    assert stats.total_lines == 3
+    assert stats.valid_lines == 2
+    assert stats.chars == len(filtered)
+
+def test_clean_boilerplate_patterns():
+    """Test that the combined boilerplate pattern keeps the original matches."""
+    extractor = PDFTextExtractor()
+    lines = ["cover"] * 3 + [
+        "DISCLAIMER: past performance",
+        "Please see important disclosures at the end",
+        "  12  ",
+        "Copper prices rallied on supply disruptions",
+        "Strictly Private and Confidential",
+    ] + ["back"] * 3
+
+    cleaned, stats, _ = extractor._clean_boilerplate("\n".join(lines))
+
+    assert cleaned == "Copper prices rallied on supply disruptions"
+    assert stats.valid_lines == 1
+    assert BOILERPLATE_PATTERN.match("all rights reserved 2024")
+
+class PageStreamProcessor:
+    """Processor serving fixed cleaned pages, whole or streamed."""
+
+    page_parallel_threshold = 2
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def extract(self, pdf_data):
+        text, index = PageOffsetIndex.join(self.pages)
+        return {'text': text, 'preview': text[:100], 'page_offsets': index.to_list()}
+
+    async def iter_pages(self, pdf_data):
+        for number, text in enumerate(self.pages, 1):
+            yield PageText(page_number=number, text=text)
+
+    async def count_pages_async(self, pdf_data):
+        return len(self.pages)
+
+async def test_streamed_pages_join_to_extracted_text():
+    """Test that streamed pages drop the same boilerplate and edge lines as extract()."""
+    pages = [
+        "Cover title\nWeekly",
+        "Metals desk\nCopper prices rallied on supply disruptions\nCONFIDENTIAL draft\n3",
+        "",
+        "Aluminium stocks fell to multi-year lows across LME warehouses\n" * 3 + "Back matter",
+        "Contacts"
+    ]
+    extractor = PDFTextExtractor(PageStreamProcessor(pages))
+    pdf_data = {'name': 'metals.pdf', 'content': b'%PDF'}
+
+    result = await extractor.extract(pdf_data)
+    streamed = [page async for page in extractor.iter_pages(pdf_data)]
+
+    assert await extractor.should_stream(pdf_data)
+    assert [page.page_number for page in streamed] == [1, 2, 3, 4, 5]
+    assert streamed[0].text == "" and streamed[4].text == ""
+    assert 'CONFIDENTIAL' not in streamed[1].text and 'Back matter' not in streamed[3].text
+    text, index = PageOffsetIndex.join([page.text for page in streamed])
+    assert text == result['text']
+    assert index.to_list() == result['page_offsets']
+
+def research_page(page_number: int, body: str) -> str:
+    """Build raw page text with a running header and footer."""
+    return "\n".join([
+        "Global Rates Strategy  |  14 March 2025",
+        "J. Smith, Analyst (+44 20 7000 0000)",
+        "",
+        *[f"{body}, point {k}" for k in range(3)],
+        f"Outlook item {page_number} depends on the path of policy rates and term premia",
+        *[f"{body}, risk {k}" for k in range(3)],
+        "",
+        "See important disclosures on page 42",
+        f"Page {page_number} of 12",
+    ])
+
+def test_strip_repeated_lines_removes_running_headers():
+    """Test that header and footer lines repeated on most pages are removed."""
+    bodies = [
+        "Curve steepening resumed as front-end yields fell",
+        "Breakevens widened after the stronger CPI print",
+        "Swap spreads tightened on heavy corporate issuance",
+        "We prefer 5y real yields over nominals",
+    ]
+    pages = [research_page(i + 1, body) for i, body in enumerate(bodies)]
+
+    stripped, stats = strip_repeated_lines(pages)
+
+    assert stats['repeated_lines_removed'] == 16
+    assert stats['repeated_tokens_removed'] > 0
+    for page, body in zip(stripped, bodies):
+        assert body in page
+        assert 'Global Rates Strategy' not in page
+        assert 'Page ' not in page
+    # Body lines away from the page edges are never treated as repeats
+    assert 'Outlook item 3' in stripped[2]
+
+def test_strip_repeated_lines_keeps_rare_and_short_documents():
+    """Test that lines on too few pages, and pages made only of repeats, are kept."""
+    pages = [research_page(1, "Body one"), research_page(2, "Body two")]
+    assert strip_repeated_lines(pages) == (pages, {})
+
+    slides = ["Quarterly review"] * 4
+    stripped, _ = strip_repeated_lines(slides)
+    assert stripped == slides
@@ -0,0 +1,52 @@
+"""Tests for the tokenizer service."""
+
+import tiktoken
+
+from utils.tokenizer import TokenizerService, CACHE_ENTRY_BYTES
+
+def byte_encoding(name: str) -> tiktoken.Encoding:
+    """Offline stand-in for a tiktoken encoding: one token per byte."""
+    return tiktoken.Encoding(
+        name=name,
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={}
+    )
+
+def test_encodings_are_loaded_once_per_name():
+    """Test that models sharing an encoding share one loaded instance."""
+    loaded = []
+
+    def load(name):
+        loaded.append(name)
+        return byte_encoding(name)
+
+    tokenizer = TokenizerService(load_encoding=load)
+
+    assert tokenizer.count("four", "gpt-4o-mini") == 4
+    assert tokenizer.count("three", "gpt-3.5-turbo") == 5
+    assert tokenizer.count("two", "o1-preview") == 3
+    assert loaded == ["cl100k_base"]
+
+def test_batch_counts_match_single_counts_and_fill_cache():
+    """Test batch counting in order, with repeats encoded once and cached for later calls."""
+    tokenizer = TokenizerService(load_encoding=byte_encoding)
+    texts = ["alpha", "é", "alpha", "x" * 100_000]
+
+    assert tokenizer.count_batch(texts) == [5, 2, 5, 100_000]
+    assert tokenizer.stats['entries'] == 3
+    assert tokenizer.count("x" * 100_000) == 100_000
+    assert tokenizer.stats['hits'] == 1
+
+def test_cache_stays_within_memory_budget():
+    """Test that the least recently used counts are evicted past the budget."""
+    tokenizer = TokenizerService(cache_max_mb=3 * CACHE_ENTRY_BYTES / (1024 * 1024), load_encoding=byte_encoding)
+
+    tokenizer.count_batch(["a", "bb", "ccc"])
+    tokenizer.count("a")  # Most recently used
+    tokenizer.count("dddd")
+
+    assert tokenizer.stats['entries'] == 3
+    hits = tokenizer.stats['hits']
+    tokenizer.count_batch(["a", "ccc", "dddd"])
+    assert tokenizer.stats['hits'] == hits + 3
@@ -8,7 +8,6 @@ import sys
 import os
 import json
 import pytest
-import io
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,6 +17,7 @@ from clients.dropbox_client import DropboxClient
 from services.pdf_fetcher import PDFFetcher
 from utils.pdf_processor import PDFProcessor
 from utils.structured_extractor import StructuredExtractor
+from utils.page_index import PageOffsetIndex
 from utils.executive_summary import ExecutiveSummaryGenerator, ExecutiveSummaryConfig
 from utils.email_handler import EmailHandler
 
@@ -70,12 +70,13 @@ async def test_pipeline():
             
         # Log some info about the first few PDFs
         for i, pdf in enumerate(pdf_files[:3], 1):
-            logger.info(f"PDF {i}: {pdf['name']} (size: {len(pdf['content'])} bytes)")
+            logger.info(f"PDF {i}: {pdf['name']} (size: {pdf['document'].size} bytes)")
         
         # Limit to max_pdfs
         max_pdfs = 20
         if len(pdf_files) > max_pdfs:
             logger.info(f"Limiting to first {max_pdfs} PDFs out of {len(pdf_files)} total files")
+            PDFFetcher.release_pdfs(pdf_files[max_pdfs:])
             pdf_files = pdf_files[:max_pdfs]
         else:
             logger.info(f"Processing all {len(pdf_files)} PDFs")
@@ -101,9 +102,9 @@ async def test_pipeline():
             try:
                 logger.info(f"Processing PDF {i}/{len(pdf_files)}: {pdf_file['name']}")
                 
-                # Extract text with layout
-                pdf_stream = io.BytesIO(pdf_file['content'])
-                text = pdf_processor.extract_text_with_layout(pdf_stream)
+                # Extract text, keeping where each page starts
+                result = await pdf_processor.extract(pdf_file)
+                text = result.get('text', '')
                 
                 if not text.strip():
                     logger.warning(f"No text extracted from {pdf_file['name']}")
@@ -112,10 +113,14 @@ async def test_pipeline():
                 logger.info(f"Successfully extracted {len(text)} characters from {pdf_file['name']}")
                 
                 # Extract structured data
+                page_index = None
+                if result.get('page_offsets'):
+                    page_index = PageOffsetIndex.from_list(result['page_offsets'])
                 structured_data = structured_extractor.extract_financial_data(
                     text,
                     pdf_file['name'],
-                    "1"  # Default page reference
+                    "1",  # Default page reference
+                    page_index=page_index
                 )
                 
                 if structured_data:
@@ -127,6 +132,7 @@ async def test_pipeline():
             except Exception as e:
                 logger.error(f"Error processing {pdf_file['name']}: {e}", exc_info=True)
                 continue
+        PDFFetcher.release_pdfs(pdf_files)
         
         # Combine all structured data
         logger.info("Generating executive summary...")
@@ -0,0 +1,245 @@
+"""Content-addressed on-disk store for downloaded report files."""
+
+import os
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import AsyncIterable, BinaryIO, Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024  # Dropbox hashes files in 4 MB blocks
+
+class ContentHashMismatch(ValueError):
+    """Raised when stored bytes do not match the content hash they were stored under."""
+
+class ContentHasher:
+    """
+    Incremental Dropbox content hash.
+
+    The hash is the SHA-256 of the concatenated SHA-256 digests of each
+    4 MB block of the file, as reported in FileMetadata.content_hash.
+    """
+
+    def __init__(self):
+        self._overall = hashlib.sha256()
+        self._block = hashlib.sha256()
+        self._block_size = 0
+
+    def update(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            take = min(len(view), CONTENT_HASH_BLOCK_SIZE - self._block_size)
+            self._block.update(view[:take])
+            self._block_size += take
+            view = view[take:]
+            if self._block_size == CONTENT_HASH_BLOCK_SIZE:
+                self._overall.update(self._block.digest())
+                self._block = hashlib.sha256()
+                self._block_size = 0
+
+    def hexdigest(self) -> str:
+        overall = self._overall.copy()
+        if self._block_size:
+            overall.update(self._block.digest())
+        return overall.hexdigest()
+
+def content_hash(data: bytes) -> str:
+    """Compute the Dropbox content hash of a byte string."""
+    hasher = ContentHasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+def stream_content_hash(stream: BinaryIO) -> str:
+    """Compute the Dropbox content hash of a stream's remaining bytes."""
+    hasher = ContentHasher()
+    for block in iter(lambda: stream.read(CONTENT_HASH_BLOCK_SIZE), b''):
+        hasher.update(block)
+    return hasher.hexdigest()
+
+def _hash_and_write(hasher: ContentHasher, f: BinaryIO, chunk: bytes) -> None:
+    """Add a chunk to a running content hash and write it out."""
+    hasher.update(chunk)
+    f.write(chunk)
+
+class BlobStore:
+    """
+    Size-bounded LRU store of files keyed by their Dropbox content hash.
+
+    A report that shows up again, in a later day folder or copied into
+    several subfolders, has the same content hash, so it is downloaded once
+    and read from the store afterwards. Blobs handed out with checkout() or
+    put() are pinned until release() and are never evicted while pinned,
+    since extraction reads them in place.
+    """
+
+    def __init__(self, store_dir: str = ".cache/dropbox_blobs", max_size_mb: float = 2048):
+        """
+        Initialize BlobStore.
+
+        Args:
+            store_dir: Directory holding the blobs
+            max_size_mb: Maximum total size of unpinned blobs before eviction
+        """
+        self.store_dir = store_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # content hash -> size, oldest first
+        self._pins: Dict[str, int] = {}
+        self._size_bytes = 0
+        self._lock = threading.Lock()  # Blobs may be checked out from worker threads
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU index from blobs already on disk."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.store_dir):
+            if entry.is_file() and entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size_bytes += size
+
+        if found:
+            logger.info(
+                f"Loaded blob store index: {len(found)} blobs, "
+                f"{self._size_bytes / (1024 * 1024):.1f} MB"
+            )
+
+    def _blob_path(self, key: str) -> str:
+        """Get the file path for a content hash."""
+        return os.path.join(self.store_dir, f"{key}.pdf")
+
+    def checkout(self, key: str) -> Optional[str]:
+        """
+        Look up a blob and pin it until release().
+
+        Args:
+            key: Dropbox content hash
+
+        Returns:
+            Path of the blob, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries and not self._adopt(key):
+                self.misses += 1
+                return None
+
+            path = self._blob_path(key)
+            # Mark as most recently used, on disk as well as in memory
+            try:
+                os.utime(path)
+            except OSError:
+                # Removed behind our back
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+            self._pin(key)
+            self.hits += 1
+            return path
+
+    def _adopt(self, key: str) -> bool:
+        """Index a blob written by another process sharing the store directory."""
+        try:
+            size = os.stat(self._blob_path(key)).st_size
+        except OSError:
+            return False
+        self._entries[key] = size
+        self._size_bytes += size
+        return True
+
+    async def put(self, key: str, chunks: AsyncIterable[bytes]) -> str:
+        """
+        Store a file under its content hash and pin it until release().
+
+        Args:
+            key: Dropbox content hash the bytes are expected to have
+            chunks: File bytes in order, written as they arrive
+
+        Returns:
+            Path of the blob
+
+        Raises:
+            ContentHashMismatch: If the bytes do not hash to key
+        """
+        loop = asyncio.get_running_loop()
+        hasher = ContentHasher()
+        size = 0
+        # Write atomically so an interrupted download never looks complete;
+        # hashing and writing run off the event loop
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in chunks:
+                    await loop.run_in_executor(None, _hash_and_write, hasher, f, chunk)
+                    size += len(chunk)
+            if hasher.hexdigest() != key:
+                raise ContentHashMismatch(f"Content hash {hasher.hexdigest()} does not match {key}")
+            await loop.run_in_executor(None, os.replace, tmp_path, self._blob_path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            if key in self._entries:
+                self._size_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._size_bytes += size
+            self._pin(key)
+            self._evict()
+        return self._blob_path(key)
+
+    def _pin(self, key: str):
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def release(self, key: str) -> None:
+        """Unpin a blob handed out by checkout() or put()."""
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+            self._evict()
+
+    def _evict(self):
+        """Evict least recently used unpinned blobs until the store fits its size bound."""
+        for key in list(self._entries):
+            if self._size_bytes <= self.max_size_bytes:
+                break
+            if key in self._pins:
+                continue
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        """Remove a blob from the index and disk."""
+        self._size_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._blob_path(key))
+        except OSError:
+            pass
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get store hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'size_mb': round(self._size_bytes / (1024 * 1024), 2)
+        }
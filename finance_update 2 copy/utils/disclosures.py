@@ -0,0 +1,211 @@
+"""Detection of the regulatory disclosure appendix at the end of research notes."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from utils.text_cleaning import TOKENS_PER_WORD
+
+# Bump when detection changes which text is dropped (invalidates cached extractions)
+DISCLOSURE_RULES_VERSION = 1
+
+# Headings that open a disclosure appendix, matched against whole short lines
+DISCLOSURE_HEADING = re.compile(
+    r'\s*(?:'
+    r'disclosure\s+appendix'
+    r'|appendix\s*[:\-–]?\s*(?:important\s+|analyst\s+)?disclosures?'
+    r'|(?:important|required|regulatory|general|other)\s+(?:regulatory\s+)?disclosures?'
+    r'|analyst\s+certifications?'
+    r'|disclosures?\s+(?:and|&)\s+disclaimers?'
+    r'|disclosure\s+information'
+    r')\b[\s:.]*$',
+    re.IGNORECASE
+)
+MAX_HEADING_LENGTH = 80
+
+# Vocabulary that is dense in disclosures and sparse in research content
+DISCLOSURE_TERMS = re.compile(
+    r'\b(?:'
+    r'finra|regulation\s+ac|mifid(?:\s+ii)?|sipc|nyse'
+    r'|analyst\s+certification|research\s+analysts?'
+    r'|conflicts?\s+of\s+interest|investment\s+banking'
+    r'|compensation|remuneration|market\s+maker|makes\s+a\s+market'
+    r'|distribution\s+of\s+ratings|ratings?\s+distribution|price\s+target\s+history'
+    r'|beneficial(?:ly)?\s+own(?:s|ed|ership)?|1%\s+or\s+more'
+    r'|affiliates?|broker[\s-]+dealer|solicitation|not\s+an\s+offer'
+    r'|financial\s+conduct\s+authority|prudential\s+regulation\s+authority'
+    r'|securities\s+and\s+futures\s+commission|securities\s+and\s+exchange\s+commission'
+    r'|past\s+performance|disclaimers?|jurisdictions?|regulated\s+by|authori[sz]ed\s+by'
+    r')\b',
+    re.IGNORECASE
+)
+
+# Disclosure vocabulary per 100 words above which a page reads as disclosures
+MIN_TERM_DENSITY = 1.5
+# A page opening with a disclosure heading needs only this density in the text after it
+MIN_HEADING_TERM_DENSITY = 0.75
+MIN_PAGE_WORDS = 40  # Pages with fewer words don't break a run of disclosure pages
+# An appendix without a heading is only trusted when it spans this many pages
+MIN_PAGES_WITHOUT_HEADING = 3
+
+def term_density(text: str) -> float:
+    """Get the number of disclosure terms per 100 words of text."""
+    words = len(text.split())
+    if not words:
+        return 0.0
+    return 100 * len(DISCLOSURE_TERMS.findall(text)) / words
+
+def heading_lines(lines: List[str]) -> List[int]:
+    """Get the indices of the lines that are disclosure headings."""
+    return [
+        index for index, line in enumerate(lines)
+        if len(line) <= MAX_HEADING_LENGTH and DISCLOSURE_HEADING.match(line)
+    ]
+
+def is_disclosure_page(text: str) -> bool:
+    """Whether a page reads as disclosures, counting near-empty pages as such."""
+    if len(text.split()) < MIN_PAGE_WORDS:
+        return True
+    return term_density(text) >= MIN_TERM_DENSITY
+
+def opens_appendix(text: str) -> Optional[int]:
+    """
+    Check whether a page contains the start of a disclosure appendix.
+
+    A heading only counts when the text after it on the page is short or
+    reads as disclosures, so a contents entry or a passing mention does not.
+
+    Args:
+        text: Page text
+
+    Returns:
+        Line index where the appendix starts on the page, or None
+    """
+    lines = text.split('\n')
+    for heading in heading_lines(lines):
+        rest = '\n'.join(lines[heading + 1:])
+        if len(rest.split()) < MIN_PAGE_WORDS or term_density(rest) >= MIN_HEADING_TERM_DENSITY:
+            return heading
+    return None
+
+def find_disclosure_start(pages: List[str]) -> Optional[Tuple[int, int]]:
+    """
+    Find where the disclosure appendix at the end of a document starts.
+
+    The appendix is the trailing run of disclosure pages. It starts at the
+    heading that opens it, which may be partway down the last content page,
+    or, when no heading is found, at the start of a long enough run.
+    The first page is always kept.
+
+    Args:
+        pages: Text of each page in order
+
+    Returns:
+        Tuple of (page index, line index on that page) of the first dropped
+        line, or None if the document has no disclosure appendix
+    """
+    run_start = len(pages)
+    while run_start > 1 and is_disclosure_page(pages[run_start - 1]):
+        run_start -= 1
+    if not any(len(page.split()) >= MIN_PAGE_WORDS for page in pages[run_start:]):
+        run_start = len(pages)  # Only blank pages at the end
+
+    # The heading may sit on the page before the run, above the first disclosures
+    for index in range(max(run_start - 1, 0), len(pages)):
+        line = opens_appendix(pages[index])
+        if line is None:
+            continue
+        if index == 0 and not '\n'.join(pages[0].split('\n')[:line]).strip():
+            continue  # Never drop the whole document
+        return index, line
+
+    if len(pages) - run_start >= MIN_PAGES_WITHOUT_HEADING:
+        return run_start, 0
+    return None
+
+def truncate_disclosure_tail(pages: List[str]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Drop the disclosure appendix from the end of a document.
+
+    Args:
+        pages: Text of each page in order
+
+    Returns:
+        Tuple of (pages before the appendix, statistics with the page the
+        appendix starts on and the pages, words and estimated tokens dropped)
+    """
+    start = find_disclosure_start(pages)
+    if start is None:
+        return pages, {}
+    page_index, line_index = start
+
+    lines = pages[page_index].split('\n')
+    kept_head = '\n'.join(lines[:line_index])
+    dropped = ['\n'.join(lines[line_index:])] + pages[page_index + 1:]
+    words_removed = sum(len(text.split()) for text in dropped)
+
+    kept = pages[:page_index] + ([kept_head] if kept_head.strip() else [])
+    return kept, {
+        'disclosure_start_page': page_index + 1,
+        'disclosure_pages_removed': len(pages) - page_index - (1 if kept_head.strip() else 0),
+        'disclosure_words_removed': words_removed,
+        'disclosure_tokens_removed': round(words_removed * TOKENS_PER_WORD)
+    }
+
+class DisclosureTailDetector:
+    """
+    Page-by-page detector that spots a disclosure appendix as pages arrive.
+
+    Lets extraction stop at the appendix instead of rendering the remaining
+    pages. A page that opens an appendix makes the detector a candidate.
+    The next page with text confirms it if it is dense with disclosure
+    vocabulary and find_disclosure_start, run over the pages seen so far,
+    starts the appendix on the candidate; otherwise the candidate is dropped.
+    Near-empty pages in between, such as charts, neither confirm nor drop it.
+    """
+
+    def __init__(self):
+        self.pages: List[str] = []
+        self.candidate_page: Optional[int] = None  # Zero-based page opening the appendix
+        self.start: Optional[Tuple[int, int]] = None  # (page, line) the confirmed appendix starts at
+
+    @property
+    def pages_seen(self) -> int:
+        """Number of pages fed so far."""
+        return len(self.pages)
+
+    @property
+    def confirmed(self) -> bool:
+        """Whether the appendix is confirmed."""
+        return self.start is not None
+
+    def add(self, text: str) -> bool:
+        """
+        Feed the next page.
+
+        Args:
+            text: Raw or cleaned text of the page
+
+        Returns:
+            True once the appendix is confirmed
+        """
+        page_index = len(self.pages)
+        self.pages.append(text)
+        if self.confirmed:
+            return True
+        if self.candidate_page is not None:
+            if len(text.split()) < MIN_PAGE_WORDS:
+                return False
+            if term_density(text) >= MIN_TERM_DENSITY:
+                start = find_disclosure_start(self.pages)
+                if start is not None and start[0] == self.candidate_page:
+                    self.start = start
+                    return True
+            self.candidate_page = None
+        if page_index > 0 and opens_appendix(text) is not None:
+            self.candidate_page = page_index
+        return False
+
+    @property
+    def pending(self) -> bool:
+        """Whether a page seen may open an appendix that is not yet confirmed."""
+        return self.candidate_page is not None and not self.confirmed
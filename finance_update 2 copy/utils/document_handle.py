@@ -0,0 +1,273 @@
+"""Spooled handles for downloaded PDF bytes."""
+
+import io
+import os
+import asyncio
+import mmap
+import logging
+import tempfile
+from typing import AsyncIterable, BinaryIO, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPOOL_THRESHOLD = 8 * 1024 * 1024  # Files above 8 MB are spooled to disk
+
+def map_file(file_path: str) -> BinaryIO:
+    """
+    Open a file as a read-only memory map.
+
+    The map supports read/seek/tell, so pdfminer can parse it directly while
+    the OS pages the file in on demand instead of copying it onto the heap.
+
+    Args:
+        file_path: Path of the file to map
+
+    Returns:
+        Read-only memory map of the file
+
+    Raises:
+        ValueError: If the file is empty
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"File is empty: {file_path}")
+        # The map holds its own reference to the file, so f can be closed
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class DocumentHandle:
+    """
+    Downloaded document bytes, kept in memory when small and on disk when large.
+
+    Bytes are written with write() and sealed with finish(). Large documents
+    live in a temporary file that worker processes can open by path. Call
+    release() once the document has been extracted to free the memory or
+    delete the temporary file.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+        spool_dir: Optional[str] = None
+    ):
+        """
+        Initialize DocumentHandle.
+
+        Args:
+            name: Document file name
+            spool_threshold: Size in bytes above which the document moves to disk
+            spool_dir: Optional directory for spooled files (defaults to the
+                    system temporary directory)
+        """
+        self.name = name
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir
+        self.size = 0
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._spool_file = None
+        self._content: Optional[bytes] = None
+        self._file_path: Optional[str] = None
+        self._finished = False
+        self._released = False
+        self._owns_file = True
+        self._on_release: Optional[Callable[[], None]] = None
+
+    @classmethod
+    def from_chunks(
+        cls,
+        name: str,
+        chunks: Iterable[bytes],
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+        spool_dir: Optional[str] = None
+    ) -> 'DocumentHandle':
+        """
+        Build a finished handle from an iterable of byte chunks.
+
+        Args:
+            name: Document file name
+            chunks: Byte chunks in document order
+            spool_threshold: Size in bytes above which the document moves to disk
+            spool_dir: Optional directory for spooled files
+
+        Returns:
+            Finished DocumentHandle
+        """
+        handle = cls(name, spool_threshold, spool_dir)
+        try:
+            for chunk in chunks:
+                handle.write(chunk)
+            handle.finish()
+        except BaseException:
+            handle.release()
+            raise
+        return handle
+
+    @classmethod
+    async def from_async_chunks(
+        cls,
+        name: str,
+        chunks: AsyncIterable[bytes],
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+        spool_dir: Optional[str] = None
+    ) -> 'DocumentHandle':
+        """
+        Build a finished handle from an asynchronous stream of byte chunks.
+
+        Chunks are written off the event loop, since large documents spool
+        to disk as they arrive.
+
+        Args:
+            name: Document file name
+            chunks: Byte chunks in document order, e.g. a download in progress
+            spool_threshold: Size in bytes above which the document moves to disk
+            spool_dir: Optional directory for spooled files
+
+        Returns:
+            Finished DocumentHandle
+        """
+        loop = asyncio.get_running_loop()
+        handle = cls(name, spool_threshold, spool_dir)
+        try:
+            async for chunk in chunks:
+                await loop.run_in_executor(None, handle.write, chunk)
+            await loop.run_in_executor(None, handle.finish)
+        except BaseException:
+            handle.release()
+            raise
+        return handle
+
+    @classmethod
+    def from_file(
+        cls,
+        name: str,
+        file_path: str,
+        on_release: Optional[Callable[[], None]] = None
+    ) -> 'DocumentHandle':
+        """
+        Build a finished handle over an existing file that the caller keeps.
+
+        The document reads from the file in place; release() leaves it on disk.
+
+        Args:
+            name: Document file name
+            file_path: Path of the file holding the document's bytes
+            on_release: Optional callback run once when the handle is released,
+                    e.g. to unpin the file in the store that owns it
+
+        Returns:
+            Finished DocumentHandle
+        """
+        handle = cls(name)
+        handle._buffer = None
+        handle._file_path = file_path
+        handle._owns_file = False
+        handle._on_release = on_release
+        handle.size = os.path.getsize(file_path)
+        handle._finished = True
+        return handle
+
+    def write(self, chunk: bytes) -> None:
+        """Append bytes, moving the document to disk once it passes the threshold."""
+        if self._finished:
+            raise ValueError(f"Cannot write to finished document {self.name}")
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self._spool_file is not None:
+            self._spool_file.write(chunk)
+            return
+        self._buffer.write(chunk)
+        if self.size > self.spool_threshold:
+            self._spool_to_disk()
+
+    def _spool_to_disk(self):
+        """Move the in-memory bytes to a temporary file."""
+        self._spool_file = tempfile.NamedTemporaryFile(
+            dir=self.spool_dir,
+            prefix='report-',
+            suffix='.pdf',
+            delete=False
+        )
+        self._file_path = self._spool_file.name
+        self._spool_file.write(self._buffer.getbuffer())
+        self._buffer = None
+        logger.debug(f"Spooled {self.name} to {self._file_path}")
+
+    def finish(self) -> None:
+        """Seal the document once all bytes are written."""
+        if self._finished:
+            return
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+        else:
+            self._content = self._buffer.getvalue()
+            self._buffer = None
+        self._finished = True
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the document lives in a file rather than in memory."""
+        return self._file_path is not None
+
+    @property
+    def file_path(self) -> Optional[str]:
+        """Path of the document's file, or None for in-memory documents."""
+        return self._file_path
+
+    @property
+    def content(self) -> Optional[bytes]:
+        """Bytes of an in-memory document, or None for spooled documents."""
+        return self._content
+
+    def open_stream(self) -> BinaryIO:
+        """
+        Open a new read-only stream over the document.
+
+        Spooled documents are memory-mapped; in-memory documents share their
+        bytes with the stream instead of copying them. The caller closes it.
+
+        Returns:
+            Readable, seekable stream positioned at the start of the document
+
+        Raises:
+            ValueError: If the document is unfinished, released or empty
+        """
+        if not self._finished:
+            raise ValueError(f"Document {self.name} is still being written")
+        if self._released:
+            raise ValueError(f"Document {self.name} has been released")
+        if self._file_path is not None:
+            return map_file(self._file_path)
+        if not self._content:
+            raise ValueError(f"No content provided for {self.name}")
+        return io.BytesIO(self._content)
+
+    def release(self) -> None:
+        """Free the document's memory or delete its temporary file."""
+        if self._released:
+            return
+        self._released = True
+        self._buffer = None
+        self._content = None
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+        if self._file_path is not None and self._owns_file:
+            try:
+                os.remove(self._file_path)
+            except OSError as e:
+                logger.warning(f"Failed to remove spooled file {self._file_path}: {e}")
+        if self._on_release is not None:
+            callback, self._on_release = self._on_release, None
+            callback()
+
+    def __enter__(self) -> 'DocumentHandle':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __repr__(self) -> str:
+        location = self._file_path if self.on_disk else 'memory'
+        return f"DocumentHandle({self.name!r}, {self.size} bytes, {location})"
@@ -0,0 +1,274 @@
+"""On-disk content-addressed cache for extracted PDF text."""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union, Tuple, BinaryIO, Any
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of cache entries changes
+CACHE_FORMAT_VERSION = 1
+
+HASH_BLOCK_SIZE = 1024 * 1024  # 1 MB reads when hashing files
+
+def hash_pdf_source(pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> str:
+    """
+    Compute the SHA-256 digest of a PDF's bytes.
+
+    Args:
+        pdf_data: Either a dictionary with 'document' (DocumentHandle),
+                'content' (bytes) or 'file_path', or a tuple of
+                (filename, file_stream)
+
+    Returns:
+        Hex digest of the PDF bytes
+
+    Raises:
+        ValueError: If the input carries no PDF bytes
+    """
+    digest = hashlib.sha256()
+
+    if isinstance(pdf_data, dict):
+        document = pdf_data.get('document')
+        if document is not None:
+            stream = document.open_stream()
+            try:
+                for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+            finally:
+                stream.close()
+            return digest.hexdigest()
+        if pdf_data.get('file_path'):
+            with open(pdf_data['file_path'], 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+            return digest.hexdigest()
+        content = pdf_data.get('content')
+        if not content:
+            raise ValueError(f"No content provided for {pdf_data.get('name', 'unknown')}")
+        digest.update(content)
+        return digest.hexdigest()
+
+    _, file_stream = pdf_data
+    position = file_stream.tell()
+    for block in iter(lambda: file_stream.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    file_stream.seek(position)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    Size-bounded LRU cache of extraction results keyed by PDF content.
+
+    Safe to use from several threads; entries are read and written outside
+    the lock guarding the index.
+    """
+
+    def __init__(self, cache_dir: str = ".cache/extraction", max_size_mb: float = 512, evict: bool = True):
+        """
+        Initialize ExtractionCache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_size_mb: Maximum total size of cache entries before eviction
+            evict: Whether put evicts entries; caches in worker processes
+                    that share a directory leave eviction to the owning
+                    process, which calls trim()
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.evict = evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU index from entries already on disk."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        found = self._scan()
+        if found:
+            logger.info(
+                f"Loaded extraction cache index: {found} entries, "
+                f"{self._size_bytes / (1024 * 1024):.1f} MB"
+            )
+
+    def _scan(self) -> int:
+        """Index every entry in the cache directory, oldest first, returning the entry count."""
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Evicted by another process
+                found.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+
+        self._entries.clear()
+        self._size_bytes = 0
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size_bytes += size
+        return len(found)
+
+    def trim(self) -> None:
+        """
+        Evict least recently used entries until the whole directory fits the size bound.
+
+        Rescans the directory first, so entries written by other processes
+        sharing it count against the bound too.
+        """
+        with self._lock:
+            self._scan()
+            self._evict()
+
+    def _entry_path(self, key: str) -> str:
+        """Get the file path for a cache key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def make_key(self, pdf_data: Union[Dict, Tuple[str, BinaryIO]], fingerprint: str) -> str:
+        """
+        Build a cache key from the PDF bytes and the extraction settings.
+
+        Args:
+            pdf_data: PDF input in any format accepted by PDFProcessor.process_pdf
+            fingerprint: Description of the extraction settings (layout
+                    parameters, cleaning versions) that affect the output
+
+        Returns:
+            Hex cache key
+        """
+        return self.make_digest_key(hash_pdf_source(pdf_data), fingerprint)
+
+    @staticmethod
+    def make_digest_key(content_digest: str, fingerprint: str) -> str:
+        """
+        Build a cache key from a digest of the cached content's source.
+
+        Args:
+            content_digest: Hex digest identifying the source (a whole PDF or a single page)
+            fingerprint: Description of the settings that affect the output
+
+        Returns:
+            Hex cache key
+        """
+        digest = hashlib.sha256()
+        digest.update(content_digest.encode())
+        digest.update(f"|{CACHE_FORMAT_VERSION}|{fingerprint}".encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached extraction result.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries and not self._adopt(key):
+                self.misses += 1
+                return None
+
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable extraction cache entry {key}: {e}")
+            with self._lock:
+                self._remove(key)
+                self.misses += 1
+            return None
+
+        # Mark as most recently used, on disk as well as in memory
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def _adopt(self, key: str) -> bool:
+        """Index an entry written by another process sharing the cache directory."""
+        try:
+            size = os.stat(self._entry_path(key)).st_size
+        except OSError:
+            return False
+        self._entries[key] = size
+        self._size_bytes += size
+        return True
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store an extraction result, evicting least recently used entries if needed.
+
+        Args:
+            key: Cache key from make_key
+            result: JSON-serializable extraction result
+        """
+        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        if len(data) > self.max_size_bytes:
+            logger.debug(f"Skipping extraction cache entry {key}: larger than cache")
+            return
+
+        # Write atomically so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write extraction cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._size_bytes += len(data)
+            if self.evict:
+                self._evict()
+
+    def _evict(self):
+        """Evict least recently used entries until the cache fits its size bound."""
+        while self._size_bytes > self.max_size_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        """Remove an entry from the index and disk."""
+        self._size_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'size_mb': round(self._size_bytes / (1024 * 1024), 2)
+        }
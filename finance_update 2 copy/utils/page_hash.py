@@ -0,0 +1,109 @@
+"""Content hashes of individual PDF pages for page-level caching."""
+
+import hashlib
+import logging
+from typing import Dict, Optional, Set
+
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import PDFObjRef, PDFStream, stream_value
+from pdfminer.psparser import PSLiteral, PSKeyword
+
+logger = logging.getLogger(__name__)
+
+# Bump when the hashed page properties change
+PAGE_HASH_VERSION = 1
+
+MAX_OBJECT_DEPTH = 32  # Nesting depth past which resource objects are not followed
+
+def _image_stream(stream: PDFStream) -> bool:
+    subtype = stream.get('Subtype')
+    return isinstance(subtype, PSLiteral) and subtype.name == 'Image'
+
+class PageHasher:
+    """
+    Hashes pages of one document by what determines their extracted text.
+
+    A page's hash covers its content streams, geometry and everything its
+    resources reference (fonts, Form XObjects, encodings), so a corrected
+    re-upload gets the same hash for every page that did not change even
+    though the file's bytes differ. Image data is left out; it never
+    contributes text.
+
+    Objects shared between pages, such as fonts, are hashed once per
+    document and reused.
+    """
+
+    def __init__(self):
+        self._object_digests: Dict[int, bytes] = {}
+
+    def hash_page(self, page: PDFPage) -> Optional[str]:
+        """
+        Hash a page.
+
+        Args:
+            page: Parsed PDF page
+
+        Returns:
+            Hex digest of the page, or None if part of it could not be read
+        """
+        digest = hashlib.sha256(f"page-v{PAGE_HASH_VERSION}|".encode())
+        try:
+            digest.update(repr((page.mediabox, page.cropbox, page.rotate)).encode())
+            for stream in page.contents:
+                digest.update(b'|content|')
+                digest.update(hashlib.sha256(stream_value(stream).get_data()).digest())
+            digest.update(b'|resources|')
+            self._update(digest, page.resources, set(), 0)
+        except Exception as e:
+            logger.debug(f"Could not hash page {page.pageid}: {e}")
+            return None
+        return digest.hexdigest()
+
+    def _object_digest(self, ref: PDFObjRef, seen: Set[int], depth: int) -> bytes:
+        """Hash an indirect object, reusing the digest of objects seen on earlier pages."""
+        objid = ref.objid
+        cached = self._object_digests.get(objid)
+        if cached is not None:
+            return cached
+        if objid in seen:
+            # Back-reference within the object being hashed
+            return f"cycle:{objid}".encode()
+        seen.add(objid)
+        digest = hashlib.sha256()
+        self._update(digest, ref.resolve(), seen, depth + 1)
+        seen.discard(objid)
+        self._object_digests[objid] = digest.digest()
+        return self._object_digests[objid]
+
+    def _update(self, digest, obj, seen: Set[int], depth: int):
+        """Feed a PDF object into a digest."""
+        if depth > MAX_OBJECT_DEPTH:
+            digest.update(b'<deep>')
+        elif isinstance(obj, PDFObjRef):
+            digest.update(b'R')
+            digest.update(self._object_digest(obj, seen, depth))
+        elif isinstance(obj, PDFStream):
+            digest.update(b'S')
+            self._update(digest, obj.attrs, seen, depth + 1)
+            if not _image_stream(obj):
+                # Decoded, as layout analysis reads it
+                digest.update(hashlib.sha256(obj.get_data()).digest())
+        elif isinstance(obj, dict):
+            digest.update(b'{')
+            for key in sorted(obj, key=str):
+                digest.update(str(key).encode())
+                digest.update(b':')
+                self._update(digest, obj[key], seen, depth + 1)
+            digest.update(b'}')
+        elif isinstance(obj, (list, tuple)):
+            digest.update(b'[')
+            for item in obj:
+                self._update(digest, item, seen, depth + 1)
+            digest.update(b']')
+        elif isinstance(obj, (PSLiteral, PSKeyword)):
+            digest.update(b'/' + str(obj.name).encode())
+        elif isinstance(obj, bytes):
+            digest.update(f"b{len(obj)}:".encode() + obj)
+        else:
+            digest.update(repr(obj).encode())
+        digest.update(b';')
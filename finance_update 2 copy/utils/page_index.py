@@ -0,0 +1,125 @@
+"""Page-to-character-offset index for extracted document text."""
+
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+PAGE_SEPARATOR = '\n\n'
+
+class PageOffsetIndex:
+    """
+    Character offsets at which each page starts in a document's text.
+
+    Stored as one sorted list of ints, so it serializes compactly into
+    extraction results and resolves offsets to pages with a binary search.
+    Pages that produced no text start at the same offset as the next page.
+    """
+
+    def __init__(self, starts: Sequence[int], first_page: int = 1):
+        """
+        Initialize PageOffsetIndex.
+
+        Args:
+            starts: Start offset of each page, in page order
+            first_page: Page number of the first entry
+        """
+        self.starts = list(starts)
+        self.first_page = first_page
+
+    @classmethod
+    def join(cls, pages: Sequence[str], first_page: int = 1) -> Tuple[str, 'PageOffsetIndex']:
+        """
+        Join page texts into one document, recording where each page starts.
+
+        Args:
+            pages: Cleaned text of each page
+            first_page: Page number of the first page
+
+        Returns:
+            Tuple of (document text, index of page start offsets)
+        """
+        parts = []
+        starts = []
+        empty_pages = 0  # Empty pages waiting for the next page's start
+        offset = 0
+        for page in pages:
+            if not page:
+                empty_pages += 1
+                continue
+            if parts:
+                parts.append(PAGE_SEPARATOR)
+                offset += len(PAGE_SEPARATOR)
+            starts.extend([offset] * (empty_pages + 1))
+            empty_pages = 0
+            parts.append(page)
+            offset += len(page)
+        starts.extend([offset] * empty_pages)
+        return ''.join(parts), cls(starts, first_page)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.starts)
+
+    def page_at(self, offset: int) -> int:
+        """
+        Get the page number containing a character offset.
+
+        Args:
+            offset: Character offset into the document text
+
+        Returns:
+            Page number (offsets past the end resolve to the last page)
+        """
+        if not self.starts:
+            return self.first_page
+        index = max(bisect_right(self.starts, offset) - 1, 0)
+        return self.first_page + index
+
+    def page_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Get the first and last page numbers touched by text[start:end]."""
+        return self.page_at(start), self.page_at(max(start, end - 1))
+
+    def page_ref(self, start: int, end: int) -> str:
+        """Format the pages touched by text[start:end] as '3' or '3-4'."""
+        first, last = self.page_span(start, end)
+        return str(first) if first == last else f"{first}-{last}"
+
+    def remap_lines(self, line_offsets: List[int], new_offsets: List[int], new_length: int) -> 'PageOffsetIndex':
+        """
+        Map page starts onto text that had whole lines removed.
+
+        Args:
+            line_offsets: Original start offset of every line, in order
+            new_offsets: New start offset of every line (a removed line gets
+                    the offset of the next kept line)
+            new_length: Length of the new text
+
+        Returns:
+            PageOffsetIndex for the new text
+        """
+        starts = []
+        line = 0
+        for start in self.starts:
+            # Page starts fall on line starts, so find the first line at or after it
+            while line < len(line_offsets) and line_offsets[line] < start:
+                line += 1
+            starts.append(min(new_offsets[line], new_length) if line < len(new_offsets) else new_length)
+        return PageOffsetIndex(starts, self.first_page)
+
+    def to_list(self) -> List[int]:
+        """Serialize the index as a list of page start offsets."""
+        return list(self.starts)
+
+    @classmethod
+    def from_list(cls, starts: Sequence[int], first_page: int = 1) -> 'PageOffsetIndex':
+        """Rebuild an index serialized with to_list."""
+        return cls(starts, first_page)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, PageOffsetIndex)
+            and self.starts == other.starts
+            and self.first_page == other.first_page
+        )
+
+    def __repr__(self) -> str:
+        return f"PageOffsetIndex({self.starts!r}, first_page={self.first_page})"
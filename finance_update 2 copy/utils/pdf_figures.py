@@ -0,0 +1,170 @@
+"""Graphics cost estimates for PDF pages and figure skipping during layout analysis."""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import List, Set
+
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import stream_value, dict_value
+from pdfminer.psparser import literal_name
+from pdfminer.pdfinterp import PDFPageInterpreter, LITERAL_FORM
+from pdfminer.converter import TextConverter
+
+logger = logging.getLogger(__name__)
+
+# Content stream operators that build or paint paths, and that show text
+PATH_OPERATORS = frozenset([
+    b'm', b'l', b'c', b'v', b'y', b'h', b're',
+    b'S', b's', b'f', b'F', b'f*', b'B', b'B*', b'b', b'b*', b'n'
+])
+TEXT_OPERATORS = frozenset([b'Tj', b'TJ', b"'", b'"'])
+
+# A page is figure-dominated when it has at least this many path operators...
+FIGURE_MIN_PATH_OPS = 1500
+# ...and they make up at least this share of its path and text operators
+FIGURE_MIN_GRAPHICS_RATIO = 0.9
+
+# Layout cost per skipped operator when a document has too few analysed
+# operators to measure its own (pdfminer.six on vector charts)
+DEFAULT_SECONDS_PER_OP = 2e-5
+MIN_OPS_FOR_COST = 1000
+
+MAX_FORM_DEPTH = 3  # Nested Form XObjects scanned below the page
+
+_LITERAL_STRINGS = re.compile(rb'\((?:\\.|[^\\()])*\)')
+_HEX_STRINGS = re.compile(rb'<[0-9A-Fa-f\s]*>')
+_NAMES = re.compile(rb'/[^\s/\[\]()<>{}%]*')
+_XOBJECT_CALLS = re.compile(rb'/([^\s/\[\]()<>{}%]+)\s+Do(?![A-Za-z])')
+_OPERATORS = re.compile(rb"[A-Za-z'\"][A-Za-z*'\"]*")
+
+@dataclass
+class PageGraphics:
+    """Operator counts for a page's own content and the Form XObjects it uses."""
+    path_ops: int = 0
+    text_ops: int = 0
+    form_path_ops: int = 0
+    form_text_ops: int = 0
+    form_text_chars: int = 0  # Estimated characters shown inside forms
+
+    @property
+    def form_ops(self) -> int:
+        return self.form_path_ops + self.form_text_ops
+
+    @property
+    def total_ops(self) -> int:
+        return self.path_ops + self.text_ops + self.form_ops
+
+    @property
+    def graphics_ratio(self) -> float:
+        paths = self.path_ops + self.form_path_ops
+        texts = self.text_ops + self.form_text_ops
+        return paths / (paths + texts) if paths + texts else 0.0
+
+    def figure_dominated(self) -> bool:
+        """Whether the page is mostly vector graphics and worth skipping figures on."""
+        return (
+            self.path_ops + self.form_path_ops >= FIGURE_MIN_PATH_OPS
+            and self.graphics_ratio >= FIGURE_MIN_GRAPHICS_RATIO
+        )
+
+@dataclass
+class _StreamCounts:
+    path_ops: int
+    text_ops: int
+    text_chars: int  # Characters in string operands
+    xobjects: List[str]  # Names of XObjects invoked with Do
+
+def _count_operators(data: bytes) -> _StreamCounts:
+    """Count path and text operators in a content stream and the XObjects it invokes."""
+    literal_chars = sum(len(match) - 2 for match in _LITERAL_STRINGS.findall(data))
+    data = _LITERAL_STRINGS.sub(b' ', data)
+    hex_chars = sum(len(b''.join(match[1:-1].split())) // 2 for match in _HEX_STRINGS.findall(data))
+    data = _HEX_STRINGS.sub(b' ', data)
+    xobjects = [name.decode('latin-1') for name in _XOBJECT_CALLS.findall(data)]
+    data = _NAMES.sub(b' ', data)
+
+    path_ops = 0
+    text_ops = 0
+    for operator in _OPERATORS.findall(data):
+        if operator in PATH_OPERATORS:
+            path_ops += 1
+        elif operator in TEXT_OPERATORS:
+            text_ops += 1
+    return _StreamCounts(path_ops, text_ops, literal_chars + hex_chars, xobjects)
+
+def _scan_forms(
+    names: List[str],
+    resources,
+    graphics: PageGraphics,
+    seen: Set[int],
+    depth: int
+):
+    """Add operator counts for the Form XObjects invoked from a content stream."""
+    if depth > MAX_FORM_DEPTH or not names or not resources:
+        return
+    xobjects = dict_value(dict_value(resources).get('XObject', {}))
+    for name in names:
+        reference = xobjects.get(name)
+        if reference is None:
+            continue
+        objid = getattr(reference, 'objid', None)
+        if objid is not None:
+            if objid in seen:
+                continue
+            seen.add(objid)
+        xobject = stream_value(reference)
+        if xobject.get('Subtype') is not LITERAL_FORM:
+            continue
+        counts = _count_operators(xobject.get_data())
+        graphics.form_path_ops += counts.path_ops
+        graphics.form_text_ops += counts.text_ops
+        graphics.form_text_chars += counts.text_chars
+        # Forms without their own resources use the page's (PDF 1.7 section 4.9.1)
+        _scan_forms(counts.xobjects, xobject.get('Resources') or resources, graphics, seen, depth + 1)
+
+def scan_page_graphics(page: PDFPage) -> PageGraphics:
+    """
+    Estimate a page's layout analysis cost and text yield without rendering it.
+
+    Args:
+        page: Parsed PDF page
+
+    Returns:
+        PageGraphics with operator counts; partial counts if a stream is unreadable
+    """
+    graphics = PageGraphics()
+    try:
+        invoked = []
+        for stream in page.contents:
+            counts = _count_operators(stream_value(stream).get_data())
+            graphics.path_ops += counts.path_ops
+            graphics.text_ops += counts.text_ops
+            invoked.extend(counts.xobjects)
+        _scan_forms(invoked, page.resources, graphics, set(), 1)
+    except Exception as e:
+        logger.debug(f"Graphics scan incomplete for page {page.pageid}: {e}")
+    return graphics
+
+class FigureSkippingInterpreter(PDFPageInterpreter):
+    """Page interpreter that can skip Form XObjects, where charts usually live."""
+
+    skip_forms = False
+
+    def do_Do(self, xobjid_arg) -> None:
+        if self.skip_forms:
+            xobject = stream_value(self.xobjmap.get(literal_name(xobjid_arg)))
+            if xobject.get('Subtype') is LITERAL_FORM:
+                return
+        super().do_Do(xobjid_arg)
+
+class TextOnlyConverter(TextConverter):
+    """
+    Text converter that ignores paths.
+
+    Layout analysis groups characters only, so dropping lines, rectangles
+    and curves saves building their layout objects without changing the text.
+    """
+
+    def paint_path(self, gstate, stroke, fill, evenodd, path) -> None:
+        return
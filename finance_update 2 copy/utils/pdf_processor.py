@@ -1,30 +1,355 @@
 """Module for processing PDF files."""
 
 import io
+import json
+import time
+import signal
 import logging
-from typing import Dict, Union, Tuple, BinaryIO
+import threading
+from typing import Dict, List, Union, Tuple, BinaryIO, Optional, Any, Iterator, AsyncIterator
+from dataclasses import dataclass
+from contextlib import contextmanager
 from pdfminer.high_level import extract_text
 from pdfminer.layout import LAParams
 from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdftypes import resolve1
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.converter import TextConverter
+from PyPDF2 import PdfReader
 import re
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from utils.text_processor import TextProcessor
+from utils.document_handle import map_file
+from utils.extraction_cache import ExtractionCache
+from utils.page_hash import PageHasher
+from utils.pdf_tables import TableTextConverter
+from utils.page_index import PageOffsetIndex
+from utils.text_cleaning import (
+    normalize_text,
+    strip_repeated_lines,
+    find_repeated_lines,
+    drop_repeated_lines,
+    TOKENS_PER_WORD
+)
+from utils.disclosures import (
+    DISCLOSURE_RULES_VERSION,
+    DisclosureTailDetector,
+    find_disclosure_start,
+    truncate_disclosure_tail
+)
+from utils.pdf_figures import (
+    scan_page_graphics,
+    FigureSkippingInterpreter,
+    TextOnlyConverter,
+    DEFAULT_SECONDS_PER_OP,
+    MIN_OPS_FOR_COST
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 # Reduce pdfminer logging verbosity
 logging.getLogger('pdfminer').setLevel(logging.ERROR)
+logging.getLogger('PyPDF2').setLevel(logging.ERROR)
+
+# Supported execution backends for PDFProcessor.extract
+BACKEND_THREAD = 'thread'
+BACKEND_PROCESS = 'process'
+BACKENDS = (BACKEND_THREAD, BACKEND_PROCESS)
+
+# Page extraction strategies
+STRATEGY_LAYOUT = 'layout'  # Full pdfminer layout analysis on every page
+STRATEGY_TEXT_LAYER = 'text_layer_first'  # Embedded text layer, layout analysis as fallback
+STRATEGIES = (STRATEGY_LAYOUT, STRATEGY_TEXT_LAYER)
+
+# Handling of figure-heavy pages during layout analysis
+FIGURE_MODE_FULL = 'full'  # Analyse every figure
+FIGURE_MODE_SKIP = 'skip'  # Skip Form XObjects on pages dominated by vector graphics
+FIGURE_MODES = (FIGURE_MODE_FULL, FIGURE_MODE_SKIP)
+
+# Rendering of tables found by layout analysis
+TABLE_MODE_TEXT = 'text'  # As pdfminer lays them out, one text box at a time
+TABLE_MODE_TSV = 'tsv'  # Tab-separated rows in place of the table's lines
+TABLE_MODES = (TABLE_MODE_TEXT, TABLE_MODE_TSV)
+
+# Per-page extraction paths reported in stats
+PATH_TEXT_LAYER = 'text_layer'
+PATH_LAYOUT = 'layout'
+PATH_CACHE = 'page_cache'  # Unchanged page reused from an earlier extraction
+
+# Quality checks for the embedded text layer - pages failing any go to layout analysis
+MIN_TEXT_LAYER_WORDS = 20  # Too few words suggests text lives in figures or images
+MAX_SINGLE_CHAR_WORD_RATIO = 0.35  # Letter-spaced or glyph-by-glyph output
+MAX_AVG_WORD_LENGTH = 15  # Missing word spacing runs words together
+MAX_SHORT_LINE_RATIO = 0.7  # Fragmented lines from out-of-order drawing
+MAX_UNDECODED_RATIO = 0.02  # Replacement characters from missing font maps
+
+# Reasons a result is marked partial
+PARTIAL_DEADLINE = 'deadline'
+PARTIAL_PAGE_LIMIT = 'page_limit'
+
+# Time a process worker gets past its deadline before the pool is torn down
+DEADLINE_GRACE_SECONDS = 5.0
+
+# Pages iter_pages holds back to learn a document's running headers and footers
+REPEAT_WINDOW_PAGES = 12
+
+# Bump when clean_extracted_text changes its output
+CLEANING_VERSION = 3
+
+# Layout analysis parameters shared by every backend
+LAYOUT_PARAMS = {
+    'line_margin': 0.5,
+    'word_margin': 0.1,
+    'char_margin': 2.0,
+    'boxes_flow': 0.5,
+    'detect_vertical': True,
+    'all_texts': True
+}
+
+@dataclass
+class PageText:
+    """Cleaned text of a single PDF page."""
+    page_number: int  # One-based page number
+    text: str
+
+# Per-process processor used by the process-pool backend
+_worker_processor = None
+_in_worker_process = False
+
+class _DeadlineExceeded(Exception):
+    """Raised inside a page when the document deadline passes."""
+
+@contextmanager
+def _interrupt_at(deadline: Optional[float]):
+    """
+    Interrupt the enclosed page extraction when the deadline passes.
+    
+    Only armed in process-pool workers, where extraction runs on the main
+    thread and the worker owns its signal handlers. Elsewhere deadlines are
+    checked between pages.
+    
+    Args:
+        deadline: Absolute deadline as a time.time() timestamp, or None
+    """
+    if (
+        deadline is None
+        or not _in_worker_process
+        or not hasattr(signal, 'setitimer')
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+        
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise _DeadlineExceeded()
+        
+    def _on_alarm(signum, frame):
+        raise _DeadlineExceeded()
+        
+    previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """
+    Initialize a process-pool worker.
+    
+    pdfminer is imported at module load, so building the processor here
+    pays the import and setup cost once per worker instead of per file.
+    
+    Args:
+        options: Keyword arguments for the worker's PDFProcessor
+    """
+    global _worker_processor, _in_worker_process
+    _in_worker_process = True
+    _worker_processor = PDFProcessor(backend=BACKEND_THREAD, max_workers=1, **options)
+    logging.getLogger('pdfminer').setLevel(logging.ERROR)
+
+def _get_worker_processor() -> 'PDFProcessor':
+    """Get the worker's PDFProcessor, creating a default one if needed."""
+    if _worker_processor is None:
+        _init_worker({})
+    return _worker_processor
+
+def _process_in_worker(pdf_data: Dict, deadline: Optional[float] = None) -> Dict:
+    """Process a single PDF inside a process-pool worker."""
+    return _get_worker_processor().process_pdf(pdf_data, deadline)
+
+def _count_pages_in_worker(pdf_data: Dict) -> int:
+    """Count the pages of a PDF inside a process-pool worker."""
+    return _get_worker_processor().count_pages(pdf_data)
+
+def _extract_range_in_worker(
+    pdf_data: Dict,
+    first_page: int,
+    last_page: int,
+    deadline: Optional[float] = None
+) -> Dict:
+    """Extract a page range of a PDF inside a process-pool worker."""
+    return _get_worker_processor().extract_page_range(pdf_data, first_page, last_page, deadline)
 
 class PDFProcessor:
     """Handles PDF processing with streaming and parallel processing"""
 
-    def __init__(self, max_workers: int = 4):
-        """Initialize PDFProcessor."""
+    def __init__(
+        self,
+        max_workers: int = 4,
+        backend: str = BACKEND_THREAD,
+        page_parallel_threshold: int = 40,
+        pages_per_range: int = 16,
+        extraction_strategy: str = STRATEGY_LAYOUT,
+        document_timeout: Optional[float] = None,
+        max_pages: Optional[int] = None,
+        remove_repeated_lines: bool = True,
+        figure_mode: str = FIGURE_MODE_FULL,
+        truncate_disclosures: bool = True,
+        page_cache_dir: Optional[str] = None,
+        page_cache_max_mb: float = 256,
+        table_mode: str = TABLE_MODE_TEXT
+    ):
+        """
+        Initialize PDFProcessor.
+        
+        Args:
+            max_workers: Maximum number of concurrent extraction workers
+            backend: 'thread' to extract in a thread pool, or 'process' to
+                    extract in a process pool so layout analysis scales
+                    across cores
+            page_parallel_threshold: Minimum page count for splitting a single
+                    document into page ranges across process workers
+                    (0 disables page-parallel extraction)
+            pages_per_range: Number of pages per range when splitting
+            extraction_strategy: 'layout' to run layout analysis on every page,
+                    or 'text_layer_first' to use the embedded text layer and
+                    fall back to layout analysis only for pages that fail the
+                    quality check
+            document_timeout: Optional wall-clock seconds allowed per document.
+                    Extraction stops at the deadline and keeps the pages
+                    already extracted. Process workers are interrupted
+                    mid-page; thread workers stop at the next page boundary.
+            max_pages: Optional maximum number of pages extracted per document
+            remove_repeated_lines: Whether to drop running headers, footers and
+                    other lines repeated near the edges of most pages
+            figure_mode: 'full' to analyse every figure, or 'skip' to skip
+                    Form XObjects (usually charts) on pages dominated by vector
+                    graphics, trading their labels for layout time
+            truncate_disclosures: Whether to drop the regulatory disclosure
+                    appendix at the end of a document. Whole-document
+                    extraction stops once the appendix is confirmed, so its
+                    remaining pages are never rendered.
+            page_cache_dir: Optional directory for a cache of raw page text
+                    keyed by a hash of each page's content and resources, so
+                    re-extracting a revised PDF only analyses changed pages.
+                    Process workers share the directory.
+            page_cache_max_mb: Maximum size of the page cache
+            table_mode: 'text' to keep pdfminer's rendering of tables, or
+                    'tsv' to detect tabular blocks in the layout and emit them
+                    as tab-separated rows, leaving the rest of the page as
+                    prose. Applies to pages that go through layout analysis.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{backend}', expected one of {BACKENDS}")
+        if pages_per_range <= 0:
+            raise ValueError("pages_per_range must be a positive integer")
+        if extraction_strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown extraction strategy '{extraction_strategy}', expected one of {STRATEGIES}"
+            )
+        if figure_mode not in FIGURE_MODES:
+            raise ValueError(f"Unknown figure mode '{figure_mode}', expected one of {FIGURE_MODES}")
+        if table_mode not in TABLE_MODES:
+            raise ValueError(f"Unknown table mode '{table_mode}', expected one of {TABLE_MODES}")
+        if document_timeout is not None and document_timeout <= 0:
+            raise ValueError("document_timeout must be a positive number of seconds")
+        if max_pages is not None and max_pages <= 0:
+            raise ValueError("max_pages must be a positive integer")
+            
         self.text_processor = TextProcessor()
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.backend = backend
+        self.max_workers = max_workers
+        self.page_parallel_threshold = page_parallel_threshold
+        self.pages_per_range = pages_per_range
+        self.extraction_strategy = extraction_strategy
+        self.document_timeout = document_timeout
+        self.max_pages = max_pages
+        self.remove_repeated_lines = remove_repeated_lines
+        self.figure_mode = figure_mode
+        self.truncate_disclosures = truncate_disclosures
+        self.page_cache_dir = page_cache_dir
+        self.page_cache_max_mb = page_cache_max_mb
+        self.table_mode = table_mode
+        self.page_cache = None
+        if page_cache_dir:
+            # Workers share the directory; the processor that owns them trims it
+            self.page_cache = ExtractionCache(
+                cache_dir=page_cache_dir,
+                max_size_mb=page_cache_max_mb,
+                evict=not _in_worker_process
+            )
+        self.executor = self._create_executor()
+
+    def _create_executor(self):
+        """Create the executor for the configured backend."""
+        if self.backend == BACKEND_PROCESS:
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self._worker_options(),)
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _worker_options(self) -> Dict[str, Any]:
+        """Get the options used to build PDFProcessor instances in worker processes."""
+        return {
+            'extraction_strategy': self.extraction_strategy,
+            'max_pages': self.max_pages,
+            'remove_repeated_lines': self.remove_repeated_lines,
+            'figure_mode': self.figure_mode,
+            'truncate_disclosures': self.truncate_disclosures,
+            'page_cache_dir': self.page_cache_dir,
+            'page_cache_max_mb': self.page_cache_max_mb,
+            'table_mode': self.table_mode
+        }
+
+    def cache_fingerprint(self) -> str:
+        """Describe the settings that determine extracted text, for cache keys."""
+        return json.dumps(
+            {
+                'layout': LAYOUT_PARAMS,
+                'cleaning': CLEANING_VERSION,
+                'strategy': self.extraction_strategy,
+                'repeated_lines': self.remove_repeated_lines,
+                'figures': self.figure_mode,
+                'tables': self.table_mode,
+                'disclosures': DISCLOSURE_RULES_VERSION if self.truncate_disclosures else 0
+            },
+            sort_keys=True
+        )
+
+    def _page_cache_fingerprint(self) -> str:
+        """Describe the settings that determine a page's raw text, for page cache keys."""
+        return json.dumps(
+            {
+                'layout': LAYOUT_PARAMS,
+                'strategy': self.extraction_strategy,
+                'figures': self.figure_mode,
+                'tables': self.table_mode
+            },
+            sort_keys=True
+        )
+
+    def close(self) -> None:
+        """Shut down the extraction executor."""
+        self.executor.shutdown(wait=True)
 
     async def extract(self, pdf_data: Dict) -> Dict:
         """
@@ -37,69 +362,831 @@ class PDFProcessor:
             Dictionary containing extracted text and metadata
         """
         try:
-            # Run CPU-intensive PDF processing in a thread pool
             loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                self.executor,
-                self.process_pdf,
-                pdf_data
-            )
+            # The deadline runs from submission, so time spent queued counts
+            deadline = self._deadline()
+            if self.backend == BACKEND_PROCESS:
+                # Ship only the raw bytes or file path to the worker process
+                try:
+                    result = await self._extract_in_workers(self._worker_payload(pdf_data), deadline)
+                finally:
+                    await self._trim_page_cache()
+            else:
+                # Run CPU-intensive PDF processing in a thread pool
+                result = await loop.run_in_executor(
+                    self.executor,
+                    self.process_pdf,
+                    pdf_data,
+                    deadline
+                )
             return result
         except Exception as e:
             logger.error(f"Error in async PDF extraction: {str(e)}")
             raise
 
-    def extract_text_with_layout(self, pdf_stream: BinaryIO) -> str:
+    async def _extract_in_workers(self, payload: Dict, deadline: Optional[float]) -> Dict:
+        """Extract a document in the process pool, across page ranges if it is large."""
+        # Split large documents into page ranges across workers
+        if self.page_parallel_threshold:
+            try:
+                page_count = await self._run_in_worker(
+                    deadline,
+                    _count_pages_in_worker,
+                    payload
+                )
+            except asyncio.TimeoutError:
+                return self._deadline_error_result(payload.get('name'))
+            except Exception as e:
+                # Let the single-worker path report unreadable files
+                logger.debug(f"Could not count pages of {payload.get('name')}: {e}")
+                page_count = 0
+            if page_count >= self.page_parallel_threshold:
+                return await self._extract_page_parallel(payload, page_count, deadline)
+
+        try:
+            result = await self._run_in_worker(
+                deadline,
+                _process_in_worker,
+                payload,
+                deadline
+            )
+        except asyncio.TimeoutError:
+            return self._deadline_error_result(payload.get('name'))
+        if 'stats' in result:
+            result['stats']['backend'] = BACKEND_PROCESS
+        return result
+
+    async def _trim_page_cache(self) -> None:
+        """Evict page cache entries beyond its size bound, including those written by workers."""
+        if self.page_cache is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.page_cache.trim)
+
+    def _deadline(self) -> Optional[float]:
+        """Get the absolute deadline for a document starting now, if any."""
+        if self.document_timeout is None:
+            return None
+        return time.time() + self.document_timeout
+
+    async def _run_in_worker(self, deadline: Optional[float], func, *args):
         """
-        Extract text from PDF with layout analysis.
+        Run a function in the process pool, enforcing the document deadline.
+        
+        Workers stop themselves at the deadline. A worker still running after
+        the grace period is stuck somewhere the alarm cannot reach, so the
+        pool is replaced and the stuck worker left to exit on its own. Other
+        documents still queued on the old pool are retried once on the new one.
         
         Args:
-            pdf_stream: PDF file stream
+            deadline: Absolute deadline as a time.time() timestamp, or None
+            func: Picklable module-level function to run
+            *args: Arguments for func
             
         Returns:
-            Extracted text with preserved layout
+            Result of func
+            
+        Raises:
+            asyncio.TimeoutError: If the worker did not stop within the grace period
         """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - time.time(), 0) + DEADLINE_GRACE_SECONDS
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, func, *args),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error("PDF worker did not stop at its deadline, restarting the process pool")
+                self._restart_process_pool(executor)
+                raise
+            except asyncio.CancelledError:
+                # Queued work is cancelled when the pool is replaced; a real cancel still propagates
+                if attempt or self.executor is executor or asyncio.current_task().cancelling():
+                    raise
+                logger.warning("PDF worker pool was restarted, retrying on the new pool")
+            except BrokenProcessPool:
+                # Only retry when the pool was restarted under us
+                if attempt or self.executor is executor:
+                    raise
+                logger.warning("PDF worker pool was restarted, retrying on the new pool")
+
+    def _restart_process_pool(self, executor: ProcessPoolExecutor):
+        """Replace a stuck process pool with a fresh one, dropping its queued work."""
+        if self.executor is not executor:
+            return  # Already restarted by another document
+        # Running workers are not interrupted; each exits at its own deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._create_executor()
+
+    def _cap_page_count(self, page_count: int, stats: Optional[Dict] = None) -> int:
+        """Limit a document's page count to max_pages, marking stats partial if cut."""
+        if self.max_pages and page_count > self.max_pages:
+            self._mark_partial(stats, PARTIAL_PAGE_LIMIT)
+            return self.max_pages
+        return page_count
+
+    async def _extract_range(
+        self,
+        payload: Dict,
+        first: int,
+        last: int,
+        deadline: Optional[float]
+    ) -> Dict:
+        """Extract a page range in a worker, keeping nothing if the worker had to be killed."""
         try:
-            # Set up PDF resources
-            resource_manager = PDFResourceManager()
-            fake_file_handle = io.StringIO()
-            
-            # Configure layout parameters
-            laparams = LAParams(
-                line_margin=0.5,
-                word_margin=0.1,
-                char_margin=2.0,
-                boxes_flow=0.5,
-                detect_vertical=True,
-                all_texts=True
+            return await self._run_in_worker(
+                deadline,
+                _extract_range_in_worker,
+                payload,
+                first,
+                last,
+                deadline
             )
+        except asyncio.TimeoutError:
+            stats = {}
+            self._mark_partial(stats, PARTIAL_DEADLINE)
+            return {'pages': [], 'stats': stats}
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Split a page count into (first, last) ranges of pages_per_range pages."""
+        return [
+            (first, min(first + self.pages_per_range, page_count))
+            for first in range(0, page_count, self.pages_per_range)
+        ]
+
+    async def _extract_page_parallel(
+        self,
+        payload: Dict,
+        page_count: int,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        Extract a large PDF as page ranges in parallel workers.
+        
+        Args:
+            payload: Worker payload with 'name' and 'content' or 'file_path'
+            page_count: Total number of pages in the document
+            deadline: Optional absolute deadline shared by all ranges
             
-            # Set up converter
-            converter = TextConverter(
-                resource_manager, 
-                fake_file_handle, 
-                laparams=laparams
+        Returns:
+            Dictionary in the same format as process_pdf
+        """
+        file_name = payload.get('name')
+        start_time = time.time()
+        try:
+            stats = {'backend': self.backend}
+            ranges = self._page_ranges(self._cap_page_count(page_count, stats))
+            stats['page_ranges'] = len(ranges)
+            logger.info(
+                f"Extracting {file_name} ({page_count} pages) in {len(ranges)} page ranges"
             )
             
+            range_results = await asyncio.gather(*[
+                self._extract_range(payload, first, last, deadline)
+                for first, last in ranges
+            ])
+            
+            # Reassemble pages in document order
+            page_texts = []
+            extracted_pages = 0
+            for (first, last), range_result in zip(ranges, range_results):
+                pages = range_result['pages']
+                extracted_pages += len(pages)
+                # Pad ranges cut short by the deadline so later pages keep their place
+                page_texts.extend(pages + ['\f'] * (last - first - len(pages)))
+                self._merge_page_stats(stats, range_result['stats'])
+            stats['pages'] = extracted_pages
+            return self._build_result(file_name, ''.join(page_texts), stats, start_time)
+            
+        except Exception as e:
+            return self._error_result(file_name, e)
+
+    async def iter_pages(self, pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> AsyncIterator[PageText]:
+        """
+        Stream cleaned text page by page as extraction progresses.
+        
+        Pages are yielded in document order while later pages are still being
+        parsed, so chunking and summarization can start on the first pages of
+        a long report before extraction has finished.
+        
+        Pages are cleaned as extract() cleans them: the disclosure appendix is
+        dropped and running headers and footers are removed. Repeated lines are
+        learned from the first REPEAT_WINDOW_PAGES pages, which are held back
+        until then; documents no longer than that come out exactly as
+        extract() leaves them.
+        
+        Consumers that stop early should call aclose() on the iterator so
+        in-flight extraction is released promptly.
+        
+        Args:
+            pdf_data: PDF input in any format accepted by process_pdf
+            
+        Yields:
+            PageText for each page in document order
+        """
+        deadline = self._deadline()
+        if self.backend == BACKEND_PROCESS:
+            pages = self._iter_page_ranges(self._worker_payload(pdf_data), deadline)
+        else:
+            pages = self._iter_pages_in_thread(pdf_data, deadline)
+        if self.truncate_disclosures:
+            pages = self._without_disclosure_tail(pages)
+        if self.remove_repeated_lines:
+            pages = self._without_repeated_lines(pages)
+
+        page_number = 0
+        try:
+            async for raw_text in pages:
+                page_number += 1
+                yield PageText(page_number=page_number, text=self.clean_extracted_text(raw_text))
+        finally:
+            # Stop background extraction when the consumer stops early
+            await pages.aclose()
+            if self.backend == BACKEND_PROCESS:
+                await self._trim_page_cache()
+
+    @staticmethod
+    async def _without_disclosure_tail(pages: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Pass raw pages through until the disclosure appendix opens."""
+        detector = DisclosureTailDetector()
+        passed = 0
+        held = []  # Pages held back while they may open the disclosure appendix
+        try:
+            async for raw_text in pages:
+                if detector.add(raw_text):
+                    # Keep the held pages before the one that opened the appendix,
+                    # and only the content above the heading on that page
+                    start_page, start_line = detector.start
+                    opened = start_page - passed  # Held pages start after those passed on
+                    head = '\n'.join(held[opened].split('\n')[:start_line])
+                    held = held[:opened] + ([head] if head.strip() else [])
+                    break
+                held.append(raw_text)
+                if detector.pending:
+                    continue
+                for held_text in held:
+                    passed += 1
+                    yield held_text
+                held = []
+            for held_text in held:
+                yield held_text
+        finally:
+            await pages.aclose()
+
+    @staticmethod
+    async def _without_repeated_lines(
+        pages: AsyncIterator[str],
+        window: int = REPEAT_WINDOW_PAGES
+    ) -> AsyncIterator[str]:
+        """Drop the repeated lines found in the first window pages from every raw page."""
+        held = []
+        repeated = None
+        try:
+            async for raw_text in pages:
+                if repeated is not None:
+                    yield drop_repeated_lines(raw_text, repeated)[0]
+                    continue
+                held.append(raw_text)
+                if len(held) < window:
+                    continue
+                repeated = find_repeated_lines(held)
+                for held_text in held:
+                    yield drop_repeated_lines(held_text, repeated)[0]
+                held = []
+            if held:
+                repeated = find_repeated_lines(held)
+                for held_text in held:
+                    yield drop_repeated_lines(held_text, repeated)[0]
+        finally:
+            await pages.aclose()
+
+    async def count_pages_async(self, pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> int:
+        """
+        Count the pages of a PDF without blocking the event loop.
+        
+        Args:
+            pdf_data: PDF input in any format accepted by process_pdf
+            
+        Returns:
+            Number of pages in the document
+        """
+        if self.backend == BACKEND_PROCESS:
+            return await self._run_in_worker(self._deadline(), _count_pages_in_worker, self._worker_payload(pdf_data))
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.count_pages, pdf_data)
+
+    async def _iter_pages_in_thread(
+        self,
+        pdf_data: Union[Dict, Tuple[str, BinaryIO]],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Drive the page generator in the thread pool, one page ahead of the consumer."""
+        loop = asyncio.get_running_loop()
+        file_name, file_stream, owned = self._open_pdf(pdf_data)
+        pages = self.iter_page_texts(file_stream, deadline=deadline)
+        done = object()
+        pending = None
+        try:
+            # Keep the next page extracting while the consumer handles this one
+            pending = loop.run_in_executor(self.executor, next, pages, done)
+            while True:
+                raw_text = await pending
+                if raw_text is done:
+                    break
+                pending = loop.run_in_executor(self.executor, next, pages, done)
+                yield raw_text
+        finally:
+            # Wait for any in-flight page before closing the generator and stream
+            if pending is not None and not pending.done():
+                await asyncio.wait([pending])
+            pages.close()
+            if owned:
+                file_stream.close()
+
+    async def _iter_page_ranges(
+        self,
+        payload: Dict,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Extract page ranges in worker processes, yielding pages in document order."""
+        page_count = await self._run_in_worker(deadline, _count_pages_in_worker, payload)
+        ranges = self._page_ranges(self._cap_page_count(page_count))
+        
+        # Keep up to max_workers ranges in flight ahead of the consumer
+        in_flight = []
+        next_range = 0
+        try:
+            while next_range < len(ranges) or in_flight:
+                while next_range < len(ranges) and len(in_flight) < self.max_workers:
+                    first, last = ranges[next_range]
+                    in_flight.append(asyncio.ensure_future(
+                        self._extract_range(payload, first, last, deadline)
+                    ))
+                    next_range += 1
+                range_result = await in_flight.pop(0)
+                for raw_text in range_result['pages']:
+                    yield raw_text
+                # Nothing after a range cut short by the deadline can follow in order
+                if range_result['stats'].get('partial'):
+                    return
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    @staticmethod
+    def _worker_payload(pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> Dict:
+        """
+        Reduce PDF input to a picklable payload for a worker process.
+        
+        Args:
+            pdf_data: Either a dictionary with 'name' and 'document',
+                    'content' or 'file_path' keys, or a tuple of
+                    (filename, file_stream)
+            
+        Returns:
+            Dictionary with 'name' and either 'content' (bytes) or 'file_path'
+        """
+        if isinstance(pdf_data, dict):
+            payload = {'name': pdf_data.get('name', '')}
+            document = pdf_data.get('document')
+            if document is not None:
+                # Workers map spooled documents from disk rather than receiving the bytes
+                if document.on_disk:
+                    payload['file_path'] = document.file_path
+                else:
+                    payload['content'] = document.content
+            elif pdf_data.get('file_path'):
+                payload['file_path'] = pdf_data['file_path']
+            else:
+                payload['content'] = pdf_data.get('content')
+            return payload
+
+        file_name, file_stream = pdf_data
+        return {'name': file_name, 'content': file_stream.read() if file_stream else None}
+
+    def extract_text_with_layout(
+        self,
+        pdf_stream: BinaryIO,
+        stats: Optional[Dict] = None,
+        page_numbers: Optional[range] = None,
+        deadline: Optional[float] = None
+    ) -> str:
+        """
+        Extract text from PDF with layout analysis.
+        
+        Args:
+            pdf_stream: PDF file stream
+            stats: Optional dictionary updated with the pages processed and the
+                    extraction path each page took
+            page_numbers: Optional zero-based page numbers to extract (defaults to all)
+            deadline: Optional absolute deadline as a time.time() timestamp
+            
+        Returns:
+            Extracted text with preserved layout
+        """
+        page_texts = self.extract_page_texts(pdf_stream, page_numbers, stats, deadline)
+        
+        # Extraction stopped at a disclosure appendix; if the document-wide rule
+        # finds none in the pages extracted, extract the skipped pages after all
+        if stats is not None and stats.get('disclosure_pages_skipped'):
+            if find_disclosure_start([text.rstrip('\f') for text in page_texts]) is None:
+                skipped = stats.pop('disclosure_pages_skipped')
+                logger.warning(f"Disclosure appendix not confirmed, extracting {skipped} skipped pages")
+                pdf_stream.seek(0)
+                page_texts += self.extract_page_texts(
+                    pdf_stream,
+                    range(len(page_texts), len(page_texts) + skipped),
+                    stats,
+                    deadline
+                )
+        if stats is not None:
+            stats['pages'] = len(page_texts)
+        return ''.join(page_texts)
+
+    def extract_page_texts(
+        self,
+        pdf_stream: BinaryIO,
+        page_numbers: Optional[range] = None,
+        stats: Optional[Dict] = None,
+        deadline: Optional[float] = None
+    ) -> List[str]:
+        """
+        Extract raw text for each page.
+        
+        Args:
+            pdf_stream: PDF file stream
+            page_numbers: Optional zero-based page numbers to extract (defaults to all)
+            stats: Optional dictionary updated with per-page extraction paths
+            deadline: Optional absolute deadline as a time.time() timestamp
+            
+        Returns:
+            List of raw page texts in page order, each ending with a form feed
+        """
+        return list(self.iter_page_texts(pdf_stream, page_numbers, stats, deadline))
+
+    def iter_page_texts(
+        self,
+        pdf_stream: BinaryIO,
+        page_numbers: Optional[range] = None,
+        stats: Optional[Dict] = None,
+        deadline: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        Lazily extract raw text page by page.
+        
+        With the 'text_layer_first' strategy each page's embedded text layer
+        is probed first and layout analysis only runs for pages whose text
+        layer fails the quality check.
+        
+        With a page cache, pages whose content and resources hash the same
+        as a previously extracted page reuse its raw text.
+        
+        Extraction stops early at the deadline or past max_pages; the pages
+        already yielded stand and stats is marked partial.
+        
+        When extracting the whole document with truncate_disclosures set,
+        extraction also stops once a disclosure appendix is confirmed; the
+        pages that opened it are still yielded for _build_result to cut.
+        
+        Args:
+            pdf_stream: PDF file stream
+            page_numbers: Optional zero-based page numbers to extract (defaults to all)
+            stats: Optional dictionary updated with per-page extraction paths
+                    and the time spent on each path
+            deadline: Optional absolute deadline as a time.time() timestamp
+            
+        Yields:
+            Raw text of each page in page order, ending with a form feed
+        """
+        text_layer = None
+        if self.extraction_strategy == STRATEGY_TEXT_LAYER:
+            probe_pages = page_numbers
+            if self.max_pages:
+                # Don't read the text layer of pages past the cap
+                first = page_numbers.start if page_numbers else 0
+                stop = page_numbers.stop if page_numbers else self.max_pages
+                probe_pages = range(first, max(first, min(stop, self.max_pages)))
+            text_layer = self._probe_text_layer(pdf_stream, probe_pages, stats)
+        
+        # Set up PDF resources
+        resource_manager = PDFResourceManager()
+        fake_file_handle = io.StringIO()
+        
+        # Configure layout parameters
+        laparams = LAParams(**LAYOUT_PARAMS)
+        
+        # Set up converter; paths never contribute text, so skip mode drops them
+        skip_figures = self.figure_mode == FIGURE_MODE_SKIP
+        if self.table_mode == TABLE_MODE_TSV:
+            converter_class = TableTextConverter
+        elif skip_figures:
+            converter_class = TextOnlyConverter
+        else:
+            converter_class = TextConverter
+        converter = converter_class(
+            resource_manager, 
+            fake_file_handle, 
+            laparams=laparams
+        )
+        
+        try:
             # Set up interpreter
-            page_interpreter = PDFPageInterpreter(resource_manager, converter)
+            interpreter_class = FigureSkippingInterpreter if skip_figures else PDFPageInterpreter
+            page_interpreter = interpreter_class(resource_manager, converter)
             
-            # Process each page
-            for page in PDFPage.get_pages(pdf_stream):
-                page_interpreter.process_page(page)
-                
-            # Get text
-            text = fake_file_handle.getvalue()
+            detector = None
+            if self.truncate_disclosures and page_numbers is None:
+                detector = DisclosureTailDetector()
+            hasher = PageHasher() if self.page_cache is not None else None
+            page_fingerprint = self._page_cache_fingerprint() if hasher else None
             
+            # Process each page, handing back its text before moving on
+            pages = PDFPage.get_pages(
+                pdf_stream,
+                pagenos=page_numbers,
+                maxpages=page_numbers.stop if page_numbers else 0
+            )
+            for index, page in enumerate(pages):
+                page_index = page_numbers[index] if page_numbers else index
+                if self.max_pages and page_index >= self.max_pages:
+                    self._mark_partial(stats, PARTIAL_PAGE_LIMIT)
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    self._mark_partial(stats, PARTIAL_DEADLINE)
+                    break
+                
+                # Reuse the text of pages unchanged since an earlier extraction
+                cache_key = None
+                cached = None
+                if hasher is not None:
+                    hash_start = time.time()
+                    page_hash = hasher.hash_page(page)
+                    if page_hash is not None:
+                        cache_key = ExtractionCache.make_digest_key(page_hash, page_fingerprint)
+                        cached = self.page_cache.get(cache_key)
+                    if stats is not None:
+                        stats['page_hash_seconds'] = stats.get('page_hash_seconds', 0.0) + (time.time() - hash_start)
+                
+                # Use the embedded text layer when it passes the quality check
+                layer_text = None
+                if text_layer is not None and index < len(text_layer):
+                    layer_text = text_layer[index]
+                page_stats = {}  # Statistics of this page kept with it in the page cache
+                if cached is not None:
+                    self._record_page_path(stats, PATH_CACHE)
+                    page_text = cached['text']
+                    page_stats = cached.get('stats', {})
+                elif layer_text is not None and self.text_layer_acceptable(layer_text):
+                    self._record_page_path(stats, PATH_TEXT_LAYER)
+                    page_text = layer_text + '\f'
+                else:
+                    if skip_figures:
+                        page_interpreter.skip_forms = self._scan_figures(page, stats)
+                    page_start = time.time()
+                    try:
+                        with _interrupt_at(deadline):
+                            page_interpreter.process_page(page)
+                    except _DeadlineExceeded:
+                        # Drop the half-rendered page and keep what came before
+                        self._mark_partial(stats, PARTIAL_DEADLINE)
+                        break
+                    page_text = fake_file_handle.getvalue()
+                    fake_file_handle.seek(0)
+                    fake_file_handle.truncate(0)
+                    self._record_page_path(stats, PATH_LAYOUT, time.time() - page_start)
+                    if isinstance(converter, TableTextConverter):
+                        page_stats = converter.page_stats
+                if cache_key is not None and cached is None:
+                    self.page_cache.put(cache_key, {'text': page_text, 'stats': page_stats})
+                if stats is not None and page_stats:
+                    self._merge_page_stats(stats, page_stats)
+                yield page_text
+                
+                if detector is not None and detector.add(page_text):
+                    # The rest is disclosures; count the pages without rendering them
+                    skipped = sum(1 for _ in pages)
+                    if self.max_pages:
+                        skipped = min(skipped, max(self.max_pages - index - 1, 0))
+                    if stats is not None and skipped:
+                        stats['disclosure_pages_skipped'] = skipped
+                    break
+
+        except Exception as e:
+            logger.error(f"Error extracting text with layout: {str(e)}")
+            raise
+        finally:
             # Clean up
             converter.close()
             fake_file_handle.close()
+
+    def count_pages(self, pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> int:
+        """
+        Count the pages of a PDF without running layout analysis.
+        
+        Args:
+            pdf_data: PDF input in any format accepted by process_pdf
+            
+        Returns:
+            Number of pages in the document
+        """
+        file_name, file_stream, owned = self._open_pdf(pdf_data)
+        try:
+            document = PDFDocument(PDFParser(file_stream))
+            page_count = resolve1(document.catalog.get('Pages', {})).get('Count')
+            if isinstance(page_count, int):
+                return page_count
+            # Fall back to walking the page tree
+            return sum(1 for _ in PDFPage.create_pages(document))
+        finally:
+            if owned:
+                file_stream.close()
+
+    def extract_page_range(
+        self,
+        pdf_data: Union[Dict, Tuple[str, BinaryIO]],
+        first_page: int,
+        last_page: int,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        Extract raw text for a contiguous page range.
+        
+        Args:
+            pdf_data: PDF input in any format accepted by process_pdf
+            first_page: First zero-based page number (inclusive)
+            last_page: Last zero-based page number (exclusive)
+            deadline: Optional absolute deadline as a time.time() timestamp
             
-            return text
+        Returns:
+            Dictionary containing:
+            - pages: List of raw page texts in page order
+            - stats: Per-page extraction paths and timings for the range
+        """
+        file_name, file_stream, owned = self._open_pdf(pdf_data)
+        try:
+            stats = {}
+            pages = self.extract_page_texts(file_stream, range(first_page, last_page), stats, deadline)
+            return {'pages': pages, 'stats': stats}
+        finally:
+            if owned:
+                file_stream.close()
 
+    def _probe_text_layer(
+        self,
+        pdf_stream: BinaryIO,
+        page_numbers: Optional[range],
+        stats: Optional[Dict]
+    ) -> List[Optional[str]]:
+        """
+        Read the embedded text layer of each page without layout analysis.
+        
+        Args:
+            pdf_stream: PDF file stream (rewound afterwards for pdfminer)
+            page_numbers: Optional zero-based page numbers to read (defaults to all)
+            stats: Optional dictionary updated with the probe time
+            
+        Returns:
+            Text layer per requested page, None where it could not be read
+        """
+        probe_start = time.time()
+        start_position = pdf_stream.tell()
+        texts = []
+        try:
+            reader = PdfReader(pdf_stream, strict=False)
+            indices = page_numbers if page_numbers is not None else range(len(reader.pages))
+            for index in indices:
+                if index >= len(reader.pages):
+                    break
+                try:
+                    texts.append(reader.pages[index].extract_text() or '')
+                except Exception as e:
+                    logger.debug(f"Text layer unreadable on page {index + 1}: {e}")
+                    texts.append(None)
         except Exception as e:
-            logger.error(f"Error extracting text with layout: {str(e)}")
-            raise
+            logger.debug(f"Text layer probe failed, using layout analysis: {e}")
+        finally:
+            pdf_stream.seek(start_position)
+            
+        if stats is not None:
+            stats['text_layer_seconds'] = stats.get('text_layer_seconds', 0.0) + (time.time() - probe_start)
+        return texts
+
+    @staticmethod
+    def text_layer_acceptable(text: str) -> bool:
+        """
+        Quick quality check for text read from the embedded text layer.
+        
+        Args:
+            text: Text layer of a single page
+            
+        Returns:
+            True if the text can be used without layout analysis
+        """
+        words = text.split()
+        if len(words) < MIN_TEXT_LAYER_WORDS:
+            return False
+            
+        single_char_words = sum(1 for word in words if len(word) == 1)
+        if single_char_words / len(words) > MAX_SINGLE_CHAR_WORD_RATIO:
+            return False
+            
+        if sum(len(word) for word in words) / len(words) > MAX_AVG_WORD_LENGTH:
+            return False
+            
+        if text.count('\ufffd') / len(text) > MAX_UNDECODED_RATIO:
+            return False
+            
+        lines = [line for line in text.split('\n') if line.strip()]
+        short_lines = sum(1 for line in lines if len(line.split()) <= 2)
+        if lines and short_lines / len(lines) > MAX_SHORT_LINE_RATIO:
+            return False
+            
+        return True
+
+    @staticmethod
+    def _record_page_path(stats: Optional[Dict], path: str, seconds: float = 0.0):
+        """Record the extraction path a page took and the time spent on it."""
+        if stats is None:
+            return
+        stats.setdefault('page_paths', []).append(path)
+        stats[f'{path}_pages'] = stats.get(f'{path}_pages', 0) + 1
+        stats[f'{path}_seconds'] = stats.get(f'{path}_seconds', 0.0) + seconds
+
+    @staticmethod
+    def _scan_figures(page: PDFPage, stats: Optional[Dict]) -> bool:
+        """
+        Decide whether to skip a page's figures, recording the cost and yield traded.
+        
+        Args:
+            page: Parsed PDF page about to go through layout analysis
+            stats: Optional dictionary updated with figure statistics
+            
+        Returns:
+            True if the page's Form XObjects should be skipped
+        """
+        scan_start = time.time()
+        graphics = scan_page_graphics(page)
+        skip = graphics.figure_dominated()
+        if stats is not None:
+            stats['figure_scan_seconds'] = stats.get('figure_scan_seconds', 0.0) + (time.time() - scan_start)
+            executed_ops = graphics.total_ops - (graphics.form_ops if skip else 0)
+            stats['layout_ops'] = stats.get('layout_ops', 0) + executed_ops
+            if skip:
+                stats['figure_pages_skipped'] = stats.get('figure_pages_skipped', 0) + 1
+                stats['figure_ops_skipped'] = stats.get('figure_ops_skipped', 0) + graphics.form_ops
+                stats['figure_chars_lost'] = stats.get('figure_chars_lost', 0) + graphics.form_text_chars
+        return skip
+
+    @staticmethod
+    def _mark_partial(stats: Optional[Dict], reason: str):
+        """Mark extraction stats as partial, keeping the first reason recorded."""
+        if stats is None:
+            return
+        stats['partial'] = True
+        stats.setdefault('partial_reason', reason)
+
+    @classmethod
+    def _merge_page_stats(cls, total: Dict, part: Dict):
+        """Merge per-page statistics from a page range into document totals."""
+        for key, value in part.items():
+            if key == 'partial':
+                cls._mark_partial(total, part.get('partial_reason', PARTIAL_DEADLINE))
+            elif key == 'page_paths':
+                total.setdefault(key, []).extend(value)
+            elif isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
+
+    @staticmethod
+    def _finalize_page_stats(stats: Dict):
+        """Round timings and estimate the time saved by the text-layer path and figure skipping."""
+        if 'table_tokens_before' in stats:
+            stats['table_tokens_saved'] = stats['table_tokens_before'] - stats['table_tokens_after']
+        layout_pages = stats.get(f'{PATH_LAYOUT}_pages', 0)
+        text_layer_pages = stats.get(f'{PATH_TEXT_LAYER}_pages', 0)
+        if layout_pages and text_layer_pages:
+            # Price text-layer pages at this document's observed layout cost per page
+            layout_cost = stats[f'{PATH_LAYOUT}_seconds'] / layout_pages
+            stats['estimated_seconds_saved'] = round(
+                text_layer_pages * layout_cost - stats.get(f'{PATH_TEXT_LAYER}_seconds', 0.0), 3
+            )
+        if stats.get('figure_ops_skipped'):
+            # Price skipped figure operators at this document's observed layout cost per operator
+            op_cost = DEFAULT_SECONDS_PER_OP
+            if stats.get('layout_ops', 0) >= MIN_OPS_FOR_COST:
+                op_cost = stats[f'{PATH_LAYOUT}_seconds'] / stats['layout_ops']
+            stats['estimated_figure_seconds_saved'] = round(
+                stats['figure_ops_skipped'] * op_cost - stats.get('figure_scan_seconds', 0.0), 3
+            )
+        for key in (
+            f'{PATH_LAYOUT}_seconds',
+            f'{PATH_TEXT_LAYER}_seconds',
+            'figure_scan_seconds',
+            'page_hash_seconds'
+        ):
+            if key in stats:
+                stats[key] = round(stats[key], 3)
 
     @staticmethod
     def clean_extracted_text(text: str) -> str:
@@ -112,78 +1199,153 @@ class PDFProcessor:
         Returns:
             Cleaned text
         """
-        if not text:
-            return ""
+        return normalize_text(text)
+
+    @staticmethod
+    def _open_pdf(pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> Tuple[str, BinaryIO, bool]:
+        """
+        Resolve PDF input into a file name and readable stream.
+        
+        Args:
+            pdf_data: Either a dictionary with 'name' and 'document'
+                    (DocumentHandle), 'content' (bytes) or 'file_path' keys,
+                    or a tuple of (filename, file_stream)
             
-        # Remove control characters while preserving basic formatting
-        text = ''.join(char if char.isprintable() or char in '\n\t' else ' ' for char in text)
+        Returns:
+            Tuple of (file name, stream, whether the caller must close the stream)
+        """
+        if isinstance(pdf_data, dict):
+            file_name = pdf_data.get('name', '')
+            document = pdf_data.get('document')
+            file_path = pdf_data.get('file_path')
+            content = pdf_data.get('content')
+            if document is not None:
+                return file_name, document.open_stream(), True
+            if file_path:
+                return file_name, map_file(file_path), True
+            if content:
+                return file_name, io.BytesIO(content), False
+            raise ValueError(f"No content provided for {file_name}")
+
+        file_name, file_stream = pdf_data
+        if not file_stream:
+            raise ValueError(f"No valid file stream for {file_name}")
+        return file_name, file_stream, False
+
+    def _build_result(self, file_name: str, raw_text: str, stats: Dict, start_time: float) -> Dict:
+        """Clean raw extracted text and build the extraction result."""
+        # Each page's text ends with a form feed
+        pages = raw_text.split('\f')
+        if len(pages) > 1 and not pages[-1]:
+            pages.pop()
+        
+        # Drop the disclosure appendix, estimating the tokens on pages never extracted
+        if self.truncate_disclosures:
+            pages, tail_stats = truncate_disclosure_tail(pages)
+            skipped = stats.get('disclosure_pages_skipped', 0)
+            if tail_stats and skipped:
+                words_per_page = tail_stats['disclosure_words_removed'] / max(tail_stats['disclosure_pages_removed'], 1)
+                tail_stats['disclosure_pages_removed'] += skipped
+                tail_stats['disclosure_tokens_removed'] += round(words_per_page * skipped * TOKENS_PER_WORD)
+            stats.update(tail_stats)
+        
+        # Drop running headers and footers while page boundaries are still known
+        if self.remove_repeated_lines:
+            pages, repeat_stats = strip_repeated_lines(pages)
+            stats.update(repeat_stats)
+        
+        # Clean page by page so each page's start offset survives cleaning
+        text, page_index = PageOffsetIndex.join([self.clean_extracted_text(page) for page in pages])
         
-        # Normalize whitespace while preserving paragraph breaks
-        text = re.sub(r'[\r\f\v]', '\n', text)  # Convert other breaks to newlines
-        text = re.sub(r' *\n *', '\n', text)    # Clean up spaces around newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)  # Limit consecutive newlines
-        text = re.sub(r' {2,}', ' ', text)      # Remove multiple spaces
+        # Validate text
+        if not text.strip():
+            raise ValueError(f"No text extracted from {file_name}")
         
-        # Remove empty lines at start/end
-        text = text.strip()
+        # Create preview
+        preview = text[:100] + "..." if len(text) > 100 else text
         
-        return text
+        stats['chars'] = len(text)
+        stats['extraction_seconds'] = round(time.time() - start_time, 3)
+        self._finalize_page_stats(stats)
+        
+        result = {
+            'text': text,
+            'file_name': file_name,
+            'preview': preview,
+            'stats': stats,
+            'page_offsets': page_index.to_list()
+        }
+        if stats.get('partial'):
+            logger.warning(
+                f"Partial extraction of {file_name} ({stats['partial_reason']}): "
+                f"kept {stats.get('pages', 0)} pages"
+            )
+            result['partial'] = True
+        return result
+
+    def _deadline_error_result(self, file_name: Optional[str]) -> Dict:
+        """Build the result returned when a worker had to be killed at the deadline."""
+        return self._error_result(
+            file_name,
+            TimeoutError(f"extraction did not stop within {self.document_timeout}s deadline")
+        )
 
-    def process_pdf(self, pdf_data: Union[Dict, Tuple[str, BinaryIO]]) -> Dict:
+    @staticmethod
+    def _error_result(file_name: Optional[str], error: Exception) -> Dict:
+        """Build the result returned when a PDF cannot be processed."""
+        error_msg = f"Error processing PDF {file_name if file_name else 'unknown'}: {str(error)}"
+        logger.error(error_msg)
+        return {
+            'text': '',
+            'file_name': file_name if file_name else 'unknown',
+            'preview': '',
+            'error': error_msg
+        }
+
+    def process_pdf(
+        self,
+        pdf_data: Union[Dict, Tuple[str, BinaryIO]],
+        deadline: Optional[float] = None
+    ) -> Dict:
         """
         Process a single PDF file with improved error handling.
         
         Args:
-            pdf_data: Either a dictionary with 'name' and 'content' keys,
+            pdf_data: Either a dictionary with 'name' and 'document'
+                    (DocumentHandle), 'content' (bytes) or 'file_path' keys,
                     or a tuple of (filename, file_stream)
+            deadline: Optional absolute deadline as a time.time() timestamp
+                    (defaults to document_timeout from now)
             
         Returns:
             Dictionary containing:
             - text: Extracted text
             - file_name: Original filename
             - preview: First 100 characters of text
+            - stats: Page count, character count, extraction time and the
+                    extraction path each page took
+            - partial: True if extraction stopped early at the deadline or
+                    page cap (stats gives the reason)
             - error: Error message if any
         """
         file_name = None
+        start_time = time.time()
+        if deadline is None:
+            deadline = self._deadline()
         try:
             # Get file name and stream
-            if isinstance(pdf_data, dict):
-                file_name = pdf_data.get('name', '')
-                content = pdf_data.get('content')
-                if not content:
-                    raise ValueError(f"No content provided for {file_name}")
-                file_stream = io.BytesIO(content)
-            else:
-                file_name, file_stream = pdf_data
-
-            if not file_stream:
-                raise ValueError(f"No valid file stream for {file_name}")
+            file_name, file_stream, owned = self._open_pdf(pdf_data)
             
             # Extract text with layout preservation
-            text = self.extract_text_with_layout(file_stream)
-            
-            # Clean the extracted text
-            text = self.clean_extracted_text(text)
-            
-            # Validate text
-            if not text.strip():
-                raise ValueError(f"No text extracted from {file_name}")
-            
-            # Create preview
-            preview = text[:100] + "..." if len(text) > 100 else text
+            stats = {'backend': self.backend}
+            try:
+                text = self.extract_text_with_layout(file_stream, stats, deadline=deadline)
+            finally:
+                # Close streams we opened from a file path
+                if owned:
+                    file_stream.close()
             
-            return {
-                'text': text,
-                'file_name': file_name,
-                'preview': preview
-            }
+            return self._build_result(file_name, text, stats, start_time)
             
         except Exception as e:
-            error_msg = f"Error processing PDF {file_name if file_name else 'unknown'}: {str(e)}"
-            logger.error(error_msg)
-            return {
-                'text': '',
-                'file_name': file_name if file_name else 'unknown',
-                'preview': '',
-                'error': error_msg
-            }
+            return self._error_result(file_name, e)
@@ -0,0 +1,208 @@
+"""Detection of tabular blocks in pdfminer layouts and compact TSV rendering."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LTPage, LTContainer, LTText, LTTextBox, LTTextLineHorizontal, LTChar
+
+from utils.text_cleaning import TOKENS_PER_WORD
+
+MIN_TABLE_ROWS = 3  # Consecutive multi-cell rows needed to call a block a table
+MIN_TABLE_COLUMNS = 2  # Cells a row needs to count as a table row
+MIN_NUMERIC_CELL_RATIO = 0.3  # Share of numeric cells that separates tables from side-by-side prose
+MAX_AVG_CELL_CHARS = 24  # Table cells are short; prose columns are not
+CELL_GAP_EMS = 1.0  # Horizontal gap between characters, in font sizes, that starts a new cell
+ROW_TOLERANCE = 0.5  # Vertical distance between line centres, in line heights, within one row
+
+_NUMERIC_CELL = re.compile(r'[-+–(]?[$€£¥]?\d[\d,.]*\s*(?:%|x|bps?|pp)?\)?', re.IGNORECASE)
+_WHITESPACE_BREAKS = re.compile(r'\n|\t| {2,}')
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate tokens, counting layout whitespace as well as words.
+
+    BPE tokenizers fold a single space into the following word but spend
+    separate tokens on line breaks, tabs and runs of spaces, which is where
+    table layout inflates prompts.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+    """
+    return round(len(text.split()) * TOKENS_PER_WORD) + len(_WHITESPACE_BREAKS.findall(text))
+
+@dataclass
+class _Cell:
+    x0: float
+    text: str
+
+@dataclass
+class _Row:
+    center: float
+    height: float
+    cells: List[_Cell] = field(default_factory=list)
+    lines: List[LTTextLineHorizontal] = field(default_factory=list)
+
+@dataclass
+class Table:
+    """A detected table: its rows of cell texts and the layout lines it replaces."""
+    rows: List[List[str]]
+    lines: List[LTTextLineHorizontal]
+
+    def to_tsv(self) -> str:
+        """Render the table as tab-separated rows."""
+        return '\n'.join('\t'.join(row) for row in self.rows)
+
+def _line_cells(line: LTTextLineHorizontal) -> List[_Cell]:
+    """Split a layout line into cells at wide gaps between characters."""
+    cells = []
+    parts = []
+    start = None
+    previous = None
+    for item in line:
+        if isinstance(item, LTChar):
+            if previous is not None and item.x0 - previous.x1 > CELL_GAP_EMS * max(previous.size, 1.0):
+                cells.append(_Cell(start, ''.join(parts).strip()))
+                parts = []
+                start = None
+            if start is None:
+                start = item.x0
+            previous = item
+        parts.append(item.get_text())
+    if start is not None:
+        cells.append(_Cell(start, ''.join(parts).strip()))
+    return [cell for cell in cells if cell.text]
+
+def _text_lines(item) -> List[LTTextLineHorizontal]:
+    """Collect horizontal text lines in rendering order."""
+    if isinstance(item, LTTextLineHorizontal):
+        return [item]
+    if isinstance(item, LTContainer):
+        lines = []
+        for child in item:
+            lines.extend(_text_lines(child))
+        return lines
+    return []
+
+def _group_rows(lines: List[LTTextLineHorizontal]) -> List[_Row]:
+    """Group lines sharing a baseline into rows, top to bottom."""
+    rows: List[_Row] = []
+    for line in sorted(lines, key=lambda line: -(line.y0 + line.y1) / 2):
+        center = (line.y0 + line.y1) / 2
+        height = max(line.height, 1.0)
+        if rows and abs(rows[-1].center - center) <= ROW_TOLERANCE * min(rows[-1].height, height):
+            row = rows[-1]
+        else:
+            row = _Row(center, height)
+            rows.append(row)
+        row.lines.append(line)
+        row.cells.extend(_line_cells(line))
+    for row in rows:
+        row.cells.sort(key=lambda cell: cell.x0)
+    return rows
+
+def _is_table(rows: List[_Row]) -> bool:
+    """Check whether a run of multi-cell rows reads as a table rather than prose columns."""
+    cells = [cell.text for row in rows for cell in row.cells]
+    numeric = sum(1 for text in cells if _NUMERIC_CELL.fullmatch(text))
+    return (
+        numeric / len(cells) >= MIN_NUMERIC_CELL_RATIO
+        and sum(len(text) for text in cells) / len(cells) <= MAX_AVG_CELL_CHARS
+    )
+
+def find_tables(ltpage: LTPage) -> List[Table]:
+    """
+    Find tabular blocks on a laid-out page.
+
+    A table is a run of at least MIN_TABLE_ROWS consecutive rows with at
+    least MIN_TABLE_COLUMNS cells each, mostly short and partly numeric.
+
+    Args:
+        ltpage: Page after layout analysis
+
+    Returns:
+        Tables in top-to-bottom order
+    """
+    tables = []
+    run: List[_Row] = []
+    for row in _group_rows(_text_lines(ltpage)) + [None]:
+        if row is not None and len(row.cells) >= MIN_TABLE_COLUMNS:
+            run.append(row)
+            continue
+        if len(run) >= MIN_TABLE_ROWS and _is_table(run):
+            tables.append(Table(
+                rows=[[cell.text for cell in row.cells] for row in run],
+                lines=[line for row in run for line in row.lines]
+            ))
+        run = []
+    return tables
+
+def render_page(ltpage: LTPage, tables: List[Table]) -> str:
+    """
+    Render a page the way TextConverter does, with tables as TSV rows.
+
+    Args:
+        ltpage: Page after layout analysis
+        tables: Tables found on the page (empty for plain rendering)
+
+    Returns:
+        Page text ending with a form feed
+    """
+    table_of_line = {id(line): table for table in tables for line in table.lines}
+    written = set()
+    parts = []
+
+    def render(item) -> None:
+        table = table_of_line.get(id(item))
+        if table is not None:
+            if id(table) not in written:
+                written.add(id(table))
+                parts.append(table.to_tsv() + '\n')
+            return
+        if isinstance(item, LTContainer):
+            for child in item:
+                render(child)
+        elif isinstance(item, LTText):
+            parts.append(item.get_text())
+        # Boxes made up entirely of table lines were replaced by the TSV rows
+        if isinstance(item, LTTextBox):
+            replaced = len(item) and all(id(line) in table_of_line for line in item)
+            if not replaced:
+                parts.append('\n')
+
+    render(ltpage)
+    parts.append('\f')
+    return ''.join(parts)
+
+class TableTextConverter(TextConverter):
+    """
+    Text converter that renders tables as tab-separated rows.
+
+    Output matches TextConverter except that the lines of each detected
+    table are replaced by its TSV rows, written where the table's first
+    line would have been. Statistics for the last page, including token
+    estimates of the page with and without TSV tables, are left in
+    page_stats.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_stats: Dict[str, int] = {}
+
+    def receive_layout(self, ltpage: LTPage) -> None:
+        tables = find_tables(ltpage)
+        text = render_page(ltpage, tables)
+        self.write_text(text)
+
+        self.page_stats = {}
+        if tables:
+            self.page_stats = {
+                'table_regions': len(tables),
+                'table_rows': sum(len(table.rows) for table in tables),
+                'table_tokens_before': estimate_tokens(render_page(ltpage, [])),
+                'table_tokens_after': estimate_tokens(text)
+            }
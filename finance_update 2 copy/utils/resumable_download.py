@@ -0,0 +1,112 @@
+"""Chunked downloads that resume from the last received byte after a dropped connection."""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RESUMES = 5
+RESUME_BACKOFF_SECONDS = 1.0  # Doubled after every resume of the same download
+
+class IncompleteDownload(IOError):
+    """Raised when a response ends before the expected number of bytes arrived."""
+
+# Failures after which the transfer can be picked up again from where it stopped
+RESUMABLE_ERRORS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+    IncompleteDownload
+)
+
+@dataclass
+class DownloadStats:
+    """Transfer statistics of one download."""
+    bytes: int = 0
+    seconds: float = 0.0
+    resumes: int = 0
+
+    @property
+    def mb_per_second(self) -> float:
+        if not self.seconds:
+            return 0.0
+        return self.bytes / (1024 * 1024) / self.seconds
+
+    def __str__(self) -> str:
+        return (
+            f"{self.bytes / (1024 * 1024):.1f} MB in {self.seconds:.1f}s "
+            f"({self.mb_per_second:.1f} MB/s, {self.resumes} resumes)"
+        )
+
+async def resumable_chunks(
+    open_range: Callable[[int], Awaitable[aiohttp.ClientResponse]],
+    expected_size: Optional[int],
+    chunk_size: int,
+    max_resumes: int = DEFAULT_MAX_RESUMES,
+    stats: Optional[DownloadStats] = None,
+    name: str = 'download'
+) -> AsyncIterator[bytes]:
+    """
+    Stream a download in chunks, re-requesting the rest when the transfer breaks.
+
+    Chunks go straight to the consumer (a spool file or the blob store), so
+    the body is never held in memory, and a failure near the end only costs
+    the bytes still missing.
+
+    Args:
+        open_range: Coroutine function opening a streaming response that
+                starts at the given byte offset; offset 0 means the whole file
+        expected_size: File size in bytes, used to detect truncated responses
+        chunk_size: Size of the chunks read from the response
+        max_resumes: Resumes allowed before the failure is raised (0 disables)
+        stats: Optional statistics object filled in as the download progresses
+        name: Name used in log messages
+
+    Yields:
+        The file's bytes in order
+
+    Raises:
+        Any of RESUMABLE_ERRORS once max_resumes is exhausted
+    """
+    stats = stats if stats is not None else DownloadStats()
+    offset = 0
+    start = time.monotonic()
+    while True:
+        response = None
+        try:
+            # A failed reconnect counts against the same resumes as a dropped transfer
+            response = await open_range(offset)
+            # A server that ignores the range resends the file from the start
+            skip = offset if offset and response.status == 200 else 0
+            async for chunk in response.content.iter_chunked(chunk_size):
+                if skip:
+                    if len(chunk) <= skip:
+                        skip -= len(chunk)
+                        continue
+                    chunk = chunk[skip:]
+                    skip = 0
+                offset += len(chunk)
+                stats.bytes = offset
+                yield chunk
+            if expected_size is not None and offset < expected_size:
+                raise IncompleteDownload(f"Received {offset} of {expected_size} bytes")
+            break
+        except RESUMABLE_ERRORS as e:
+            if stats.resumes >= max_resumes:
+                raise
+            delay = RESUME_BACKOFF_SECONDS * 2 ** stats.resumes
+            stats.resumes += 1
+            logger.warning(
+                f"Download of {name} interrupted at {offset} bytes ({e}); "
+                f"resuming in {delay:.0f}s ({stats.resumes}/{max_resumes})"
+            )
+            await asyncio.sleep(delay)
+        finally:
+            if response is not None:
+                response.release()
+    stats.seconds = time.monotonic() - start
@@ -0,0 +1,180 @@
+"""Fixed-memory running aggregates for long-lived statistics."""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P-square algorithm.
+
+    Keeps five markers whose heights track the minimum, the target quantile,
+    the maximum and two points in between, adjusting them with a piecewise
+    parabolic fit as values arrive (Jain and Chlamtac, CACM 1985). Memory is
+    constant regardless of how many values are added.
+    """
+
+    def __init__(self, quantile: float):
+        """
+        Initialize P2Quantile.
+
+        Args:
+            quantile: Target quantile, strictly between 0 and 1
+        """
+        if not 0 < quantile < 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {quantile}")
+        self.quantile = quantile
+        self._heights: List[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0, 2 * quantile, 4 * quantile, 2 + 2 * quantile, 4]
+        self._increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value: float) -> None:
+        """Add a value to the estimate."""
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        positions = self._positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            offset = self._desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i])
+            / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1])
+            / (positions[i] - positions[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+
+    @property
+    def value(self) -> Optional[float]:
+        """Current estimate, exact while fewer than five values have been added."""
+        heights = self._heights
+        if not heights:
+            return None
+        if len(heights) < 5:
+            rank = self.quantile * (len(heights) - 1)
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(heights) - 1)
+            return heights[lower] + (heights[upper] - heights[lower]) * (rank - lower)
+        return heights[2]
+
+class RunningStats:
+    """
+    Count, mean, spread, extremes and quantiles of a stream of values.
+
+    Replaces keeping every value in a list: memory and the cost of reporting
+    stay fixed however long the process runs.
+    """
+
+    def __init__(self, quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        """
+        Initialize RunningStats.
+
+        Args:
+            quantiles: Quantiles to estimate
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._m2 = 0.0  # Sum of squared deviations from the mean (Welford)
+        self._quantiles = {quantile: P2Quantile(quantile) for quantile in quantiles}
+
+    def add(self, value: float) -> None:
+        """Add a value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        for estimate in self._quantiles.values():
+            estimate.add(value)
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """
+        Get the current estimate of a tracked quantile.
+
+        Args:
+            quantile: One of the quantiles given at construction
+
+        Returns:
+            Estimated value, or None before any values are added
+        """
+        return self._quantiles[quantile].value
+
+    def quantiles(self) -> Dict[float, Optional[float]]:
+        """Get the current estimate of every tracked quantile."""
+        return {quantile: estimate.value for quantile, estimate in self._quantiles.items()}
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Get the aggregates as a flat dictionary.
+
+        Returns:
+            Dictionary with count, mean, stdev, min, max and one 'pNN' entry per quantile
+        """
+        summary = {
+            'count': self.count,
+            'mean': self.mean if self.count else None,
+            'stdev': self.stdev,
+            'min': self.min,
+            'max': self.max
+        }
+        for quantile, value in self.quantiles().items():
+            summary[f"p{quantile * 100:g}"] = value
+        return summary
+
+    def __str__(self) -> str:
+        if not self.count:
+            return "n=0"
+        median = self._quantiles.get(0.5)
+        middle = f" p50={median.value:.3g}" if median is not None else ""
+        return f"n={self.count} mean={self.mean:.3g}{middle} range=[{self.min:.3g}, {self.max:.3g}]"
+
+    def __repr__(self) -> str:
+        return f"RunningStats({self})"
@@ -7,6 +7,8 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+from utils.page_index import PageOffsetIndex
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -51,33 +53,55 @@ class StructuredExtractor:
             "opportunities": []
         }
     
-    def extract_financial_data(self, text: str, doc_id: str, page_ref: str) -> Dict[str, List[Any]]:
+    def extract_financial_data(
+        self,
+        text: str,
+        doc_id: str,
+        page_ref: str,
+        page_index: Optional[PageOffsetIndex] = None
+    ) -> Dict[str, List[Any]]:
         """
         Extract structured financial data from text with source tracking.
         
         Args:
             text: Text to analyze
             doc_id: Document identifier
-            page_ref: Page reference
+            page_ref: Page reference, used when page_index is not given
+            page_index: Optional page offsets into text (an extraction
+                    result's 'page_offsets'), used to resolve each data
+                    point to the page it was found on
             
         Returns:
             Dictionary of extracted data points
         """
         # Extract numbers with context
-        self._extract_numbers(text, doc_id, page_ref)
+        self._extract_numbers(text, doc_id, page_ref, page_index)
         
         # Extract important quotes
-        self._extract_quotes(text, doc_id, page_ref)
+        self._extract_quotes(text, doc_id, page_ref, page_index)
         
         # Extract dates and events
-        self._extract_dates(text, doc_id, page_ref)
+        self._extract_dates(text, doc_id, page_ref, page_index)
         
         # Extract key points and trends
         self._extract_key_points(text, doc_id, page_ref)
         
         return self.data
     
-    def _extract_numbers(self, text: str, doc_id: str, page_ref: str):
+    @staticmethod
+    def _page_ref(page_ref: str, page_index: Optional[PageOffsetIndex], match: re.Match) -> str:
+        """Resolve the page reference of a match, falling back to the caller's page_ref."""
+        if page_index is None or not page_index.page_count:
+            return page_ref
+        return page_index.page_ref(match.start(), match.end())
+    
+    def _extract_numbers(
+        self,
+        text: str,
+        doc_id: str,
+        page_ref: str,
+        page_index: Optional[PageOffsetIndex] = None
+    ):
         """Extract financial numbers with context."""
         # Match currency amounts and percentages
         number_patterns = [
@@ -98,10 +122,16 @@ class StructuredExtractor:
                     value=match.group(),
                     context=context,
                     source=doc_id,
-                    page_ref=page_ref
+                    page_ref=self._page_ref(page_ref, page_index, match)
                 ))
     
-    def _extract_quotes(self, text: str, doc_id: str, page_ref: str):
+    def _extract_quotes(
+        self,
+        text: str,
+        doc_id: str,
+        page_ref: str,
+        page_index: Optional[PageOffsetIndex] = None
+    ):
         """Extract important quotes with attribution."""
         # Look for text in quotes followed by attribution
         quote_pattern = r'"([^"]+)"\s*(?:,|\s)\s*(?:said|according to|stated)\s+([^,\.]+)'
@@ -121,10 +151,16 @@ class StructuredExtractor:
                 speaker=speaker,
                 context=context,
                 date=None,
-                page_ref=page_ref
+                page_ref=self._page_ref(page_ref, page_index, match)
             ))
     
-    def _extract_dates(self, text: str, doc_id: str, page_ref: str):
+    def _extract_dates(
+        self,
+        text: str,
+        doc_id: str,
+        page_ref: str,
+        page_index: Optional[PageOffsetIndex] = None
+    ):
         """Extract dates and events."""
         # Match various date formats and associated events
         date_patterns = [
@@ -145,7 +181,7 @@ class StructuredExtractor:
                     date=match.group(),
                     event=context,
                     source=doc_id,
-                    page_ref=page_ref
+                    page_ref=self._page_ref(page_ref, page_index, match)
                 ))
     
     def _extract_key_points(self, text: str, doc_id: str, page_ref: str):
@@ -0,0 +1,156 @@
+"""Persisted state for incremental sync of remote report folders."""
+
+import os
+import json
+import logging
+import tempfile
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the manifest file changes
+MANIFEST_FORMAT_VERSION = 1
+
+MANIFEST_FILE = 'manifest.json'
+
+@dataclass
+class SyncEntry:
+    """A remote file as of the last listing."""
+    path_lower: str
+    path_display: str
+    name: str
+    rev: str
+    content_hash: Optional[str]
+    size: int
+    server_modified: datetime
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['server_modified'] = self.server_modified.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SyncEntry':
+        data = dict(data)
+        data['server_modified'] = datetime.fromisoformat(data['server_modified'])
+        return cls(**data)
+
+class SyncManifest:
+    """
+    Listing cursors and file revisions of synced remote folders.
+
+    Each folder keeps the cursor of its last listing and the files it held
+    at that point, so the next sync only has to ask for changes since the
+    cursor. File bytes are not kept here; the content hash of each entry
+    lets the blob store serve unchanged files.
+    """
+
+    def __init__(self, sync_dir: str = ".cache/dropbox_sync"):
+        """
+        Initialize SyncManifest.
+
+        Args:
+            sync_dir: Directory holding the manifest file
+        """
+        self.sync_dir = sync_dir
+        self.manifest_path = os.path.join(sync_dir, MANIFEST_FILE)
+        self._folders: Dict[str, Dict] = {}  # folder path -> {'cursor', 'entries'}
+        self._load()
+
+    def _load(self):
+        """Read the manifest from disk, starting empty if it is missing or unreadable."""
+        os.makedirs(self.sync_dir, exist_ok=True)
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync manifest {self.manifest_path}: {e}")
+            return
+
+        if data.get('version') != MANIFEST_FORMAT_VERSION:
+            logger.info(f"Ignoring sync manifest with format version {data.get('version')}")
+            return
+
+        try:
+            for folder, state in data.get('folders', {}).items():
+                self._folders[folder] = {
+                    'cursor': state.get('cursor'),
+                    'entries': {
+                        path: SyncEntry.from_dict(entry)
+                        for path, entry in state.get('entries', {}).items()
+                    }
+                }
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed sync manifest {self.manifest_path}: {e}")
+            self._folders = {}
+            return
+
+        logger.info(
+            f"Loaded sync manifest: {len(self._folders)} folders, "
+            f"{sum(len(state['entries']) for state in self._folders.values())} files"
+        )
+
+    def _folder(self, folder: str) -> Dict:
+        return self._folders.setdefault(folder.lower(), {'cursor': None, 'entries': {}})
+
+    def cursor(self, folder: str) -> Optional[str]:
+        """Get the cursor of a folder's last listing, or None if it was never listed."""
+        state = self._folders.get(folder.lower())
+        return state['cursor'] if state else None
+
+    def set_cursor(self, folder: str, cursor: str) -> None:
+        """Record the cursor at the end of a folder's listing."""
+        self._folder(folder)['cursor'] = cursor
+
+    def reset_folder(self, folder: str) -> None:
+        """Forget a folder's cursor and files ahead of a full listing."""
+        self._folders.pop(folder.lower(), None)
+
+    def entries(self, folder: str) -> List[SyncEntry]:
+        """Get the files a folder held at its last listing."""
+        state = self._folders.get(folder.lower())
+        return list(state['entries'].values()) if state else []
+
+    def upsert(self, folder: str, entry: SyncEntry) -> None:
+        """
+        Record a file that was added or changed.
+
+        Args:
+            folder: Folder the file was listed under
+            entry: File as of the latest listing
+        """
+        self._folder(folder)['entries'][entry.path_lower] = entry
+
+    def remove(self, folder: str, path_lower: str) -> None:
+        """Drop a deleted file, or every file under a deleted subfolder."""
+        entries = self._folder(folder)['entries']
+        prefix = path_lower.rstrip('/') + '/'
+        for path in [p for p in entries if p == path_lower or p.startswith(prefix)]:
+            del entries[path]
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        data = {
+            'version': MANIFEST_FORMAT_VERSION,
+            'folders': {
+                folder: {
+                    'cursor': state['cursor'],
+                    'entries': {path: entry.to_dict() for path, entry in state['entries'].items()}
+                }
+                for folder, state in self._folders.items()
+            }
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.sync_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Failed to write sync manifest {self.manifest_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
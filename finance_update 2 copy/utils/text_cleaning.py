@@ -0,0 +1,334 @@
+"""Fused text normalization and measurement for extracted PDF text."""
+
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from utils.page_index import PageOffsetIndex
+
+# Repeated header/footer detection
+REPEAT_ZONE_LINES = 4  # Non-blank lines at the top and bottom of a page checked for repeats
+MIN_REPEAT_PAGES = 3  # A line must appear on at least this many pages...
+MIN_REPEAT_RATIO = 0.5  # ...and on at least this share of pages with text
+TOKENS_PER_WORD = 1.3  # Same estimate ChunkManager uses
+
+# Characters kept as-is even though str.isprintable() rejects them
+_KEEP = '\n\t'
+# Line and page breaks normalized to newlines
+_BREAKS = '\r\f\v'
+
+def _build_translate_table() -> Dict[int, str]:
+    """Map every non-printable BMP character to a space, and breaks to newlines."""
+    table = {
+        code_point: ' '
+        for code_point in range(0x10000)
+        if not chr(code_point).isprintable() and chr(code_point) not in _KEEP
+    }
+    for char in _BREAKS:
+        table[ord(char)] = '\n'
+    return table
+
+_TRANSLATE_TABLE = _build_translate_table()
+
+# Characters outside the BMP are rare in reports and checked individually
+_ASTRAL_CHARS = re.compile('[\U00010000-\U0010FFFF]')
+
+_SPACE_RUNS = re.compile(r' {2,}')
+
+# Runs of alphanumerics and whitespace; whatever remains is a special character
+_ORDINARY_RUNS = re.compile(r'[\w\s]+')
+
+_DIGIT_RUNS = re.compile(r'\d+')
+
+def _replace_unprintable_astral(match) -> str:
+    char = match.group()
+    return char if char.isprintable() else ' '
+
+def normalize_text(text: str) -> str:
+    """
+    Replace control characters and normalize whitespace.
+
+    Non-printable characters become spaces and \\r, \\f and \\v become
+    newlines through one translate table. A single pass over the lines then
+    drops spaces around newlines, keeps at most one blank line in a row and
+    collapses runs of spaces.
+
+    Args:
+        text: Raw extracted text
+
+    Returns:
+        Normalized text with leading and trailing whitespace removed
+    """
+    if not text:
+        return ""
+
+    text = text.translate(_TRANSLATE_TABLE)
+    if not text.isascii() and max(text) > '\uffff':
+        text = _ASTRAL_CHARS.sub(_replace_unprintable_astral, text)
+
+    lines = []
+    blank_run = 0
+    for line in text.split('\n'):
+        line = line.strip(' ')
+        if not line:
+            blank_run += 1
+            if blank_run > 1:
+                continue
+        else:
+            blank_run = 0
+            if '  ' in line:
+                line = _SPACE_RUNS.sub(' ', line)
+        lines.append(line)
+    return '\n'.join(lines).strip()
+
+def count_special_chars(text: str) -> int:
+    """Count characters that are neither alphanumeric nor whitespace."""
+    # \w matches the underscore, which counts as special
+    return len(_ORDINARY_RUNS.sub('', text)) + text.count('_')
+
+@dataclass
+class TextStats:
+    """Measurements of cleaned text used for validation and logging."""
+    chars: int  # Total characters
+    text_length: int  # Characters excluding leading/trailing whitespace
+    lines: int  # Lines including blank ones
+    total_lines: int  # Non-blank lines
+    valid_lines: int  # Non-blank lines at least the minimum line length
+    special_chars: int  # Characters neither alphanumeric nor whitespace
+
+    @property
+    def valid_line_ratio(self) -> float:
+        return self.valid_lines / self.total_lines if self.total_lines else 0
+
+    @property
+    def special_char_ratio(self) -> float:
+        return self.special_chars / self.chars if self.chars else 1
+
+    def validation_stats(self) -> Dict[str, float]:
+        """Get the statistics reported by text validation."""
+        return {
+            'text_length': self.text_length,
+            'total_lines': self.total_lines,
+            'valid_lines': self.valid_lines,
+            'valid_line_ratio': self.valid_line_ratio,
+            'special_char_ratio': self.special_char_ratio
+        }
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+def measure_text(text: str, min_line_length: int) -> TextStats:
+    """
+    Measure text without changing it.
+
+    Args:
+        text: Cleaned text
+        min_line_length: Minimum stripped length of a valid line
+
+    Returns:
+        TextStats for the text
+    """
+    _, stats = filter_lines(text, None, min_line_length)
+    return stats
+
+def filter_lines(
+    text: str,
+    skip_pattern: Optional[Pattern],
+    min_line_length: int,
+    edge_lines: int = 0
+) -> Tuple[str, TextStats]:
+    """
+    Drop edge and boilerplate lines and measure the result in the same pass.
+
+    Args:
+        text: Normalized text
+        skip_pattern: Optional compiled pattern; lines it matches are dropped
+        min_line_length: Minimum stripped length of a valid line
+        edge_lines: Number of lines dropped from each end of the text
+
+    Returns:
+        Tuple of (filtered text, TextStats of the filtered text)
+    """
+    filtered, stats, _ = filter_indexed_lines(text, skip_pattern, min_line_length, edge_lines)
+    return filtered, stats
+
+def filter_indexed_lines(
+    text: str,
+    skip_pattern: Optional[Pattern],
+    min_line_length: int,
+    edge_lines: int = 0,
+    page_index: Optional[PageOffsetIndex] = None
+) -> Tuple[str, TextStats, Optional[PageOffsetIndex]]:
+    """
+    Filter lines like filter_lines, carrying a page offset index across.
+
+    Args:
+        text: Normalized text
+        skip_pattern: Optional compiled pattern; lines it matches are dropped
+        min_line_length: Minimum stripped length of a valid line
+        edge_lines: Number of lines dropped from each end of the text
+        page_index: Optional page offsets into text
+
+    Returns:
+        Tuple of (filtered text, TextStats of the filtered text, page_index
+        remapped onto the filtered text or None)
+    """
+    lines = text.split('\n')
+    last_kept = len(lines) - edge_lines if edge_lines else len(lines)
+    track_offsets = page_index is not None
+    line_offsets = []
+    new_offsets = []
+    offset = 0
+    new_offset = 0
+
+    kept = []
+    total_lines = 0
+    valid_lines = 0
+    match = skip_pattern.match if skip_pattern is not None else None
+    for index, line in enumerate(lines):
+        if track_offsets:
+            line_offsets.append(offset)
+            new_offsets.append(new_offset)
+            offset += len(line) + 1
+        if index < edge_lines or index >= last_kept:
+            continue
+        if match is not None and match(line):
+            continue
+        if track_offsets:
+            new_offset += len(line) + 1
+        kept.append(line)
+        stripped_length = len(line.strip())
+        if stripped_length:
+            total_lines += 1
+            if stripped_length >= min_line_length:
+                valid_lines += 1
+
+    filtered = '\n'.join(kept)
+    stats = TextStats(
+        chars=len(filtered),
+        text_length=len(filtered.strip()),
+        lines=len(kept) if kept else 1,
+        total_lines=total_lines,
+        valid_lines=valid_lines,
+        special_chars=count_special_chars(filtered)
+    )
+    if track_offsets:
+        page_index = page_index.remap_lines(line_offsets, new_offsets, len(filtered))
+    return filtered, stats, page_index
+
+def _repeat_key(line: str) -> str:
+    """Normalize a line so running headers match across pages (page numbers, dates, spacing)."""
+    return ' '.join(_DIGIT_RUNS.sub('#', line.lower()).split())
+
+def _edge_line_indices(lines: List[str], zone_lines: int) -> List[int]:
+    """Get the indices of the first and last zone_lines non-blank lines of a page."""
+    non_blank = [index for index, line in enumerate(lines) if line.strip()]
+    if len(non_blank) <= 2 * zone_lines:
+        return non_blank
+    return non_blank[:zone_lines] + non_blank[-zone_lines:]
+
+def find_repeated_lines(
+    pages: List[str],
+    zone_lines: int = REPEAT_ZONE_LINES,
+    min_pages: int = MIN_REPEAT_PAGES,
+    min_ratio: float = MIN_REPEAT_RATIO
+) -> Set[str]:
+    """
+    Find running headers, footers and other lines repeated across pages.
+
+    Args:
+        pages: Raw text of each page
+        zone_lines: Non-blank lines at each end of a page checked for repeats
+        min_pages: Minimum number of pages a line must appear on
+        min_ratio: Minimum share of pages with text a line must appear on
+
+    Returns:
+        Normalized keys of the repeated lines, for drop_repeated_lines
+    """
+    page_lines = [page.split('\n') for page in pages]
+    page_zones = [_edge_line_indices(lines, zone_lines) for lines in page_lines]
+    pages_with_text = sum(1 for zone in page_zones if zone)
+    threshold = max(min_pages, math.ceil(min_ratio * pages_with_text))
+    if pages_with_text < threshold:
+        return set()
+
+    # Count each normalized line once per page
+    page_counts = Counter()
+    for lines, zone in zip(page_lines, page_zones):
+        page_counts.update({_repeat_key(lines[index]) for index in zone})
+    return {key for key, count in page_counts.items() if count >= threshold and key}
+
+def drop_repeated_lines(
+    page: str,
+    repeated: Set[str],
+    zone_lines: int = REPEAT_ZONE_LINES
+) -> Tuple[str, int, int]:
+    """
+    Remove repeated lines found by find_repeated_lines from one page.
+
+    Pages that are nothing but repeated lines, such as templated slides,
+    are left as they are.
+
+    Args:
+        page: Raw text of the page
+        repeated: Normalized keys of the repeated lines
+        zone_lines: Non-blank lines at each end of a page checked for repeats
+
+    Returns:
+        Tuple of (page text, lines removed, words removed)
+    """
+    if not repeated:
+        return page, 0, 0
+    lines = page.split('\n')
+    zone = _edge_line_indices(lines, zone_lines)
+    drop = {index for index in zone if _repeat_key(lines[index]) in repeated}
+    if not drop or len(drop) == sum(1 for line in lines if line.strip()):
+        return page, 0, 0
+    words = sum(len(lines[index].split()) for index in drop)
+    return '\n'.join(line for index, line in enumerate(lines) if index not in drop), len(drop), words
+
+def strip_repeated_lines(
+    pages: List[str],
+    zone_lines: int = REPEAT_ZONE_LINES,
+    min_pages: int = MIN_REPEAT_PAGES,
+    min_ratio: float = MIN_REPEAT_RATIO
+) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Remove running headers, footers and other lines repeated across pages.
+
+    Only lines near the top or bottom of a page are considered. Lines are
+    compared with digits and spacing normalized, so "Page 3 of 40" and
+    "Page 4 of 40" count as the same line.
+
+    Args:
+        pages: Raw text of each page
+        zone_lines: Non-blank lines at each end of a page checked for repeats
+        min_pages: Minimum number of pages a line must appear on
+        min_ratio: Minimum share of pages with text a line must appear on
+
+    Returns:
+        Tuple of (pages with repeated lines removed, statistics with the
+        lines, words and estimated tokens removed)
+    """
+    repeated = find_repeated_lines(pages, zone_lines, min_pages, min_ratio)
+    if not repeated:
+        return pages, {}
+
+    lines_removed = 0
+    words_removed = 0
+    stripped_pages = []
+    for page in pages:
+        stripped, lines, words = drop_repeated_lines(page, repeated, zone_lines)
+        stripped_pages.append(stripped)
+        lines_removed += lines
+        words_removed += words
+
+    if not lines_removed:
+        return pages, {}
+    return stripped_pages, {
+        'repeated_line_patterns': len(repeated),
+        'repeated_lines_removed': lines_removed,
+        'repeated_tokens_removed': round(words_removed * TOKENS_PER_WORD)
+    }
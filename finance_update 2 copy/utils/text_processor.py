@@ -3,30 +3,19 @@ import string
 import logging
 import nltk
 import tiktoken
-import functools
 import gc
 from typing import List, Optional
+from utils.tokenizer import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
 def get_encoding_for_model(model: str) -> tiktoken.Encoding:
     """Get the appropriate encoding for a specific model"""
-    try:
-        if model.startswith('o1'):
-            return tiktoken.get_encoding("cl100k_base")  # Used by o1 models
-        elif model.startswith('gpt-4'):
-            return tiktoken.encoding_for_model("gpt-4")
-        else:
-            return tiktoken.encoding_for_model("gpt-3.5-turbo")
-    except Exception as e:
-        logger.warning(f"Error getting encoding for model {model}, falling back to gpt-3.5-turbo: {e}")
-        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    return get_tokenizer().encoding_for(model)
 
-@functools.lru_cache(maxsize=256)  # Reduced cache size
 def get_token_count(text: str, model: str = "gpt-3.5-turbo") -> int:
     """Get token count for text with model-specific encoding"""
-    encoding = get_encoding_for_model(model)
-    return len(encoding.encode(text))
+    return get_tokenizer().count(text, model)
 
 class TextProcessor:
     """Handles text processing operations with improved efficiency"""
@@ -209,11 +198,11 @@ class TextProcessor:
             
             # Split into sentences
             sentences = TextProcessor.split_into_sentences(text)
+            tokenizer = get_tokenizer()
             current_chunk = []
             current_size = 0
 
-            for sentence in sentences:
-                sentence_tokens = get_token_count(sentence, model)
+            for sentence, sentence_tokens in zip(sentences, tokenizer.count_batch(sentences, model)):
                 
                 if sentence_tokens > target_size:
                     # Handle oversized sentences
@@ -228,8 +217,8 @@ class TextProcessor:
                     temp_chunk = []
                     temp_size = 0
                     
-                    for word in words:
-                        word_tokens = get_token_count(word + ' ', model)
+                    word_counts = tokenizer.count_batch([word + ' ' for word in words], model)
+                    for word, word_tokens in zip(words, word_counts):
                         if temp_size + word_tokens > target_size:
                             if temp_chunk:
                                 chunks.append(' '.join(temp_chunk))
@@ -293,8 +282,7 @@ class TextProcessor:
         current_chunks = []
         current_size = 0
 
-        for chunk in chunks:
-            chunk_size = get_token_count(chunk, model)
+        for chunk, chunk_size in zip(chunks, get_tokenizer().count_batch(chunks, model)):
             
             # Handle oversized chunks
             if chunk_size > max_size:
@@ -0,0 +1,169 @@
+"""Token counting with one cached encoding per model."""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_CACHE_MB = 16
+DEFAULT_BATCH_THREADS = 8
+CACHE_ENTRY_BYTES = 200  # Approximate memory of one cached count: digest, int and index node
+
+def encoding_name_for_model(model: str) -> str:
+    """Get the name of the encoding used to count tokens for a model."""
+    try:
+        if model.startswith('o1'):
+            return "cl100k_base"  # Used by o1 models
+        elif model.startswith('gpt-4'):
+            return tiktoken.encoding_name_for_model("gpt-4")
+        else:
+            return tiktoken.encoding_name_for_model("gpt-3.5-turbo")
+    except Exception as e:
+        logger.warning(f"Error getting encoding for model {model}, falling back to gpt-3.5-turbo: {e}")
+        return tiktoken.encoding_name_for_model("gpt-3.5-turbo")
+
+class TokenizerService:
+    """
+    Counts tokens with tiktoken, loading each encoding once.
+
+    Counts are cached under a digest of the text rather than the text
+    itself, so the cache neither keeps large documents alive nor compares
+    them on lookup, and it evicts least recently used counts to stay within
+    its memory budget. count_batch encodes the texts it has not seen before
+    in one call on tiktoken's worker threads, which release the GIL.
+    Special-token markers in the text are counted as ordinary text.
+    """
+
+    def __init__(
+        self,
+        cache_max_mb: float = DEFAULT_CACHE_MB,
+        batch_threads: int = DEFAULT_BATCH_THREADS,
+        load_encoding: Callable[[str], tiktoken.Encoding] = tiktoken.get_encoding
+    ):
+        """
+        Initialize TokenizerService.
+
+        Args:
+            cache_max_mb: Memory budget of the count cache
+            batch_threads: Threads used to encode a batch
+            load_encoding: Function loading an encoding by name
+        """
+        self.max_entries = max(int(cache_max_mb * 1024 * 1024 / CACHE_ENTRY_BYTES), 1)
+        self.batch_threads = batch_threads
+        self.hits = 0
+        self.misses = 0
+        self._load_encoding = load_encoding
+        self._encodings: Dict[str, tiktoken.Encoding] = {}
+        self._counts: "OrderedDict[bytes, int]" = OrderedDict()  # digest -> count, oldest first
+        self._lock = threading.Lock()
+
+    def encoding_for(self, model: str) -> tiktoken.Encoding:
+        """Get the encoding for a model, loading it on first use."""
+        name = encoding_name_for_model(model)
+        encoding = self._encodings.get(name)
+        if encoding is None:
+            with self._lock:
+                encoding = self._encodings.get(name)
+                if encoding is None:
+                    encoding = self._encodings[name] = self._load_encoding(name)
+        return encoding
+
+    @staticmethod
+    def _cache_key(text: str, encoding_name: str) -> bytes:
+        digest = hashlib.blake2b(encoding_name.encode(), digest_size=16)
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    def _lookup(self, key: bytes) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def _store(self, key: bytes, count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+    def count(self, text: str, model: str = DEFAULT_MODEL) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text: Text to count
+            model: Model whose encoding is used
+
+        Returns:
+            Number of tokens
+        """
+        encoding = self.encoding_for(model)
+        key = self._cache_key(text, encoding.name)
+        count = self._lookup(key)
+        if count is None:
+            count = len(encoding.encode_ordinary(text))
+            self._store(key, count)
+        return count
+
+    def count_batch(self, texts: Sequence[str], model: str = DEFAULT_MODEL) -> List[int]:
+        """
+        Count the tokens of many texts at once.
+
+        Args:
+            texts: Texts to count
+            model: Model whose encoding is used
+
+        Returns:
+            Number of tokens of each text, in order
+        """
+        encoding = self.encoding_for(model)
+        keys = [self._cache_key(text, encoding.name) for text in texts]
+        counts: List[Optional[int]] = [self._lookup(key) for key in keys]
+
+        # Encode each text not in the cache once, even if it repeats in the batch
+        pending: Dict[bytes, List[int]] = {}
+        for index, count in enumerate(counts):
+            if count is None:
+                pending.setdefault(keys[index], []).append(index)
+        if pending:
+            missing = [texts[indexes[0]] for indexes in pending.values()]
+            encoded = encoding.encode_ordinary_batch(missing, num_threads=self.batch_threads)
+            for (key, indexes), tokens in zip(pending.items(), encoded):
+                self._store(key, len(tokens))
+                for index in indexes:
+                    counts[index] = len(tokens)
+        return counts
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get cache hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self._counts),
+            'encodings': len(self._encodings)
+        }
+
+_default_tokenizer: Optional[TokenizerService] = None
+_default_lock = threading.Lock()
+
+def get_tokenizer() -> TokenizerService:
+    """Get the tokenizer shared by the whole process."""
+    global _default_tokenizer
+    if _default_tokenizer is None:
+        with _default_lock:
+            if _default_tokenizer is None:
+                _default_tokenizer = TokenizerService()
+    return _default_tokenizer